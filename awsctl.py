@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import sys
+from shared_func.commands import execute_line, format_help, interactive_shell, send_to_daemon, serve
+
+# Single entry point for the shared_func helpers:
+#   ./awsctl.py ec2 list
+#   ./awsctl.py s3 exists my-bucket path/to/key
+#   ./awsctl.py shell                 # interactive, clients stay warm
+#   ./awsctl.py serve &               # daemon; later calls are forwarded to it
+#   ./awsctl.py shutdown              # stop the daemon
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print(format_help())
+        print("\n  shell                 Interactive mode\n  serve                 Start the daemon\n  shutdown              Stop the daemon")
+    elif argv == ["shell"]:
+        interactive_shell()
+    elif argv == ["serve"]:
+        serve()
+    else:
+        import shlex
+        line = shlex.join(argv)
+        response = send_to_daemon(line)
+        if response is None:
+            if argv == ["shutdown"]:
+                print("No awsctl daemon running.")
+                sys.exit(1)
+            # No daemon running: execute in this process
+            response = execute_line(line, capture=False, status=True)
+        output, ok = response
+        print(output, end="")
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures the wall time of `import shared_func.<module>` for every module in a
+# fresh interpreter, so the numbers match what a one-shot CLI script pays.
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SHARED_FUNC_DIR = os.path.join(REPO_DIR, "shared_func")
+
+TIMER = (
+    "import time, importlib; t = time.perf_counter(); "
+    "importlib.import_module('shared_func.{module}'); "
+    "print(time.perf_counter() - t)"
+)
+
+
+# Modules that cannot be imported in a bare environment for reasons unrelated to
+# import time (optional dependencies). Their failures are reported separately and
+# do not affect the exit code, which only reflects regressions.
+KNOWN_FAILURES = {
+    "bedrock_func": "needs the optional colorama and rich packages",
+}
+
+
+def list_modules():
+    return sorted(f[:-3] for f in os.listdir(SHARED_FUNC_DIR) if f.endswith(".py") and not f.startswith("__"))
+
+
+def time_import(module, repeat):
+    """Returns the median import time in milliseconds, or the error line if the import fails."""
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", TIMER.format(module=module)],
+                                cwd=REPO_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        samples.append(float(result.stdout.strip()) * 1000)
+    return statistics.median(samples), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('modules', nargs='*', help='Modules to time (default: every shared_func module)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--max-ms', type=float, help='Fail if any module imports slower than this')
+    parser.add_argument('--baseline', help='JSON file of previous timings to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='Allowed slowdown factor vs. baseline')
+    parser.add_argument('--save', help='Write the timings to this JSON file')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    timings = {}
+    regressions = []
+    known_failures = []
+    for module in args.modules or list_modules():
+        ms, error = time_import(module, args.repeat)
+        if error:
+            if module in KNOWN_FAILURES:
+                print(f"{module:32} KNOWN FAILURE  {error}")
+                known_failures.append(module)
+            else:
+                print(f"{module:32} FAILED  {error}")
+                regressions.append(module)
+            continue
+        timings[module] = ms
+        note = ""
+        if module in baseline and ms > baseline[module] * args.tolerance:
+            note = f"  REGRESSION (baseline {baseline[module]:.1f} ms)"
+            regressions.append(module)
+        elif args.max_ms is not None and ms > args.max_ms:
+            note = f"  SLOW (> {args.max_ms:.0f} ms)"
+            regressions.append(module)
+        print(f"{module:32} {ms:8.1f} ms{note}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+
+    if known_failures:
+        print(f"\n{len(known_failures)} known failure(s), not counted: "
+              + ", ".join(f"{module} ({KNOWN_FAILURES[module]})" for module in known_failures))
+    if regressions:
+        print(f"\n{len(regressions)} module(s) failed to import or over budget: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+import argparse
+from shared_func.dynamo_func import export_dynamodb_to_parquet
+
+# Chunked, resumable export of a DynamoDB table to Parquet:
+#   ./dynamodb-export_parquet.py my-table ./export
+#   ./dynamodb-export_parquet.py my-table s3://my-bucket/exports/my-table --segments 8
+# Re-run the same command after an interruption to resume from the checkpoint.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('table_name', help='DynamoDB table to export')
+    parser.add_argument('destination', help='Local folder or s3://bucket/prefix')
+    parser.add_argument('--segments', type=int, default=4, help='Parallel scan segments')
+    parser.add_argument('--rows-per-file', type=int, default=100000, help='Rows per Parquet file')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default ./<table_name>.export-checkpoint.json)')
+    parser.add_argument('--compression', default='snappy', help='Parquet compression codec')
+    parser.add_argument('--decimal-scale', type=int, default=9, help='Digits kept after the decimal point of numbers')
+    args = parser.parse_args()
+
+    export_dynamodb_to_parquet(args.table_name, args.destination, total_segments=args.segments,
+                               rows_per_file=args.rows_per_file, checkpoint_path=args.checkpoint,
+                               compression=args.compression, decimal_scale=args.decimal_scale)
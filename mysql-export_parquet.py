@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+import argparse
+from shared_func.sql_func import export_mysql_to_s3_parquet
+
+# Streams a MySQL query into Parquet files on S3 in bounded memory:
+#   ./mysql-export_parquet.py "SELECT * FROM shop.orders" s3://my-bucket/exports/orders
+#   ./mysql-export_parquet.py "SELECT * FROM shop.orders" s3://my-bucket/exports/orders \
+#       --partition-column order_date --glue-database analytics --glue-table orders
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('query', help='SQL query to export')
+    parser.add_argument('destination', help='s3://bucket/prefix')
+    parser.add_argument('--partition-column', help='Write Hive style <column>=<value>/ folders')
+    parser.add_argument('--rows-per-file', type=int, default=1000000, help='Rows before a file is rotated')
+    parser.add_argument('--max-file-mb', type=int, default=512, help='Megabytes before a file is rotated')
+    parser.add_argument('--chunksize', type=int, default=50000, help='Rows read from MySQL at a time')
+    parser.add_argument('--compression', default='snappy', help='Parquet compression codec')
+    parser.add_argument('--max-buffer-mb', type=int, default=256, help='Upload buffer budget in megabytes')
+    parser.add_argument('--glue-database', help='Register the export in this Glue database')
+    parser.add_argument('--glue-table', help='Glue table name (with --glue-database)')
+    parser.add_argument('--master', action='store_true', help='Use the master database credentials')
+    args = parser.parse_args()
+
+    if not args.destination.startswith("s3://"):
+        parser.error("destination must be an s3:// URI.")
+    bucket, _, prefix = args.destination[len("s3://"):].partition("/")
+    export_mysql_to_s3_parquet(args.query, bucket, prefix, partition_column=args.partition_column,
+                               rows_per_file=args.rows_per_file, max_file_bytes=args.max_file_mb * 1024 ** 2,
+                               chunksize=args.chunksize, compression=args.compression,
+                               max_buffer_bytes=args.max_buffer_mb * 1024 ** 2,
+                               glue_database=args.glue_database, glue_table=args.glue_table,
+                               master=args.master)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import argparse
+from shared_func.s3_func import sync_folder_to_s3, sync_s3_to_folder
+
+# Incremental, manifest-based alternative to cli-s3-sync.sh:
+#   ./s3-sync.py ./reports s3://my-bucket/reports        (local to S3)
+#   ./s3-sync.py s3://my-bucket/reports ./reports        (S3 to local)
+
+def split_s3_uri(uri):
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    return bucket, prefix
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('source', help='Local folder or s3://bucket/prefix')
+    parser.add_argument('destination', help='Local folder or s3://bucket/prefix')
+    parser.add_argument('--workers', type=int, default=8, help='Files transferred in parallel')
+    parser.add_argument('--delete', action='store_true', help='Remove files that no longer exist in the source')
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    if args.destination.startswith("s3://"):
+        bucket, prefix = split_s3_uri(args.destination)
+        sync_folder_to_s3(args.source, bucket, prefix, max_workers=args.workers,
+                          delete=args.delete, verbose=not args.quiet)
+    elif args.source.startswith("s3://"):
+        bucket, prefix = split_s3_uri(args.source)
+        sync_s3_to_folder(bucket, prefix, args.destination, max_workers=args.workers,
+                          delete=args.delete, verbose=not args.quiet)
+    else:
+        parser.error("One of source or destination must be an s3:// URI.")
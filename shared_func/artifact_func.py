@@ -1,10 +1,10 @@
-import boto3
+from shared_func.client_func import get_client
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError
 import subprocess
 
 def create_codeartifact_domain(domain_name):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.create_domain(
             domain=domain_name
         )
@@ -16,7 +16,7 @@ def create_codeartifact_domain(domain_name):
 
 def create_codeartifact_repository(domain_name, repository_name):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.create_repository(
             domain=domain_name,
             repository=repository_name
@@ -29,7 +29,7 @@ def create_codeartifact_repository(domain_name, repository_name):
 
 def associate_external_connection(domain_name, repository_name, external_connection):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.associate_external_connection(
             domain=domain_name,
             repository=repository_name,
@@ -43,7 +43,7 @@ def associate_external_connection(domain_name, repository_name, external_connect
 
 def associate_upstream_repository(domain_name, repository_name, upstream_repository_name):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.update_repository(
             domain=domain_name,
             repository=repository_name,
@@ -81,7 +81,7 @@ def configure_codeartifact_tool(domain, repository, tool):
 
 def list_packages(domain_name, repository_name):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.list_packages(
             domain=domain_name,
             repository=repository_name
@@ -94,7 +94,7 @@ def list_packages(domain_name, repository_name):
 
 def delete_repository(domain_name, repository_name):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.delete_repository(
             domain=domain_name,
             repository=repository_name
@@ -107,7 +107,7 @@ def delete_repository(domain_name, repository_name):
 
 def delete_domain(domain_name):
     try:
-        client = boto3.client('codeartifact')
+        client = get_client('codeartifact')
         response = client.delete_domain(
             domain=domain_name
         )
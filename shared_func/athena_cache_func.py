@@ -0,0 +1,116 @@
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import threading
+
+# Local cache of Athena query results keyed by normalized SQL, database, workgroup,
+# region and output location.
+#   ATHENA_CACHE_DIR      where cached results live (default ~/.cache/shared_func/athena)
+#   ATHENA_CACHE_MAX_AGE  seconds a cached result is served (default 900)
+cache_dir = os.environ.get("ATHENA_CACHE_DIR", os.path.expanduser("~/.cache/shared_func/athena"))
+default_max_age = float(os.environ.get("ATHENA_CACHE_MAX_AGE", 900))
+
+# Only statements that read data are cached; DDL and INSERT/UNLOAD always run
+_cacheable = re.compile(r"^\s*(SELECT|WITH|SHOW|DESCRIBE|VALUES)\b", re.IGNORECASE)
+# String literals (kept), comments and whitespace (collapsed), everything else (lowercased)
+_tokens = re.compile(r"('(?:[^']|'')*')|((?:\s|--[^\n]*|/\*.*?\*/)+)|([^'\s\-/]+|[\-/])", re.DOTALL)
+
+
+def _normalize_token(match):
+    literal, space, text = match.groups()
+    return literal or (" " if space else text.lower())
+
+
+def normalize_sql(query):
+    """
+    Returns the query with comments removed, whitespace collapsed, the
+    trailing semicolon dropped and everything but string literals lowercased
+    (Athena identifiers are case-insensitive), so trivially different
+    spellings of a query share one cache entry.
+    """
+    return _tokens.sub(_normalize_token, query).strip().rstrip(";").strip()
+
+
+def is_cacheable(query):
+    return bool(_cacheable.match(normalize_sql(query)))
+
+
+def _entry_paths(query, database, workgroup, region_name, output_location):
+    # The same SQL against another region or account's output bucket is a different result
+    key = [normalize_sql(query), database, workgroup, region_name, output_location]
+    digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+    base = os.path.join(cache_dir, digest)
+    return base + ".pickle", base + ".json"
+
+
+def load_cached_result(query, database, workgroup=None, max_age=None, region_name=None, output_location=None):
+    """
+    Returns a cached result younger than max_age seconds (default
+    ATHENA_CACHE_MAX_AGE), or None.
+    """
+    max_age = default_max_age if max_age is None else max_age
+    data_path, meta_path = _entry_paths(query, database, workgroup, region_name, output_location)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if time.time() - meta['created_at'] > max_age:
+            return None
+        with open(data_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def save_cached_result(query, database, result, workgroup=None, query_execution_id=None,
+                       region_name=None, output_location=None):
+    """Stores a query result (a DataFrame or any picklable value)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _entry_paths(query, database, workgroup, region_name, output_location)
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(data_path + suffix, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(data_path + suffix, data_path)
+    with open(meta_path + suffix, 'w') as f:
+        json.dump({
+            'query': normalize_sql(query),
+            'database': database,
+            'workgroup': workgroup,
+            'region_name': region_name,
+            'output_location': output_location,
+            'query_execution_id': query_execution_id,
+            'created_at': time.time(),
+        }, f)
+    os.replace(meta_path + suffix, meta_path)
+
+
+def invalidate_athena_cache(query=None, database=None, workgroup=None, region_name=None, output_location=None):
+    """
+    Drops cached results: one query when query is given, every query of a
+    database when only database is given, or the whole cache.
+    """
+    if query is not None:
+        paths = [_entry_paths(query, database, workgroup, region_name, output_location)]
+    else:
+        paths = []
+        for name in os.listdir(cache_dir) if os.path.isdir(cache_dir) else []:
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(cache_dir, name)
+            if database is not None:
+                try:
+                    with open(meta_path) as f:
+                        if json.load(f).get('database') != database:
+                            continue
+                except (OSError, ValueError):
+                    pass
+            paths.append((meta_path[:-len(".json")] + ".pickle", meta_path))
+
+    for entry in paths:
+        for path in entry:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,23 +1,233 @@
-import boto3
 import time
-import pandas as pd
-import io
+import random
+import threading
+import collections
+import concurrent.futures
+from botocore.exceptions import ClientError, ParamValidationError
+from shared_func.client_func import get_client, lazy_client
+from shared_func.athena_cache_func import default_max_age, is_cacheable, load_cached_result, save_cached_result
 
-athena_client = boto3.client('athena', region_name='us-east-1')  # Adjust the region as necessary
+athena_client = lazy_client('athena', region_name='us-east-1')  # Adjust the region as necessary
+
+terminal_states = ('SUCCEEDED', 'FAILED', 'CANCELLED')
 
 # Function to wait for query completion
-def wait_for_query_to_finish(query_execution_id):
+def wait_for_query_to_finish(query_execution_id, poll_interval=0.2, max_poll_interval=5.0, client=None):
+    """
+    Polls a query until it finishes, starting at poll_interval seconds and
+    backing off by 1.5x up to max_poll_interval, so short queries return
+    quickly while long ones are not polled needlessly.
+
+    Returns:
+        str: the final state (SUCCEEDED, FAILED or CANCELLED).
+    """
+    client = client or athena_client
+    delay = poll_interval
     while True:
-        result = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
+        result = client.get_query_execution(QueryExecutionId=query_execution_id)
         status = result['QueryExecution']['Status']['State']
         
-        if status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
+        if status in terminal_states:
             return status
-        time.sleep(5)
+        time.sleep(delay)
+        delay = min(max_poll_interval, delay * 1.5)
+
+
+class AthenaExecutor:
+    """
+    Runs many Athena queries concurrently and resolves a Future per query.
+
+    A dispatcher thread starts queued queries while fewer than
+    max_concurrency are running (the workgroup's active query quota) and
+    polls all running queries together with batch_get_query_execution. Each
+    query is polled with its own backoff (poll_interval growing 1.5x up to
+    max_poll_interval). TooManyRequestsException on start is retried with
+    jittered backoff and lowers the concurrency until a query finishes.
+
+    Futures resolve to the final QueryExecution dict, or raise RuntimeError
+    when the query fails or is cancelled.
+
+    Usage:
+        with AthenaExecutor('my_db', 's3://bucket/results/') as athena:
+            futures = [athena.submit(sql) for sql in queries]
+            executions = [f.result() for f in futures]
+    """
+
+    max_batch_ids = 50
+
+    def __init__(self, database=None, output_location=None, workgroup=None, region_name='us-east-1',
+                 max_concurrency=20, poll_interval=0.2, max_poll_interval=5.0, max_retries=8):
+        self.database = database
+        self.output_location = output_location
+        self.workgroup = workgroup
+        self.region_name = region_name
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_retries = max_retries
+        self.queued = collections.deque()
+        self.running = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.dispatcher = None
+        self.stats = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'throttled': 0, 'poll_calls': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
-def list_tables_in_database(database_name, s3_output_location=None):
+    def submit(self, query, database=None, output_location=None, workgroup=None, **start_kwargs):
+        """
+        Queues a query and returns a concurrent.futures.Future for it.
+
+        Args:
+            query (str): SQL query to execute.
+            database, output_location, workgroup: override the executor defaults.
+            **start_kwargs: extra start_query_execution parameters.
+        """
+        params = dict(start_kwargs, QueryString=query)
+        database = database or self.database
+        output_location = output_location or self.output_location
+        workgroup = workgroup or self.workgroup
+        if database:
+            params.setdefault('QueryExecutionContext', {'Database': database})
+        if output_location:
+            params.setdefault('ResultConfiguration', {}).setdefault('OutputLocation', output_location)
+        if workgroup:
+            params['WorkGroup'] = workgroup
+
+        future = concurrent.futures.Future()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("AthenaExecutor is closed.")
+            self.queued.append({'params': params, 'future': future, 'attempt': 0, 'not_before': 0})
+            self.stats['submitted'] += 1
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self.dispatcher.start()
+        self.wakeup.set()
+        return future
+
+    def submit_async(self, query, **kwargs):
+        """Like submit, but returns an awaitable for use inside an asyncio event loop."""
+        import asyncio
+        return asyncio.wrap_future(self.submit(query, **kwargs))
+
+    def map(self, queries, **kwargs):
+        """Runs every query concurrently and returns their QueryExecution dicts in order."""
+        futures = [self.submit(query, **kwargs) for query in queries]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Waits for every submitted query to finish and stops the dispatcher."""
+        with self.lock:
+            self.closed = True
+            dispatcher = self.dispatcher
+        self.wakeup.set()
+        if dispatcher is not None:
+            dispatcher.join()
+
+    def _dispatch(self):
+        client = get_client('athena', region_name=self.region_name)
+        while True:
+            self._start_queued(client)
+            self._poll(client)
+            with self.lock:
+                if self.closed and not self.queued and not self.running:
+                    return
+                wake_times = [query['next_poll'] for query in self.running.values()]
+                if self.queued and len(self.running) < self.limit:
+                    wake_times.append(self.queued[0]['not_before'])
+            timeout = max(0.0, min(wake_times) - time.monotonic()) if wake_times else None
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+
+    def _start_queued(self, client):
+        while True:
+            with self.lock:
+                if not self.queued or len(self.running) >= self.limit:
+                    return
+                if self.queued[0]['not_before'] > time.monotonic():
+                    return
+                query = self.queued.popleft()
+            future = query['future']
+            if query['attempt'] == 0 and not future.set_running_or_notify_cancel():
+                continue
+            try:
+                response = client.start_query_execution(**query['params'])
+            except Exception as e:
+                code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+                if code == 'TooManyRequestsException' and query['attempt'] < self.max_retries:
+                    with self.lock:
+                        self.stats['throttled'] += 1
+                        self.limit = max(1, len(self.running))
+                        query['attempt'] += 1
+                        query['not_before'] = time.monotonic() + random.uniform(0, min(30.0, 0.5 * 2 ** query['attempt']))
+                        self.queued.appendleft(query)
+                    return
+                future.set_exception(e)
+                continue
+            with self.lock:
+                self.running[response['QueryExecutionId']] = {
+                    'future': future, 'delay': self.poll_interval,
+                    'next_poll': time.monotonic() + self.poll_interval,
+                }
+
+    def _poll(self, client):
+        now = time.monotonic()
+        with self.lock:
+            due = [query_id for query_id, query in self.running.items() if query['next_poll'] <= now]
+        for i in range(0, len(due), self.max_batch_ids):
+            try:
+                response = client.batch_get_query_execution(QueryExecutionIds=due[i:i + self.max_batch_ids])
+            except Exception as e:
+                # The client already retried; give up on these queries rather than hang their futures
+                with self.lock:
+                    lost = [self.running.pop(query_id)['future'] for query_id in due[i:i + self.max_batch_ids]]
+                for future in lost:
+                    future.set_exception(e)
+                continue
+            with self.lock:
+                self.stats['poll_calls'] += 1
+            now = time.monotonic()
+            for execution in response['QueryExecutions']:
+                status = execution['Status']
+                with self.lock:
+                    query = self.running[execution['QueryExecutionId']]
+                    if status['State'] not in terminal_states:
+                        query['delay'] = min(self.max_poll_interval, query['delay'] * 1.5)
+                        query['next_poll'] = now + query['delay']
+                        continue
+                    del self.running[execution['QueryExecutionId']]
+                    self.limit = min(self.max_concurrency, self.limit + 1)
+                    self.stats['succeeded' if status['State'] == 'SUCCEEDED' else 'failed'] += 1
+                if status['State'] == 'SUCCEEDED':
+                    query['future'].set_result(execution)
+                else:
+                    query['future'].set_exception(RuntimeError(
+                        f"Query {execution['QueryExecutionId']} {status['State']}: "
+                        f"{status.get('StateChangeReason', '')}"))
+            # Ids Athena could not describe this round are simply polled again
+            with self.lock:
+                for unprocessed in response.get('UnprocessedQueryExecutionIds', []):
+                    query = self.running.get(unprocessed['QueryExecutionId'])
+                    if query:
+                        query['next_poll'] = now + query['delay']
+
+def list_tables_in_database(database_name, s3_output_location=None, use_cache=False, max_age=None):
     # Define the query to list the tables
     sql_query = f"SHOW TABLES IN {database_name}"
+    cache_key = {'region_name': athena_client.meta.region_name, 'output_location': s3_output_location}
+
+    # Serve a recent listing from the local cache (see athena_cache_func) when asked to
+    if use_cache:
+        cached = load_cached_result(sql_query, database_name, max_age=max_age, **cache_key)
+        if cached is not None:
+            return cached
 
     # Set up query execution parameters
     query_params = {
@@ -45,17 +255,38 @@ def list_tables_in_database(database_name, s3_output_location=None):
 
     # If the query was successful, fetch the results
     if status == 'SUCCEEDED':
-        result = athena_client.get_query_results(QueryExecutionId=query_execution_id)
+        paginator = athena_client.get_paginator('get_query_results')
         
         # Extract table names from the result
-        table_names = [row['Data'][0]['VarCharValue'] for row in result['ResultSet']['Rows']]
+        table_names = [row['Data'][0]['VarCharValue']
+                       for page in paginator.paginate(QueryExecutionId=query_execution_id)
+                       for row in page['ResultSet']['Rows']]
         
+        if use_cache:
+            save_cached_result(sql_query, database_name, table_names, query_execution_id=query_execution_id,
+                               **cache_key)
         return table_names
     else:
         print(f"Query failed with status: {status}")
         return []
 
 
+def _create_view_sql(table, database_name, view_name, select_clause='*', where_clause=None):
+    # Construct the SQL query with dynamic SELECT clause
+    sql_query = f"""
+    CREATE OR REPLACE VIEW {view_name} AS
+    SELECT {select_clause}
+    FROM "{database_name}".{table}
+    """
+
+    # Append the WHERE clause if provided
+    if where_clause:
+        sql_query += f" WHERE {where_clause};"
+    else:
+        sql_query += ";"
+    return sql_query
+
+
 def create_view_for_table(table, database_name, s3_output_location, view_name, select_clause='*', where_clause=None):
     """
     Create or replace a view for a specified table.
@@ -71,19 +302,7 @@ def create_view_for_table(table, database_name, s3_output_location, view_name, s
     Returns:
         str: The query execution status.
     """
-    # Construct the SQL query with dynamic SELECT clause
-    sql_query = f"""
-    CREATE OR REPLACE VIEW {view_name} AS
-    SELECT {select_clause}
-    FROM "{database_name}".{table}
-    """
-
-    # Append the WHERE clause if provided
-    if where_clause:
-        sql_query += f" WHERE {where_clause};"
-    else:
-        sql_query += ";"
-
+    sql_query = _create_view_sql(table, database_name, view_name, select_clause, where_clause)
     print(sql_query)
 
     # Start the query execution
@@ -103,49 +322,245 @@ def create_view_for_table(table, database_name, s3_output_location, view_name, s
     return status
 
 
-def query_athena_to_df(query, database, output_location, region_name='us-east-1'):
+def create_views_for_tables(tables, database_name, s3_output_location, view_name_format='{table}_view',
+                            select_clause='*', where_clause=None, max_concurrency=20, workgroup=None):
     """
-    Executes a query on AWS Athena and returns the results as a pandas DataFrame.
+    Create or replace views for many tables at once through an AthenaExecutor.
+
+    Args:
+        tables (list or dict): Table names, or {table: view_name}.
+        database_name (str): The Athena database where the queries will run.
+        s3_output_location (str): The S3 location to store query results.
+        view_name_format (str): View name for each table of a list, formatted with table=<name>.
+        select_clause (str, optional): The SELECT clause shared by every view. Defaults to '*'.
+        where_clause (str, optional): The WHERE condition shared by every view. Defaults to None.
+        max_concurrency (int): Concurrent DDL queries (Athena's DDL quota defaults to 20).
+        workgroup (str, optional): Athena workgroup.
+
+    Returns:
+        dict: {view_name: 'SUCCEEDED' or the failure message}.
+    """
+    if not isinstance(tables, dict):
+        tables = {table: view_name_format.format(table=table) for table in tables}
+
+    results = {}
+    with AthenaExecutor(database_name, s3_output_location, workgroup=workgroup,
+                        max_concurrency=max_concurrency) as athena:
+        futures = {view_name: athena.submit(_create_view_sql(table, database_name, view_name,
+                                                             select_clause, where_clause),
+                                            QueryExecutionContext={'Database': database_name,
+                                                                   'Catalog': 'AwsDataCatalog'})
+                   for table, view_name in tables.items()}
+        for view_name, future in futures.items():
+            try:
+                results[view_name] = future.result()['Status']['State']
+            except Exception as e:
+                results[view_name] = str(e)
+    failed = sum(state != 'SUCCEEDED' for state in results.values())
+    print(f"{len(results) - failed} views created, {failed} failed.")
+    return results
+
+
+# Athena column types that map to a pandas dtype; everything else stays object
+athena_dtypes = {
+    'boolean': 'boolean',
+    'tinyint': 'Int64',
+    'smallint': 'Int64',
+    'integer': 'Int64',
+    'bigint': 'Int64',
+    'float': 'float64',
+    'real': 'float64',
+    'double': 'float64',
+    'decimal': 'float64',
+}
+
+
+def _split_s3_uri(uri):
+    bucket_name, _, key = uri[len("s3://"):].partition("/")
+    return bucket_name, key
+
+
+# (region, workgroup) pairs that rejected ResultReuseConfiguration
+_reuse_unsupported = set()
+
+
+def _reuse_rejected(error):
+    """
+    True when start_query_execution failed because of ResultReuseConfiguration
+    itself: engine version 2 workgroups answer InvalidRequestException about
+    result reuse, older botocore releases do not know the parameter.
+    """
+    if isinstance(error, ParamValidationError):
+        return 'ResultReuseConfiguration' in str(error)
+    if isinstance(error, ClientError) and error.response['Error']['Code'] == 'InvalidRequestException':
+        message = error.response['Error'].get('Message', '').lower()
+        return 'resultreuse' in message or 'result reuse' in message
+    return False
+
+
+def _run_query(client, query, database, output_location, workgroup=None, reuse_max_age=None):
+    params = {
+        'QueryString': query,
+        'QueryExecutionContext': {'Database': database},
+        'ResultConfiguration': {'OutputLocation': output_location},
+    }
+    if workgroup:
+        params['WorkGroup'] = workgroup
+    if reuse_max_age and is_cacheable(query):
+        # Let Athena return a previous result of the same query instead of scanning again
+        params['ResultReuseConfiguration'] = {'ResultReuseByAgeConfiguration': {
+            'Enabled': True, 'MaxAgeInMinutes': max(1, int(reuse_max_age // 60))}}
+    reuse_key = (client.meta.region_name, workgroup)
+    if reuse_key in _reuse_unsupported:
+        params.pop('ResultReuseConfiguration', None)
+    try:
+        query_execution_id = client.start_query_execution(**params)['QueryExecutionId']
+    except (ClientError, ParamValidationError) as e:
+        if 'ResultReuseConfiguration' not in params or not _reuse_rejected(e):
+            raise
+        _reuse_unsupported.add(reuse_key)
+        del params['ResultReuseConfiguration']
+        query_execution_id = client.start_query_execution(**params)['QueryExecutionId']
+
+    state = wait_for_query_to_finish(query_execution_id, client=client)
+    if state != 'SUCCEEDED':
+        raise Exception(f"Query failed or was cancelled: {state}")
+    return client.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']
+
+
+def iter_athena_results(query_execution, chunksize=100000, region_name='us-east-1'):
+    """
+    Streams the CSV result of a finished query into DataFrame chunks.
+
+    The S3 body is parsed as it downloads, so memory is bounded by chunksize
+    rather than the result size. Column types come from the query's
+    ResultSetMetadata: integers become nullable Int64, booleans boolean,
+    floating point and decimal float64, date/timestamp datetime64, and
+    strings stay strings (no guessing, so '00123' keeps its zeros).
 
     Parameters:
-        query (str): SQL query to execute.
+        query_execution (dict or str): the QueryExecution dict (e.g. from AthenaExecutor) or its id.
+        chunksize (int): rows per DataFrame.
+        region_name (str): AWS region where Athena is hosted.
+
+    Returns:
+        generator of pd.DataFrame
+    """
+    import pandas as pd
+
+    client = get_client('athena', region_name=region_name)
+    if isinstance(query_execution, str):
+        query_execution = client.get_query_execution(QueryExecutionId=query_execution)['QueryExecution']
+
+    metadata = client.get_query_results(QueryExecutionId=query_execution['QueryExecutionId'], MaxResults=1)
+    dtype, parse_dates = {}, []
+    for column in metadata['ResultSet']['ResultSetMetadata']['ColumnInfo']:
+        if column['Type'] in ('date', 'timestamp'):
+            parse_dates.append(column['Name'])
+        else:
+            dtype[column['Name']] = athena_dtypes.get(column['Type'], 'object')
+
+    bucket_name, key = _split_s3_uri(query_execution['ResultConfiguration']['OutputLocation'])
+    body = get_client('s3').get_object(Bucket=bucket_name, Key=key)['Body']
+    with pd.read_csv(body, dtype=dtype, parse_dates=parse_dates, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def unload_athena_query(query, database, output_location, region_name='us-east-1', workgroup=None):
+    """
+    Runs a SELECT as UNLOAD to Parquet under <output_location>unload/<uuid>/.
+
+    Athena writes the result as several compressed Parquet files in
+    parallel, which is much faster to produce and to read back than the
+    single CSV result file of a plain query.
+
+    Returns:
+        tuple: (bucket_name, prefix) of the Parquet files.
+    """
+    import uuid
+
+    client = get_client('athena', region_name=region_name)
+    unload_location = f"{output_location.rstrip('/')}/unload/{uuid.uuid4()}/"
+    _run_query(client, f"UNLOAD ({query}) TO '{unload_location}' WITH (format = 'PARQUET')",
+               database, output_location, workgroup=workgroup)
+    return _split_s3_uri(unload_location)
+
+
+def iter_athena_query(query, database, output_location, method='csv', chunksize=100000,
+                      region_name='us-east-1', workgroup=None, max_workers=8, reuse_max_age=None):
+    """
+    Runs a query and yields its result as DataFrames, for results larger than memory.
+
+    Parameters:
+        query (str): SQL query to execute (a SELECT when method='unload').
         database (str): Athena database to query.
         output_location (str): S3 location where query results are stored, e.g. 's3://your-bucket/folder/'.
+        method (str): 'csv' streams the result CSV in chunksize rows; 'unload' writes
+            Parquet with UNLOAD and yields one DataFrame per row group, read in parallel.
+        chunksize (int): rows per DataFrame for method='csv'.
         region_name (str): AWS region where Athena is hosted.
+        workgroup (str, optional): Athena workgroup.
+        max_workers (int): concurrent Parquet downloads for method='unload'.
+        reuse_max_age (float, optional): seconds within which Athena may reuse a previous
+            result of the same query (method='csv' only).
 
     Returns:
-        pd.DataFrame: Query results as a DataFrame.
+        generator of pd.DataFrame
     """
-    client = boto3.client('athena', region_name=region_name)
+    if method == 'unload':
+        from shared_func.s3_func import iter_parquet_folder_from_s3
 
-    # Start query execution
-    response = client.start_query_execution(
-        QueryString=query,
-        QueryExecutionContext={'Database': database},
-        ResultConfiguration={'OutputLocation': output_location}
-    )
-    query_execution_id = response['QueryExecutionId']
+        bucket_name, prefix = unload_athena_query(query, database, output_location,
+                                                  region_name=region_name, workgroup=workgroup)
+        for table in iter_parquet_folder_from_s3(bucket_name, prefix, max_workers=max_workers, suffix=None):
+            yield table.to_pandas()
+    elif method == 'csv':
+        client = get_client('athena', region_name=region_name)
+        query_execution = _run_query(client, query, database, output_location, workgroup=workgroup,
+                                     reuse_max_age=reuse_max_age)
+        yield from iter_athena_results(query_execution, chunksize=chunksize, region_name=region_name)
+    else:
+        raise ValueError(f"Unknown method: {method} (use 'csv' or 'unload')")
 
-    # Wait for the query to finish
-    while True:
-        status = client.get_query_execution(QueryExecutionId=query_execution_id)
-        state = status['QueryExecution']['Status']['State']
-        if state in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-            break
-        time.sleep(1)
 
-    if state != 'SUCCEEDED':
-        raise Exception(f"Query failed or was cancelled: {state}")
+def query_athena_to_df(query, database, output_location, region_name='us-east-1', method='csv', workgroup=None,
+                       use_cache=False, max_age=None):
+    """
+    Executes a query on AWS Athena and returns the results as a pandas DataFrame.
 
-    # Get result file from S3
-    result_file = f"{output_location}{query_execution_id}.csv"
-    s3 = boto3.client('s3')
-    parsed = boto3.session.Session().resource('s3')
-    bucket_name = result_file.split('/')[2]
-    key = '/'.join(result_file.split('/')[3:])
-    obj = parsed.Object(bucket_name, key)
-    data = obj.get()['Body'].read().decode('utf-8')
+    Parameters:
+        query (str): SQL query to execute.
+        database (str): Athena database to query.
+        output_location (str): S3 location where query results are stored, e.g. 's3://your-bucket/folder/'.
+        region_name (str): AWS region where Athena is hosted.
+        method (str): 'csv' or 'unload' (faster for large SELECTs), see iter_athena_query.
+        workgroup (str, optional): Athena workgroup.
+        use_cache (bool): serve SELECT/WITH/SHOW results from the local cache
+            (athena_cache_func) and let Athena reuse recent results; by default the query always runs.
+        max_age (float, optional): seconds a cached or reused result is acceptable
+            (default ATHENA_CACHE_MAX_AGE).
 
-    # Load CSV into pandas DataFrame
-    return pd.read_csv(io.StringIO(data))
+    Returns:
+        pd.DataFrame: Query results as a DataFrame.
+    """
+    import pandas as pd
+
+    use_cache = use_cache and is_cacheable(query)
+    if use_cache:
+        cached = load_cached_result(query, database, workgroup=workgroup, max_age=max_age,
+                                    region_name=region_name, output_location=output_location)
+        if cached is not None:
+            return cached
+
+    reuse_max_age = (default_max_age if max_age is None else max_age) if use_cache else None
+    chunks = list(iter_athena_query(query, database, output_location, method=method, region_name=region_name,
+                                    workgroup=workgroup, reuse_max_age=reuse_max_age))
+    if not chunks:
+        df = pd.DataFrame()
+    else:
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
 
+    if use_cache:
+        save_cached_result(query, database, df, workgroup=workgroup,
+                           region_name=region_name, output_location=output_location)
+    return df
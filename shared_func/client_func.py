@@ -0,0 +1,155 @@
+import os
+import threading
+
+# boto3/botocore are imported on first use so that importing shared_func modules
+# stays cheap; see benchmark-import_time.py.
+
+_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+_local = threading.local()
+_default_config = None
+
+
+def get_default_config():
+    """
+    Returns the botocore Config shared by every cached client: a large
+    connection pool with TCP keep-alive and adaptive retries. Override the pool
+    size with the AWS_MAX_POOL_CONNECTIONS environment variable when running
+    wide thread pools.
+    """
+    global _default_config
+    if _default_config is None:
+        from botocore.config import Config
+        _default_config = Config(
+            max_pool_connections=int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", 50)),
+            tcp_keepalive=True,
+            retries={'max_attempts': 10, 'mode': 'adaptive'}
+        )
+    return _default_config
+
+
+def get_session(profile_name=None, region_name=None):
+    """
+    Returns a cached boto3 Session for the given profile and region.
+
+    Args:
+    - profile_name (str, optional): the AWS profile to use (default credential chain if None)
+    - region_name (str, optional): the AWS region (default region if None)
+
+    Returns:
+    - boto3.Session: a session shared by every caller with the same profile and region
+    """
+    cache_key = (profile_name, region_name)
+    session = _sessions.get(cache_key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(cache_key)
+            if session is None:
+                import boto3
+                session = boto3.Session(profile_name=profile_name, region_name=region_name)
+                _sessions[cache_key] = session
+    return session
+
+
+def get_client(service_name, region_name=None, profile_name=None, endpoint_url=None, config=None):
+    """
+    Returns a cached low-level client, creating it on first use.
+
+    Clients are thread-safe, so a single instance per (service, region, profile,
+    endpoint_url) is shared by every thread and keeps its connection pool warm
+    between calls.
+
+    Args:
+    - service_name (str): the AWS service name, e.g. 's3' or 'dynamodb'
+    - region_name (str, optional): the AWS region
+    - profile_name (str, optional): the AWS profile
+    - endpoint_url (str, optional): a custom endpoint (e.g. LocalStack)
+    - config (botocore.config.Config, optional): merged on top of get_default_config()
+
+    Returns:
+    - botocore.client.BaseClient: the cached client
+    """
+    cache_key = (service_name, region_name, profile_name, endpoint_url, id(config) if config else None)
+    client = _clients.get(cache_key)
+    if client is None:
+        session = get_session(profile_name, region_name)
+        client_config = get_default_config().merge(config) if config else get_default_config()
+        with _lock:
+            client = _clients.get(cache_key)
+            if client is None:
+                client = session.client(service_name, region_name=region_name,
+                                        endpoint_url=endpoint_url, config=client_config)
+                _clients[cache_key] = client
+    return client
+
+
+def get_resource(service_name, region_name=None, profile_name=None, endpoint_url=None):
+    """
+    Returns a cached resource object for the calling thread.
+
+    boto3 resources are not thread-safe, so they are cached per thread. Each
+    resource reuses the pooled configuration of get_default_config().
+
+    Args:
+    - service_name (str): the AWS service name, e.g. 's3' or 'dynamodb'
+    - region_name (str, optional): the AWS region
+    - profile_name (str, optional): the AWS profile
+    - endpoint_url (str, optional): a custom endpoint
+
+    Returns:
+    - boto3.resources.base.ServiceResource: the cached resource
+    """
+    resources = getattr(_local, "resources", None)
+    if resources is None:
+        resources = _local.resources = {}
+    cache_key = (service_name, region_name, profile_name, endpoint_url)
+    resource = resources.get(cache_key)
+    if resource is None:
+        # Sessions are not thread-safe either, so every thread builds its own
+        import boto3
+        session = boto3.Session(profile_name=profile_name, region_name=region_name)
+        resource = session.resource(service_name, region_name=region_name,
+                                    endpoint_url=endpoint_url, config=get_default_config())
+        resources[cache_key] = resource
+    return resource
+
+
+def clear_clients():
+    """
+    Drops every cached session, client and the calling thread's resources,
+    e.g. after switching credentials or AWS profiles.
+    """
+    with _lock:
+        _sessions.clear()
+        _clients.clear()
+    _local.resources = {}
+
+
+class LazyClient:
+    """
+    Placeholder for a module-level client that is only created (through
+    get_client) the first time one of its attributes is used, so importing a
+    module does not build clients or resolve credentials.
+    """
+
+    def __init__(self, service_name, **kwargs):
+        self._service_name = service_name
+        self._kwargs = kwargs
+
+    def __getattr__(self, name):
+        return getattr(get_client(self._service_name, **self._kwargs), name)
+
+
+def lazy_client(service_name, **kwargs):
+    """
+    Returns a LazyClient for use as a module-level client.
+
+    Args:
+    - service_name (str): the AWS service name
+    - **kwargs: forwarded to get_client (region_name, profile_name, endpoint_url, config)
+
+    Returns:
+    - LazyClient: resolves to the cached client on first use
+    """
+    return LazyClient(service_name, **kwargs)
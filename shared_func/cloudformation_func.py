@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 from botocore.exceptions import ClientError
 
 def list_cloudformation_stacks():
@@ -9,7 +9,7 @@ def list_cloudformation_stacks():
         A list of dictionaries containing stack names and their statuses.
     """
     try:
-        client = boto3.client('cloudformation')
+        client = get_client('cloudformation')
         response = client.list_stacks(StackStatusFilter=[
             'CREATE_COMPLETE', 'UPDATE_COMPLETE', 'ROLLBACK_COMPLETE', 
             'DELETE_FAILED', 'CREATE_FAILED', 'UPDATE_ROLLBACK_FAILED',
@@ -39,7 +39,7 @@ def delete_cloudformation_stack(stack_name):
         bool: True if deletion was initiated successfully, False otherwise.
     """
     try:
-        client = boto3.client('cloudformation')
+        client = get_client('cloudformation')
         client.delete_stack(StackName=stack_name)
         print(f"Deletion of stack '{stack_name}' initiated successfully.")
         return True
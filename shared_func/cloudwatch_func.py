@@ -1,9 +1,9 @@
-import boto3
+from shared_func.client_func import get_client
 import time
 
 def delete_log_group(log_group_name):
     # create a CloudWatch Logs client
-    client = boto3.client('logs')
+    client = get_client('logs')
 
     # list all log streams within the log group
     response = client.describe_log_streams(
@@ -29,7 +29,7 @@ def delete_log_group(log_group_name):
 
 def create_log_stream(log_group_name, log_stream_name):
     # create a CloudWatch Logs client
-    client = boto3.client('logs')
+    client = get_client('logs')
 
     # create a new log stream
     response = client.create_log_stream(logGroupName=log_group_name, logStreamName=log_stream_name)
@@ -39,7 +39,7 @@ def create_log_stream(log_group_name, log_stream_name):
 
 def create_log_group(log_group_name):
     # create a CloudWatch Logs client
-    client = boto3.client('logs')
+    client = get_client('logs')
 
     # create the log group
     response = client.create_log_group(logGroupName=log_group_name)
@@ -52,7 +52,7 @@ def create_log_group(log_group_name):
 
 def get_log_events(log_group_name, log_stream_name):
     # create a CloudWatch Logs client
-    client = boto3.client('logs')
+    client = get_client('logs')
 
     # get the log events from the log stream
     response = client.get_log_events(
@@ -64,7 +64,7 @@ def get_log_events(log_group_name, log_stream_name):
 
 def send_log_data(log_group_name, log_stream_name, log_data):
     # create a CloudWatch Logs client
-    client = boto3.client('logs')
+    client = get_client('logs')
 
     # put log event to the new log stream
     log_event = {
@@ -82,7 +82,7 @@ def get_cloudwatch_log_groups(region_name='us-east-1'):
     """
     try:
         # Create a boto3 client for CloudWatch Logs
-        client = boto3.client('logs', region_name=region_name)
+        client = get_client('logs', region_name=region_name)
 
         log_groups = []
         paginator = client.get_paginator('describe_log_groups')
@@ -0,0 +1,287 @@
+import ast
+import contextlib
+import importlib
+import io
+import os
+import shlex
+import traceback
+
+# Subcommand registry used by awsctl.py.
+# "<service> <action>": (shared_func module, function, help text)
+# Modules are only imported when one of their commands is run.
+COMMANDS = {
+    "athena tables": ("athena_func", "list_tables_in_database", "List tables: <database> [s3_output_location]"),
+    "athena views": ("athena_func", "create_views_for_tables", "Create views: tables=[...] database_name=<db> s3_output_location=<s3>"),
+    "athena query": ("athena_func", "query_athena_to_df", "Run a query: <query> <database> <output_location>"),
+    "cf list": ("cloudformation_func", "list_cloudformation_stacks", "List CloudFormation stacks"),
+    "cf delete": ("cloudformation_func", "delete_cloudformation_stack", "Delete a stack: <stack_name>"),
+    "dynamodb list": ("dynamo_func", "list_dynamodb_tables", "List DynamoDB tables"),
+    "dynamodb get": ("dynamo_func", "retrieve_from_dynamodb", "Get an item: <table_name> key={...}"),
+    "dynamodb todf": ("dynamo_func", "dynamodb_to_dataframe", "Load a table into a DataFrame: <table_name>"),
+    "dynamodb export": ("dynamo_func", "export_dynamodb_to_parquet", "Export to Parquet: <table_name> <folder or s3://bucket/prefix>"),
+    "dynamodb empty": ("dynamo_func", "empty_dynamodb_table", "Delete every item in a table: <table_name>"),
+    "ec2 list": ("ec2_func", "list_ec2_instances", "List EC2 instances"),
+    "ec2 on": ("ec2_func", "turn_on_ec2", "Start an instance: <instance_id>"),
+    "ec2 off": ("ec2_func", "turn_off_ec2", "Stop an instance: <instance_id>"),
+    "ecr list": ("ecr_func", "list_ecr_repositories", "List ECR repositories"),
+    "glue schema": ("glue_func", "glue_retrieves_table_details", "Table columns: <database> <table>"),
+    "glue partitions": ("glue_func", "register_partitions_from_s3", "Register new S3 partitions: <database> <table>"),
+    "glue crawl": ("glue_func", "start_crawler", "Start a crawler: <crawler_name>"),
+    "iam users": ("iam_func", "list_users", "List IAM users"),
+    "iam roles": ("iam_func", "list_roles", "List IAM roles"),
+    "iam groups": ("iam_func", "list_iam_groups", "List IAM groups"),
+    "iam report": ("iam_func", "get_report", "IAM users and access keys report"),
+    "kms list": ("kms_func", "list_kms_keys", "List KMS keys"),
+    "lambda list": ("lambda_func", "list_functions", "List Lambda functions"),
+    "logs groups": ("cloudwatch_func", "get_cloudwatch_log_groups", "List CloudWatch log groups"),
+    "mysql apply": ("sql_func", "apply_sql_file_from_s3", "Apply an S3 SQL script in parallel batches: <bucket> <key>"),
+    "mysql export": ("sql_func", "export_mysql_to_s3_parquet", "Stream a query to S3 Parquet: <query> <bucket> <prefix>"),
+    "s3 exists": ("s3_func", "check_object_exists", "Check an object: <bucket> <key>"),
+    "s3 ls": ("s3_func", "list_objects", "Search a folder: <bucket> <folder> search_strings=[...]"),
+    "s3 download": ("s3_func", "download_file_from_s3", "Download: <bucket> <key> <destination_path>"),
+    "s3 upload": ("s3_func", "upload_file", "Upload: <file_name> <bucket> [object_name]"),
+    "s3 rm-folder": ("s3_func", "delete_all_s3_files_in_folder", "Delete a folder: <bucket> <folder>"),
+    "s3 sync-up": ("s3_func", "sync_folder_to_s3", "Incremental upload: <local_dir> <bucket> <prefix>"),
+    "s3 sync-down": ("s3_func", "sync_s3_to_folder", "Incremental download: <bucket> <prefix> <local_dir>"),
+    "secrets list": ("secret_manager_func", "list_secrets", "List Secrets Manager secrets"),
+    "secrets get": ("secret_manager_func", "get_secret", "Get a secret: <secret_name>"),
+    "sns list": ("sns_func", "list_sns_topics", "List SNS topics"),
+    "sns publish": ("sns_func", "publish_to_topic", "Publish: <topic_arn> <message>"),
+    "sqs list": ("sqs_func", "list_sqs_queues", "List SQS queues"),
+    "sqs send": ("sqs_func", "send_message_to_queue", "Send a message: <queue_url> <message_body>"),
+    "sqs count": ("sqs_func", "get_approximate_message_count", "Approximate message count: <queue_url>"),
+    "ssm get": ("parameter_store_func", "get_ssm_parameter", "Get a parameter: <parameter_name>"),
+}
+
+
+def resolve(name):
+    """Imports the module behind a registered command and returns its function."""
+    module_name, func_name, _ = COMMANDS[name]
+    module = importlib.import_module(f"shared_func.{module_name}")
+    return getattr(module, func_name)
+
+
+def parse_value(token):
+    # Literals (numbers, True/False, lists, dicts) are converted, everything else stays a string.
+    # Only used for key=value arguments: positional tokens are names, keys or ids and stay strings.
+    try:
+        return ast.literal_eval(token)
+    except (ValueError, SyntaxError):
+        return token
+
+
+def split_command(tokens):
+    """
+    Splits a token list into (command name, args, kwargs).
+
+    The command is the longest registered prefix ("s3 ls"); the remaining
+    tokens are positional string arguments, except key=value pairs which
+    become keyword arguments with literal values (numbers, lists, dicts,
+    True/False/None) converted.
+    """
+    for size in (2, 1):
+        name = " ".join(tokens[:size])
+        if name in COMMANDS:
+            break
+    else:
+        raise KeyError(f"Unknown command: {' '.join(tokens[:2])}")
+
+    args, kwargs = [], {}
+    for token in tokens[size:]:
+        key, sep, value = token.partition("=")
+        if sep and key.isidentifier():
+            kwargs[key] = parse_value(value)
+        else:
+            args.append(token)
+    return name, args, kwargs
+
+
+def run_command(tokens):
+    """Runs a command given as a token list and returns the function's result."""
+    name, args, kwargs = split_command(tokens)
+    return resolve(name)(*args, **kwargs)
+
+
+def format_help():
+    lines = ["Commands:"]
+    for name, (_, _, help_text) in sorted(COMMANDS.items()):
+        lines.append(f"  {name:20} {help_text}")
+    return "\n".join(lines)
+
+
+def execute_line(line, capture=True, status=False):
+    """
+    Runs one command line. Errors are reported instead of being raised, so a
+    long running shell or daemon survives a failed command.
+
+    Args:
+    - line (str): the command line, e.g. "s3 exists my-bucket my/key"
+    - capture (bool): return the printed output instead of writing it to stdout
+    - status (bool): also return whether the command succeeded
+
+    Returns:
+    - str: the captured output (empty string when capture is False),
+      or (output, ok) when status is True
+    """
+    buffer = io.StringIO()
+    output = contextlib.redirect_stdout(buffer) if capture else contextlib.nullcontext()
+    ok = True
+    with output:
+        try:
+            tokens = shlex.split(line)
+            if tokens == ["help"]:
+                print(format_help())
+            else:
+                result = run_command(tokens)
+                if result is not None:
+                    print(result)
+        except Exception:
+            ok = False
+            traceback.print_exc(file=buffer if capture else None)
+    return (buffer.getvalue(), ok) if status else buffer.getvalue()
+
+
+def interactive_shell():
+    """
+    Reads commands until 'exit'. Imported modules, boto3 sessions and clients
+    stay warm between commands, so only the first one pays the startup cost.
+    """
+    print("awsctl interactive mode. Type 'help' for commands, 'exit' to quit.")
+    while True:
+        try:
+            line = input("awsctl> ").strip()
+        except EOFError:
+            break
+        if line in ("exit", "quit"):
+            break
+        if line:
+            execute_line(line, capture=False)
+
+
+def default_socket_path():
+    return os.environ.get("AWSCTL_SOCKET", os.path.expanduser("~/.awsctl.sock"))
+
+
+def _authkey_path(socket_path):
+    return f"{socket_path}.key"
+
+
+def _read_authkey(socket_path):
+    try:
+        with open(_authkey_path(socket_path), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+# AWS_* variables of the previous daemon request, see _client_context
+_last_aws_env = None
+
+
+@contextlib.contextmanager
+def _client_context(cwd, env):
+    """
+    Runs a daemon request in the client's working directory and environment,
+    so relative paths, AWS_PROFILE or AWS_REGION mean the same as without the
+    daemon. Cached AWS clients are dropped when the client's AWS_* variables
+    differ from the previous request's.
+    """
+    global _last_aws_env
+    aws_env = sorted((key, value) for key, value in env.items() if key.startswith("AWS_"))
+    if aws_env != _last_aws_env:
+        from shared_func.client_func import clear_clients
+        clear_clients()
+        _last_aws_env = aws_env
+
+    previous_cwd, previous_env = os.getcwd(), dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        os.chdir(cwd)
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        os.environ.clear()
+        os.environ.update(previous_env)
+
+
+def _handle_request(request):
+    """Runs one daemon request ({'line', 'cwd', 'env'}) and returns {'output', 'ok'}."""
+    try:
+        with _client_context(request["cwd"], request["env"]):
+            output, ok = execute_line(request["line"], status=True)
+    except OSError as e:
+        # e.g. the client's working directory is not visible to the daemon
+        output, ok = f"awsctl daemon: {e}\n", False
+    return {"output": output, "ok": ok}
+
+
+def serve(socket_path=None):
+    """
+    Runs a daemon that executes command lines sent by send_to_daemon over a
+    Unix socket, keeping credentials and clients warm between invocations.
+    Each command runs in the sending client's working directory and
+    environment. Commands run one at a time; interactive commands (menus) are
+    not supported. A client that fails or disconnects mid-request only loses
+    its own request.
+    """
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Listener
+
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # The socket and its key are only reachable by the current user; clients must
+    # also prove they know the per-daemon key before anything is unpickled
+    old_umask = os.umask(0o177)
+    try:
+        authkey = os.urandom(32)
+        with open(_authkey_path(socket_path), "wb") as f:
+            f.write(authkey)
+        listener = Listener(socket_path, family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(old_umask)
+
+    print(f"awsctl daemon listening on {socket_path}")
+    try:
+        with listener:
+            while True:
+                try:
+                    with listener.accept() as conn:
+                        request = conn.recv()
+                        if request["line"] == "shutdown":
+                            conn.send({"output": "awsctl daemon stopped.\n", "ok": True})
+                            break
+                        conn.send(_handle_request(request))
+                except (AuthenticationError, EOFError, OSError):
+                    # The client went away or failed the handshake
+                    continue
+                except Exception:
+                    traceback.print_exc()
+    finally:
+        for path in (socket_path, _authkey_path(socket_path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def send_to_daemon(line, socket_path=None):
+    """
+    Sends a command line, with the current working directory and
+    environment, to a running daemon.
+
+    Returns:
+    - tuple: (output, ok), or None when no daemon is listening
+    """
+    from multiprocessing.connection import Client
+
+    socket_path = socket_path or default_socket_path()
+    authkey = _read_authkey(socket_path)
+    if not os.path.exists(socket_path) or authkey is None:
+        return None
+    try:
+        with Client(socket_path, family="AF_UNIX", authkey=authkey) as conn:
+            conn.send({"line": line, "cwd": os.getcwd(), "env": dict(os.environ)})
+            response = conn.recv()
+            return response["output"], response["ok"]
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
@@ -1,9 +1,8 @@
 import time
 import uuid
 import json
-import requests
 import os
-import boto3 
+from shared_func.client_func import get_client
 
 def comprehend_text(text):
     """
@@ -15,7 +14,7 @@ def comprehend_text(text):
     Returns:
     - lang_code (str): the language code of the detected language
     """
-    comprehend = boto3.client('comprehend')
+    comprehend = get_client('comprehend')
     
     # Detect the dominant language of the input text
     response = comprehend.detect_dominant_language(Text=text)
@@ -36,7 +35,7 @@ def translate_text(text, lang_code, target_lang_code='en'):
     Returns:
     - translated_text (str): the translated text
     """
-    translate = boto3.client('translate')
+    translate = get_client('translate')
     
     # Translate the input text to English
     response = translate.translate_text(
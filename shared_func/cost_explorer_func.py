@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 from datetime import datetime, timedelta
 import calendar
 
@@ -15,7 +15,7 @@ def get_s3_cost(d=0, service='Amazon Simple Storage Service', granularity='DAILY
     Returns:
         float: Total cost for the specified service and period
     """
-    ce = boto3.client('ce')
+    ce = get_client('ce')
     
     if granularity == 'MONTHLY':
         # Get the target month
@@ -1,38 +1,203 @@
+import atexit
 import json
 import os
-import boto3
+from shared_func.client_func import get_client, get_resource
 from botocore.exceptions import ClientError
+import collections
 import concurrent.futures
-import pandas as pd
+import random
+import time
+import queue
+import threading
+import warnings
 
-def insert_into_dynamodb_batch(table_name, items):
+class RateLimiter:
+    """
+    Thread-safe token bucket: acquire(n) blocks until n units are available,
+    refilling at rate units per second (burst of up to one second).
     """
-    Inserts multiple items into a DynamoDB table in batches.
 
-    Parameters:
-    - table_name (str): The name of the DynamoDB table to insert the items into.
-    - items (list): A list of dictionaries representing the items to insert.
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
 
-    Returns:
-    - None
+    def acquire(self, amount=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount or self.tokens >= self.rate:
+                    self.tokens -= amount
+                    return
+                wait = (min(amount, self.rate) - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _backoff(attempt, base=0.05, cap=5.0):
+    # Exponential backoff with full jitter
+    time.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+
+
+def get_key_names(table_name):
+    """Returns the key attribute names (partition key first) of a DynamoDB table."""
+    key_schema = get_client('dynamodb').describe_table(TableName=table_name)['Table']['KeySchema']
+    return [k['AttributeName'] for k in sorted(key_schema, key=lambda k: k['KeyType'] != 'HASH')]
+
+
+class DynamoBatchWriter:
+    """
+    Concurrent batch_write_item writer for wire-format items.
+
+    Requests are grouped into 25-item batches and up to max_workers batches
+    are in flight at once. UnprocessedItems are retried with jittered
+    exponential backoff, duplicate keys within a batch are collapsed (last
+    write wins, as DynamoDB rejects duplicates; deduplicate=False turns this
+    off for callers whose keys are known to be unique), and writes can be throttled
+    client-side to a target WCU. Requests still unprocessed after max_retries
+    are kept in failed_requests and reported when the writer is closed.
+
+    Example:
+        with DynamoBatchWriter('my-table', target_wcu=500) as writer:
+            writer.write_all(items)
+        print(writer.metrics)
     """
-    # Create a DynamoDB client
-    dynamodb = boto3.client('dynamodb')
 
-    # Determine the maximum number of items per batch (25 items is the maximum allowed by DynamoDB)
-    max_items_per_batch = 25
+    batch_size = 25
+
+    def __init__(self, table_name, max_workers=4, max_retries=8, target_wcu=None, key_names=None,
+                 deduplicate=True, verbose=False):
+        self.table_name = table_name
+        self.max_retries = max_retries
+        self.verbose = verbose
+        self.deduplicate = deduplicate
+        self.dynamodb = get_client('dynamodb')
+        self.key_names = key_names or (get_key_names(table_name) if deduplicate else None)
+        self.limiter = RateLimiter(target_wcu) if target_wcu else None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.slots = threading.BoundedSemaphore(max_workers * 2)
+        self.futures = []
+        self.batch = {}
+        self.lock = threading.Lock()
+        self.failed_requests = []
+        self.metrics = {'requests': 0, 'written': 0, 'batches': 0, 'retries': 0, 'unprocessed': 0,
+                        'duplicates': 0, 'failed': 0, 'seconds': 0.0, 'items_per_sec': 0.0}
+        self.started = time.perf_counter()
+
+    def put(self, item):
+        """Queues a PutRequest for a wire-format item."""
+        self._add({'PutRequest': {'Item': item}}, item)
+
+    def delete(self, key):
+        """Queues a DeleteRequest for a wire-format key."""
+        self._add({'DeleteRequest': {'Key': key}}, key)
+
+    def write_all(self, items):
+        """Queues a PutRequest for every item of a (possibly streaming) iterable."""
+        for item in items:
+            self.put(item)
+
+    def _add(self, request, attributes):
+        if self.deduplicate:
+            key = tuple(json.dumps(attributes[name], sort_keys=True) for name in self.key_names)
+        else:
+            key = len(self.batch)
+        if key in self.batch:
+            self.metrics['duplicates'] += 1
+        self.batch[key] = request
+        self.metrics['requests'] += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Submits the pending partial batch."""
+        if not self.batch:
+            return
+        requests, self.batch = list(self.batch.values()), {}
+        # Blocks the producer while enough batches are queued
+        self.slots.acquire()
+        future = self.executor.submit(self._write_batch, requests)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+        # Drop finished futures so long streams do not accumulate them
+        if len(self.futures) > 1000:
+            self.futures = [f for f in self.futures if not f.done() or f.exception()]
+
+    def _write_batch(self, requests):
+        if self.limiter:
+            self.limiter.acquire(sum(self._estimate_wcu(r) for r in requests))
+        for attempt in range(self.max_retries + 1):
+            response = self.dynamodb.batch_write_item(RequestItems={self.table_name: requests})
+            unprocessed = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            with self.lock:
+                self.metrics['batches'] += 1
+                self.metrics['written'] += len(requests) - len(unprocessed)
+                self.metrics['unprocessed'] += len(unprocessed)
+            if not unprocessed:
+                return
+            if attempt == self.max_retries:
+                with self.lock:
+                    self.metrics['failed'] += len(unprocessed)
+                    self.failed_requests.extend(unprocessed)
+                return
+            with self.lock:
+                self.metrics['retries'] += 1
+            requests = unprocessed
+            _backoff(attempt)
+
+    @staticmethod
+    def _estimate_wcu(request):
+        # One WCU per started KB of item size (deletes cost at least one)
+        body = request.get('PutRequest', {}).get('Item') or request['DeleteRequest']['Key']
+        return max(1, -(-len(json.dumps(body, default=str)) // 1024))
+
+    def close(self):
+        """Flushes, waits for every in-flight batch and finalizes the metrics."""
+        self.flush()
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.executor.shutdown(wait=True)
+            self.metrics['seconds'] = time.perf_counter() - self.started
+            if self.metrics['seconds']:
+                self.metrics['items_per_sec'] = self.metrics['written'] / self.metrics['seconds']
+            if self.verbose:
+                print(f"Wrote {self.metrics['written']} items in {self.metrics['batches']} batch calls "
+                      f"({self.metrics['retries']} retries, {self.metrics['failed']} failed) "
+                      f"in {self.metrics['seconds']:.1f}s ({self.metrics['items_per_sec']:.0f} items/s).")
+        if self.failed_requests:
+            raise RuntimeError(f"{len(self.failed_requests)} requests to {self.table_name} were still "
+                               f"unprocessed after {self.max_retries} retries (see failed_requests).")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
 
-    # Split the items into batches
-    batches = [items[i:i+max_items_per_batch] for i in range(0, len(items), max_items_per_batch)]
+def insert_into_dynamodb_batch(table_name, items, max_workers=4, target_wcu=None):
+    """
+    Inserts multiple items into a DynamoDB table in batches.
 
-    # Perform batch write operations for each batch of items
-    for batch in batches:
-        # Create a batch write request
-        batch_items = [{'PutRequest': {'Item': item}} for item in batch]
-        request_items = {table_name: batch_items}
+    Parameters:
+    - table_name (str): The name of the DynamoDB table to insert the items into.
+    - items (iterable): Dictionaries (DynamoDB wire format) representing the items to insert; may be a generator.
+    - max_workers (int): Number of batch_write_item calls in flight.
+    - target_wcu (int, optional): Client-side write capacity limit.
 
-        # Batch write items to DynamoDB
-        dynamodb.batch_write_item(RequestItems=request_items)
+    Returns:
+    - dict: the DynamoBatchWriter metrics
+    """
+    with DynamoBatchWriter(table_name, max_workers=max_workers, target_wcu=target_wcu) as writer:
+        writer.write_all(items)
+    return writer.metrics
 
 def insert_into_dynamodb(table_name, dct):
     """
@@ -46,7 +211,7 @@ def insert_into_dynamodb(table_name, dct):
     - None
     """
     # Create a DynamoDB resource
-    dynamodb = boto3.resource('dynamodb')
+    dynamodb = get_resource('dynamodb')
     # Retrieve the specified table
     table = dynamodb.Table(table_name)
     # Insert the item into the table
@@ -63,20 +228,233 @@ def list_dynamodb_tables():
     - List of strings representing the names of the DynamoDB tables.
     """
     # Create a DynamoDB client
-    dynamodb = boto3.client('dynamodb')
+    dynamodb = get_client('dynamodb')
     # Call the list_tables method to retrieve a list of table names
     table_list = dynamodb.list_tables()['TableNames']
     # Return the list of table names
     return table_list
 
-def retrieve_from_dynamodb(table_name, key):
-    dynamodb = boto3.resource('dynamodb')
+def retrieve_from_dynamodb(table_name, key, use_cache=False):
+    """
+    Gets one item by key (plain Python values, e.g. {'PK': 'user#1'}).
+
+    With use_cache=True the lookup goes through a shared DynamoItemCache for
+    the table: repeated keys are served from memory and concurrent misses are
+    coalesced into batch_get_item calls.
+    """
+    if use_cache:
+        return get_item_cache(table_name).get(key)
+    dynamodb = get_resource('dynamodb')
     table = dynamodb.Table(table_name)
     response = table.get_item(Key=key)
     return response.get('Item')
 
+
+class DynamoItemCache:
+    """
+    Read-through item cache for one table with TTL and LRU eviction.
+
+    Cache misses are not fetched one by one: they are queued for a short
+    window and a dispatcher thread sends them as batch_get_item calls of up
+    to 100 keys (retrying UnprocessedKeys), so many threads looking up keys
+    at the same time share a few round trips. Keys and items use plain
+    Python values, like the boto3 Table resource (float key values are
+    converted to Decimal). Missing items are cached as None for the same TTL.
+
+    close() answers the queued lookups and stops the dispatcher thread and
+    the fetch pool; the cache is also a context manager.
+
+    Example:
+        with DynamoItemCache('my-table', ttl=300) as cache:
+            items = cache.get_many([{'PK': 'user#1'}, {'PK': 'user#2'}])
+    """
+
+    max_batch_keys = 100
+
+    def __init__(self, table_name, ttl=60, max_items=10000, window=0.005, consistent_read=False,
+                 max_workers=4, max_retries=8):
+        self.table_name = table_name
+        self.ttl = ttl
+        self.max_items = max_items
+        self.window = window
+        self.consistent_read = consistent_read
+        self.max_retries = max_retries
+        self.items = collections.OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.dispatcher = None
+        self.closed = False
+        self.stats = {'hits': 0, 'misses': 0, 'batch_calls': 0}
+
+    @staticmethod
+    def _plain_key(key):
+        # TypeSerializer rejects floats; str() keeps the value as written (0.1, not 0.1000000000000000055...)
+        from decimal import Decimal
+
+        return {name: Decimal(str(value)) if isinstance(value, float) else value for name, value in key.items()}
+
+    @staticmethod
+    def _cache_key(key):
+        # Key attributes are strings, numbers or binary; numbers come back as
+        # Decimal (1 and 1.0 are the same key) and binary as Binary, so
+        # normalize everything to its text form
+        from decimal import Decimal
+
+        def text(value):
+            value = getattr(value, 'value', value)
+            if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+                return str(Decimal(str(value)).normalize())
+            return str(value)
+
+        return json.dumps({name: text(value) for name, value in key.items()}, sort_keys=True)
+
+    def get(self, key):
+        """Returns the item for a key (or None), from the cache when fresh."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        """Returns the items for several keys, in order, fetching every miss together."""
+        futures = []
+        with self.lock:
+            if self.closed:
+                raise RuntimeError(f"The item cache of {self.table_name} is closed.")
+            now = time.monotonic()
+            for key in keys:
+                key = self._plain_key(key)
+                cache_key = self._cache_key(key)
+                entry = self.items.get(cache_key)
+                if entry is not None and entry[0] > now:
+                    self.items.move_to_end(cache_key)
+                    self.stats['hits'] += 1
+                    future = concurrent.futures.Future()
+                    future.set_result(entry[1])
+                else:
+                    self.stats['misses'] += 1
+                    future = self.pending.get(cache_key, (None, None))[1]
+                    if future is None:
+                        future = concurrent.futures.Future()
+                        self.pending[cache_key] = (key, future)
+                futures.append(future)
+            if self.pending:
+                self._start_dispatcher()
+                self.wakeup.set()
+        return [future.result() for future in futures]
+
+    def invalidate(self, key=None):
+        """Drops one key, or every cached item when key is None."""
+        with self.lock:
+            if key is None:
+                self.items.clear()
+            else:
+                self.items.pop(self._cache_key(key), None)
+
+    def close(self):
+        """Fetches the lookups still queued, then stops the dispatcher thread and the fetch pool."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.wakeup.set()
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _start_dispatcher(self):
+        if self.dispatcher is None:
+            self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+            self.dispatcher.start()
+
+    def _dispatch(self):
+        while True:
+            self.wakeup.wait()
+            # Let concurrent lookups pile up before sending them together
+            time.sleep(self.window)
+            with self.lock:
+                self.wakeup.clear()
+                batch = dict(list(self.pending.items())[:self.max_batch_keys])
+                for cache_key in batch:
+                    del self.pending[cache_key]
+                if self.pending:
+                    self.wakeup.set()
+                done = self.closed and not self.pending
+            if batch:
+                self.executor.submit(self._fetch, batch)
+            if done:
+                return
+
+    def _fetch(self, batch):
+        from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+        serializer, deserializer = TypeSerializer(), TypeDeserializer()
+        key_names = None
+        found = {}
+        try:
+            request = {'Keys': [{k: serializer.serialize(v) for k, v in key.items()} for key, _ in batch.values()],
+                       'ConsistentRead': self.consistent_read}
+            dynamodb = get_client('dynamodb')
+            for attempt in range(self.max_retries + 1):
+                response = dynamodb.batch_get_item(RequestItems={self.table_name: request})
+                with self.lock:
+                    self.stats['batch_calls'] += 1
+                for raw in response['Responses'].get(self.table_name, []):
+                    item = {k: deserializer.deserialize(v) for k, v in raw.items()}
+                    key_names = key_names or list(next(iter(batch.values()))[0])
+                    found[self._cache_key({name: item[name] for name in key_names})] = item
+                unprocessed = response.get('UnprocessedKeys', {}).get(self.table_name)
+                if not unprocessed:
+                    break
+                if attempt == self.max_retries:
+                    raise RuntimeError(f"{len(unprocessed['Keys'])} keys of {self.table_name} were still "
+                                       f"unprocessed after {self.max_retries} retries.")
+                request = unprocessed
+                _backoff(attempt)
+        except Exception as e:
+            for _, future in batch.values():
+                future.set_exception(e)
+            return
+
+        expires = time.monotonic() + self.ttl
+        with self.lock:
+            for cache_key, (_, future) in batch.items():
+                self.items[cache_key] = (expires, found.get(cache_key))
+                self.items.move_to_end(cache_key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+        for cache_key, (_, future) in batch.items():
+            future.set_result(found.get(cache_key))
+
+
+_item_caches = {}
+_item_caches_lock = threading.Lock()
+
+
+def get_item_cache(table_name, **kwargs):
+    """Returns the shared DynamoItemCache of a table, creating it with kwargs on first use."""
+    with _item_caches_lock:
+        if table_name not in _item_caches:
+            _item_caches[table_name] = DynamoItemCache(table_name, **kwargs)
+        return _item_caches[table_name]
+
+
+@atexit.register
+def close_item_caches():
+    """Closes and forgets the shared item caches (e.g. after switching credentials)."""
+    with _item_caches_lock:
+        caches = list(_item_caches.values())
+        _item_caches.clear()
+    for cache in caches:
+        cache.close()
+
 def create_dynamodb_table(table_name, attribute_definitions, key_schema):
-    dynamodb = boto3.client('dynamodb')
+    dynamodb = get_client('dynamodb')
     print("creating the DynamoDB tbl")
     try:
         response = dynamodb.create_table(
@@ -111,7 +489,7 @@ def list_keys_from_dynamodb(table_name):
     - list: A list of primary key values from the table.
     """
     # Initialize the DynamoDB client
-    dynamodb = boto3.client('dynamodb')
+    dynamodb = get_client('dynamodb')
 
     try:
         # Use the scan operation to list keys
@@ -126,72 +504,455 @@ def list_keys_from_dynamodb(table_name):
         print(f"Error: {e}")
         return []
 
-def dynamodb_to_dataframe(table_name):
-    # Initialize a Boto3 DynamoDB client
-    dynamodb = boto3.client('dynamodb')
-    # Create an empty list to store the DynamoDB items
-    items = []
+def _scan_segment(table_name, segment, total_segments, start_key, scan_kwargs, pages, stop):
+    dynamodb = get_client('dynamodb')
+    params = dict(scan_kwargs, TableName=table_name)
+    if total_segments > 1:
+        params.update(Segment=segment, TotalSegments=total_segments)
+    if start_key:
+        params['ExclusiveStartKey'] = start_key
+    while not stop.is_set():
+        response = dynamodb.scan(**params)
+        # Blocks while the consumer is behind, so memory stays bounded
+        while not stop.is_set():
+            try:
+                pages.put((segment, response), timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        if 'LastEvaluatedKey' not in response:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def scan_dynamodb_pages(table_name, total_segments=1, projection_expression=None, expression_attribute_names=None,
+                        consistent_read=False, segments=None, start_keys=None, **scan_kwargs):
+    """
+    Scans a DynamoDB table with one worker thread per segment (Segment/TotalSegments)
+    and yields the raw scan responses as they arrive.
+
+    Args:
+    - table_name (str): the name of the DynamoDB table
+    - total_segments (int): number of parallel scan segments (1 = plain sequential scan)
+    - projection_expression (str, optional): only return these attributes
+    - expression_attribute_names (dict, optional): placeholders used in projection_expression
+    - consistent_read (bool): use strongly consistent reads
+    - segments (list of int, optional): scan only these segments (default: all)
+    - start_keys (dict, optional): {segment: ExclusiveStartKey} to resume segments
+    - **scan_kwargs: extra Scan parameters (FilterExpression, Limit, ...)
+
+    Returns:
+    - generator of (segment, response): response holds 'Items' and, unless the
+      segment is finished, 'LastEvaluatedKey'
+    """
+    if projection_expression:
+        scan_kwargs['ProjectionExpression'] = projection_expression
+    if expression_attribute_names:
+        scan_kwargs['ExpressionAttributeNames'] = expression_attribute_names
+    if consistent_read:
+        scan_kwargs['ConsistentRead'] = True
+    segments = list(range(total_segments)) if segments is None else list(segments)
+    start_keys = start_keys or {}
+
+    pages = queue.Queue(maxsize=max(2 * len(segments), 2))
+    stop = threading.Event()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(segments), 1)) as executor:
+        futures = [executor.submit(_scan_segment, table_name, segment, total_segments,
+                                   start_keys.get(segment), scan_kwargs, pages, stop)
+                   for segment in segments]
+        try:
+            while True:
+                try:
+                    yield pages.get(timeout=0.5)
+                except queue.Empty:
+                    if all(future.done() for future in futures) and pages.empty():
+                        break
+            for future in futures:
+                # Re-raise any error from a segment worker
+                future.result()
+        finally:
+            stop.set()
+
+
+def parallel_scan_dynamodb(table_name, total_segments=8, **kwargs):
+    """
+    Yields every item of a table (DynamoDB wire format) using a parallel
+    segmented scan; see scan_dynamodb_pages for the arguments.
+    """
+    for _, response in scan_dynamodb_pages(table_name, total_segments=total_segments, **kwargs):
+        yield from response['Items']
 
-    # Use a scan operation to retrieve all items from the table
-    response = dynamodb.scan(TableName=table_name)
 
-    # Continue scanning through the entire table if the response is paginated
-    while 'LastEvaluatedKey' in response:
-        items.extend(response['Items'])
-        response = dynamodb.scan(TableName=table_name, ExclusiveStartKey=response['LastEvaluatedKey'])
+def _numbers_to_array(numbers, decimal_numbers):
+    """
+    Converts DynamoDB number strings (None where missing) to Int64, float64 or
+    Decimal values. Integers are never rounded through float64: those beyond
+    int64 become Decimals.
+    """
+    import numpy as np
+    import pandas as pd
+    from decimal import Decimal
+
+    if decimal_numbers:
+        return pd.array([None if n is None else Decimal(n) for n in numbers], dtype=object)
+
+    missing = np.fromiter((n is None for n in numbers), dtype=bool, count=len(numbers))
+    present = np.array([n for n in numbers if n is not None], dtype=str)
+    if not (np.char.find(np.char.lower(present), '.') >= 0).any() and not (np.char.find(np.char.lower(present), 'e') >= 0).any():
+        try:
+            data = np.zeros(len(numbers), dtype=np.int64)
+            data[~missing] = present.astype(np.int64)
+            return pd.arrays.IntegerArray(data, missing)
+        except (OverflowError, ValueError):
+            return pd.array([None if n is None else Decimal(n) for n in numbers], dtype=object)
+    data = np.full(len(numbers), np.nan)
+    data[~missing] = present.astype(np.float64)
+    return data
+
+
+def _json_default(value):
+    # Decimals from DynamoDB numbers, sets and binary values
+    from boto3.dynamodb.types import Binary
+
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, Binary):
+        value = value.value
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _decode_column(tags, values, nested, decimal_numbers):
+    """
+    Builds one typed column from the raw wire values of a single attribute.
 
-    # Add the remaining items from the last response
-    items.extend(response['Items'])
+    Args:
+    - tags (set): every DynamoDB type tag seen for the attribute across all pages
+    - values (list): wire values ({'S': ...} dicts), None where the attribute is missing
+    - nested (str): 'json' to store L/M values as JSON strings, 'object' for Python objects
+    - decimal_numbers (bool): keep N values as Decimals
+    """
+    import pandas as pd
+
+    value_tags = tags - {'NULL'}
+    if len(value_tags) == 1:
+        tag = next(iter(value_tags))
+        payloads = [None if v is None or 'NULL' in v else v[tag] for v in values]
+        if tag == 'N':
+            return _numbers_to_array(payloads, decimal_numbers)
+        if tag == 'S':
+            return pd.array(payloads, dtype='string')
+        if tag == 'BOOL':
+            return pd.array(payloads, dtype='boolean')
+        if tag == 'B':
+            return pd.array(payloads, dtype=object)
+        if tag == 'SS':
+            # Sets, like the deserialized NS and BS values below
+            return pd.array([None if p is None else set(p) for p in payloads], dtype=object)
+
+    # Nested, set and mixed-type attributes fall back to deserialized Python values
+    from boto3.dynamodb.types import TypeDeserializer
+
+    deserializer = TypeDeserializer()
+    decoded = [None if v is None else deserializer.deserialize(v) for v in values]
+    if nested == 'json' and value_tags & {'L', 'M'}:
+        decoded = [None if d is None else json.dumps(d, default=_json_default) for d in decoded]
+    return pd.array(decoded, dtype=object)
+
+
+def dynamodb_items_to_dataframe(pages, nested='json', decimal_numbers=False):
+    """
+    Converts pages of wire-format DynamoDB items into a typed DataFrame.
 
-    # Extract just the values from the DynamoDB items
-    extracted_data = []
-    for item in items:
-        extracted_item = {}
-        for key, value in item.items():
-            if 'S' in value:
-                extracted_item[key] = value['S']
-            elif 'N' in value:
-                extracted_item[key] = float(value['N'])
-        extracted_data.append(extracted_item)
+    Items are decoded column by column rather than item by item: every
+    attribute keeps a list of row positions and raw payloads, and its type is
+    inferred from all pages once the last page has been read.
 
-    # Convert the extracted data to a Pandas DataFrame
-    df = pd.DataFrame(extracted_data)
+    Column types:
+    - N: Int64 when every value is integral (Decimal beyond int64), else float64
+      (Decimal objects with decimal_numbers=True)
+    - S: string, BOOL: boolean, B: bytes
+    - SS/NS/BS sets: Python sets, L/M: JSON strings (nested='json') or Python objects (nested='object')
+    - attributes with mixed types: Python objects; NULL and missing attributes become missing values
 
-    return df
+    Args:
+    - pages (iterable of list): pages of items, e.g. the 'Items' of scan responses
+    - nested (str): 'json' or 'object', see above
+    - decimal_numbers (bool): keep numbers as exact Decimals
 
+    Returns:
+    - pd.DataFrame: one row per item, one column per attribute
+    """
+    import numpy as np
+    import pandas as pd
+
+    positions = {}
+    payloads = {}
+    tags = {}
+    row_count = 0
+    for items in pages:
+        for item in items:
+            for name, value in item.items():
+                if name not in positions:
+                    positions[name], payloads[name], tags[name] = [], [], set()
+                positions[name].append(row_count)
+                payloads[name].append(value)
+                tags[name].update(value)
+            row_count += 1
+
+    columns = {}
+    for name in positions:
+        values = np.full(row_count, None, dtype=object)
+        values[positions[name]] = payloads[name]
+        columns[name] = _decode_column(tags[name], values.tolist(), nested, decimal_numbers)
+    return pd.DataFrame(columns, index=pd.RangeIndex(row_count))
+
+
+def dynamodb_to_dataframe(table_name, total_segments=1, projection_expression=None,
+                          expression_attribute_names=None, consistent_read=False, nested='json'):
+    """
+    Loads a DynamoDB table into a pandas DataFrame.
 
-def empty_dynamodb_table(table_name, reverse=False, max_workers=10):
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(table_name)
+    Args:
+    - table_name (str): the name of the DynamoDB table
+    - total_segments (int): number of parallel scan segments (see scan_dynamodb_pages)
+    - projection_expression (str, optional): only load these attributes
+    - expression_attribute_names (dict, optional): placeholders used in projection_expression
+    - consistent_read (bool): use strongly consistent reads
+    - nested (str): how lists and maps are stored, see dynamodb_items_to_dataframe
+
+    Returns:
+    - pd.DataFrame: one row per item
+    """
+    pages = scan_dynamodb_pages(table_name, total_segments=total_segments,
+                                projection_expression=projection_expression,
+                                expression_attribute_names=expression_attribute_names,
+                                consistent_read=consistent_read)
+    return dynamodb_items_to_dataframe((response['Items'] for _, response in pages), nested=nested)
 
-    print(f"Scanning table '{table_name}'...")
 
-    # Scan the table and collect all items
-    response = table.scan()
-    data = response.get('Items', [])
-    print(f"Scanned {len(data)} items.")
+def empty_dynamodb_table(table_name, reverse=None, max_workers=10, total_segments=4, progress_every=10000):
+    """
+    Deletes every item of a DynamoDB table.
 
-    # Continue scanning if there are more pages
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-        data.extend(response.get('Items', []))
+    Only the key attributes are scanned (ProjectionExpression), in parallel
+    segments, and the keys are streamed straight into 25-key batch_write_item
+    DeleteRequests with UnprocessedItems retry (see DynamoBatchWriter).
+    Memory is bounded by the scan and write queues, not the table size.
 
-    if reverse:
-        data.reverse()
+    Args:
+    - table_name (str): the name of the DynamoDB table
+    - reverse (bool): deprecated and ignored; keys are deleted as they are scanned
+    - max_workers (int): number of batch_write_item calls in flight
+    - total_segments (int): number of parallel scan segments
+    - progress_every (int): print progress every N scanned keys
 
-    print(f"Starting deletion of {len(data)} items (reverse={reverse}, parallel=True)...")
+    Returns:
+    - dict: the DynamoBatchWriter metrics plus the number of scanned keys
+    """
+    if reverse is not None:
+        warnings.warn("empty_dynamodb_table(reverse=...) is ignored and will be removed; "
+                      "keys are deleted in scan order", DeprecationWarning, stacklevel=2)
+    key_names = get_key_names(table_name)
+    # Placeholders avoid clashes between key names and DynamoDB reserved words
+    attribute_names = {f"#k{i}": name for i, name in enumerate(key_names)}
+
+    print(f"Scanning keys of table '{table_name}' ({total_segments} segments) and deleting as they arrive...")
+    scanned = 0
+    with DynamoBatchWriter(table_name, max_workers=max_workers, key_names=key_names) as writer:
+        pages = scan_dynamodb_pages(table_name, total_segments=total_segments,
+                                    projection_expression=", ".join(attribute_names),
+                                    expression_attribute_names=attribute_names)
+        for _, response in pages:
+            for key in response['Items']:
+                writer.delete(key)
+            previous, scanned = scanned, scanned + len(response['Items'])
+            if scanned // progress_every > previous // progress_every:
+                print(f"Scanned {scanned} keys, deleted {writer.metrics['written']}...")
+
+    writer.metrics['scanned'] = scanned
+    print(f"\n✅ All {writer.metrics['written']} items deleted from '{table_name}' "
+          f"({writer.metrics['retries']} retries, {writer.metrics['seconds']:.1f}s).")
+    return writer.metrics
+
+
+def _dataframe_to_arrow(df):
+    """
+    Converts a decoded DataFrame column by column, so an attribute holding
+    mixed types is written as text without turning the other columns
+    (decimal numbers, keys) into text as well.
+    """
+    import pyarrow as pa
 
-    def delete_item(item):
-        key = {k['AttributeName']: item[k['AttributeName']] for k in table.key_schema}
-        table.delete_item(Key=key)
-        return key
+    arrays = []
+    for name in df.columns:
+        try:
+            arrays.append(pa.array(df[name], from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array(df[name].map(lambda v: None if v is None else str(v)), type=pa.string()))
+    return pa.Table.from_arrays(arrays, names=[str(name) for name in df.columns])
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_key = {executor.submit(delete_item, item): idx for idx, item in enumerate(data, 1)}
-        for i, future in enumerate(concurrent.futures.as_completed(future_to_key), 1):
-            key = future.result()
-            print(f"[{i}/{len(data)}] Deleted item with key: {key}")
 
-    print(f"\n✅ All {len(data)} items deleted from '{table_name}'.")
+def _conform_to_export_schema(table, schema, decimal_scale):
+    """
+    Casts one file's table to the export schema, so every file of an export
+    has the same columns and types. Numbers become decimal128(38,
+    decimal_scale); attributes seen for the first time are appended to the
+    schema, known ones missing from this file are added as nulls.
 
+    Returns:
+    - tuple: (the cast table, the possibly extended schema)
+    """
+    import pyarrow as pa
+
+    fields = {field.name: field for field in schema} if schema is not None else {}
+    for field in table.schema:
+        field_type = pa.decimal128(38, decimal_scale) if pa.types.is_decimal(field.type) else field.type
+        known = fields.get(field.name)
+        # An attribute that was always NULL so far takes the first real type seen
+        if known is None or (pa.types.is_null(known.type) and not pa.types.is_null(field_type)):
+            fields[field.name] = pa.field(field.name, field_type)
+    schema = pa.schema(list(fields.values()))
+
+    columns = []
+    for field in schema:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(table.num_rows, field.type))
+            continue
+        try:
+            columns.append(table.column(field.name).cast(field.type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Attribute '{field.name}' does not fit the export type {field.type} "
+                             f"(use a different decimal_scale or a projection_expression): {e}") from None
+    return pa.Table.from_arrays(columns, schema=schema), schema
+
+
+def _write_parquet_part(table, destination, relative_path, compression):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def write(where):
+        if isinstance(table, pa.Schema):
+            # Schema-only file such as _common_metadata
+            pq.write_metadata(table, where)
+        else:
+            pq.write_table(table, where, compression=compression)
 
+    if destination.startswith("s3://"):
+        from shared_func.s3_func import S3MultipartWriter
+
+        bucket_name, _, prefix = destination[len("s3://"):].partition("/")
+        key_name = f"{prefix.rstrip('/')}/{relative_path}" if prefix else relative_path
+        with S3MultipartWriter(bucket_name, key_name) as writer:
+            write(writer)
+    else:
+        path = os.path.join(destination, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write(path)
+
+
+def export_dynamodb_to_parquet(table_name, destination, total_segments=4, rows_per_file=100000,
+                               checkpoint_path=None, projection_expression=None,
+                               expression_attribute_names=None, compression='snappy', decimal_scale=9):
+    """
+    Exports a DynamoDB table to Parquet files without loading it into memory.
+
+    Scan pages from parallel segments are buffered per segment and written
+    as a Parquet file every rows_per_file rows, to
+    <destination>/segment=<n>/part-<seq>.parquet (local folder or
+    s3://bucket/prefix). After every file the segment's LastEvaluatedKey is
+    saved to a checkpoint; re-running with the same checkpoint resumes each
+    unfinished segment after its last written file.
+
+    Every file is cast to one export schema kept in the checkpoint: numbers
+    are exact decimal128(38, decimal_scale) values (a number that does not
+    fit raises instead of being rounded), attributes missing from a file are
+    null columns. Attributes first seen in a later file are appended to the
+    schema; the final schema is written to <destination>/_common_metadata,
+    so read the export with
+    pyarrow.dataset.dataset(destination, schema=pyarrow.parquet.read_schema(<_common_metadata>)).
+
+    Args:
+    - table_name (str): the name of the DynamoDB table
+    - destination (str): local folder or s3://bucket/prefix
+    - total_segments (int): number of parallel scan segments
+    - rows_per_file (int): target rows per Parquet file; also the scan page Limit,
+      so a file holds fewer than 2 * rows_per_file rows
+    - checkpoint_path (str, optional): checkpoint JSON file (default ./<table_name>.export-checkpoint.json)
+    - projection_expression (str, optional): only export these attributes
+    - expression_attribute_names (dict, optional): placeholders used in projection_expression
+    - compression (str): Parquet codec
+    - decimal_scale (int): digits kept after the decimal point of numbers
+
+    Returns:
+    - dict: rows and files written, and elapsed seconds
+    """
+    import base64
+    import pyarrow as pa
+
+    checkpoint_path = checkpoint_path or f"{table_name}.export-checkpoint.json"
+    checkpoint = {'table': table_name, 'destination': destination, 'total_segments': total_segments, 'segments': {}}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            saved = json.load(f)
+        if (saved['table'], saved['destination'], saved['total_segments']) != (table_name, destination, total_segments):
+            raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different export; remove it to start over.")
+        checkpoint = saved
+
+    states = {}
+    for segment in range(total_segments):
+        states[segment] = checkpoint['segments'].setdefault(str(segment), {'last_key': None, 'done': False, 'files': 0})
+    todo = [segment for segment, state in states.items() if not state['done']]
+    schema = None
+    if checkpoint.get('schema'):
+        schema = pa.ipc.read_schema(pa.py_buffer(base64.b64decode(checkpoint['schema'])))
+    print(f"Exporting '{table_name}' to {destination}: {len(todo)} of {total_segments} segments to scan.")
+
+    def save_checkpoint():
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    def flush(segment, last_key):
+        nonlocal schema
+        state = states[segment]
+        pages, buffers[segment] = buffers[segment], []
+        if any(pages):
+            table = _dataframe_to_arrow(dynamodb_items_to_dataframe(pages, decimal_numbers=True))
+            table, schema = _conform_to_export_schema(table, schema, decimal_scale)
+            checkpoint['schema'] = base64.b64encode(schema.serialize().to_pybytes()).decode('ascii')
+            _write_parquet_part(table, destination, f"segment={segment}/part-{state['files']:05d}.parquet", compression)
+            state['files'] += 1
+            totals['rows'] += table.num_rows
+            totals['files'] += 1
+        state['last_key'] = last_key
+        state['done'] = last_key is None
+        save_checkpoint()
+
+    start = time.perf_counter()
+    totals = {'rows': 0, 'files': 0}
+    buffers = {segment: [] for segment in todo}
+    counts = {segment: 0 for segment in todo}
+    pages = scan_dynamodb_pages(table_name, total_segments=total_segments, segments=todo,
+                                start_keys={segment: states[segment]['last_key'] for segment in todo},
+                                projection_expression=projection_expression,
+                                expression_attribute_names=expression_attribute_names,
+                                Limit=rows_per_file)
+    for segment, response in pages:
+        buffers[segment].append(response['Items'])
+        counts[segment] += len(response['Items'])
+        last_key = response.get('LastEvaluatedKey')
+        # Files end on page boundaries so the checkpoint key is exact
+        if last_key is None or counts[segment] >= rows_per_file:
+            flush(segment, last_key)
+            counts[segment] = 0
+            print(f"segment {segment}: {states[segment]['files']} files, {totals['rows']} rows exported so far")
+
+    if schema is not None:
+        _write_parquet_part(schema, destination, "_common_metadata", compression)
+    totals['seconds'] = time.perf_counter() - start
+    print(f"Export complete: {totals['rows']} rows in {totals['files']} files ({totals['seconds']:.1f}s).")
+    return totals
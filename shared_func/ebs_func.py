@@ -1,7 +1,7 @@
-import boto3
+from shared_func.client_func import lazy_client
 from botocore.exceptions import ClientError
 
-ec2_client = boto3.client('ec2')
+ec2_client = lazy_client('ec2')
 
 def create_volume(size, availability_zone, tag_value='true'):
     try:
@@ -1,14 +1,17 @@
-import boto3
 import sys
 import os
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError
-import pandas as pd
+from shared_func.client_func import get_client, lazy_client
 
-# Initialize the EC2 client
-ec2_client = boto3.client('ec2')
+# Initialize the EC2 client (created on first use)
+ec2_client = lazy_client('ec2')
 
-pd.set_option('display.max_colwidth', None)  # Do not truncate column values
-pd.set_option('display.max_rows', None)     # Show all rows
+def _pandas():
+    # pandas is only needed by the DataFrame listings, so import it on demand
+    import pandas as pd
+    pd.set_option('display.max_colwidth', None)  # Do not truncate column values
+    pd.set_option('display.max_rows', None)     # Show all rows
+    return pd
 
 def create_key_pair(key_name, save_path):
     try:
@@ -40,9 +43,7 @@ def get_instance_name(tags):
                 return tag['Value']
     return "Unnamed"
 
-import boto3
-
-ec2_client = boto3.client('ec2')
+ec2_client = lazy_client('ec2')
 
 def get_instance_name(tags):
     """Extracts the Name tag from instance tags."""
@@ -160,7 +161,7 @@ def menu_to_control():
 def list_ec2_instances():
     try:
         # Initialize a session using Amazon EC2
-        ec2_client = boto3.client('ec2')
+        ec2_client = get_client('ec2')
 
         # Describe all instances
         response = ec2_client.describe_instances()
@@ -189,6 +190,7 @@ def list_ec2_instances():
                 })
 
         # Create a DataFrame from the instance list
+        pd = _pandas()
         df = pd.DataFrame(instances)
 
         # Display the DataFrame
@@ -203,7 +205,7 @@ def list_ec2_instances():
 def list_and_manage_key_pairs():
     try:
         # Initialize a session using Amazon EC2
-        ec2_client = boto3.client('ec2')
+        ec2_client = get_client('ec2')
 
         # Retrieve all key pairs
         response = ec2_client.describe_key_pairs()
@@ -220,6 +222,7 @@ def list_and_manage_key_pairs():
             })
 
         # Create a DataFrame for display
+        pd = _pandas()
         df = pd.DataFrame(key_pairs)
 
         if df.empty:
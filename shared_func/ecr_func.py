@@ -1,10 +1,9 @@
 import json
 import os
-import boto3
-from botocore.exceptions import ClientError
+from shared_func.client_func import get_client, lazy_client
 
 # Initialize the ECR client
-ecr_client = boto3.client('ecr')
+ecr_client = lazy_client('ecr')
 
 def delete_ecr_repository(repo_name):
     """
@@ -19,8 +18,8 @@ def delete_ecr_repository(repo_name):
 
 
 def list_ecr_images():
-    ecr = boto3.client("ecr", region_name=region)
-    account_id = boto3.client("sts").get_caller_identity()["Account"]
+    ecr = get_client("ecr", region_name=region)
+    account_id = get_client("sts").get_caller_identity()["Account"]
 
     uris = []
 
@@ -101,9 +100,7 @@ def delete_images_menu(repository_name):
 
 def create_ecr_repository(session=None, repository_name=None, region='us-east-1'):
     """Create an ECR repository."""
-    if session is None:
-        session = boto3.Session(region_name=region)
-    ecr_client = session.client('ecr')
+    ecr_client = get_client('ecr', region_name=region) if session is None else session.client('ecr')
     try:
         response = ecr_client.create_repository(repositoryName=repository_name)
         repository_uri = response['repository']['repositoryUri']
@@ -115,9 +112,7 @@ def create_ecr_repository(session=None, repository_name=None, region='us-east-1'
 
 def get_docker_login_cmd(session=None, region='us-east-1'):
     """Get login command for Docker."""
-    if session is None:
-        session = boto3.Session(region_name=region)
-    ecr_client = session.client('ecr')
+    ecr_client = get_client('ecr', region_name=region) if session is None else session.client('ecr')
     token = ecr_client.get_authorization_token()
     username, password = token['authorizationData'][0]['authorizationToken'].split(':')
     proxy_endpoint = token['authorizationData'][0]['proxyEndpoint']
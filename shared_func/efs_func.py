@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 
 def delete_efs_access_points_by_pvc_uids(file_system_id, deleted_pv_uids):
     """
@@ -7,7 +7,7 @@ def delete_efs_access_points_by_pvc_uids(file_system_id, deleted_pv_uids):
     :param file_system_id: ID do EFS (ex: "fs-xxxxxxxxxxxxxxxxx")
     :param deleted_pv_uids: Lista de UIDs de PVCs deletados
     """
-    efs = boto3.client("efs")
+    efs = get_client("efs")
 
     response = efs.describe_access_points(FileSystemId=file_system_id)
 
@@ -1,31 +1,21 @@
-import boto3
+from shared_func.s3_func import S3MultipartWriter
+from shared_func.s3_cache_func import get_s3_object_bytes
 import io
-import pandas as pd
 
-def read_excel_from_s3(bucket_name, key_name):
-    # Create an S3 client
-    s3 = boto3.client('s3')
-
-    # Use the S3 client to get the file contents
-    object = s3.get_object(Bucket=bucket_name, Key=key_name)
+def read_excel_from_s3(bucket_name, key_name, use_cache=True):
+    # Get the file contents from S3 (or the local ETag-validated cache)
+    content = get_s3_object_bytes(bucket_name, key_name, use_cache=use_cache)
 
     # Read the contents of the file into a Pandas dataframe
-    body = object['Body']
-    excel_file = io.BytesIO(body.read())
+    excel_file = io.BytesIO(content)
+    import pandas as pd
     df = pd.read_excel(excel_file)
 
     return df
   
 def upload_excel_to_s3(bucket_name, key_name, df):
-    # Create an S3 client
-    s3 = boto3.client('s3')
-
-    # Save the Pandas dataframe to an in-memory buffer
-    buffer = io.BytesIO()
-    df.to_excel(buffer, index=False)
-
-    # Upload the buffer to S3
-    buffer.seek(0)
-    s3.upload_fileobj(buffer, bucket_name, key_name)
+    # Stream the workbook straight into a multipart upload, no intermediate buffer
+    with S3MultipartWriter(bucket_name, key_name) as writer:
+        df.to_excel(writer, index=False)
 
     return True
@@ -1,8 +1,11 @@
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaFileUpload
+import re
+# googleapiclient and pandas are imported inside the functions that use them,
+# so importing this module stays cheap for callers that never touch Drive.
 
 def upload_file_to_shared_drive(self, file_name, shared_drive_id, folder_id, gdrive_cred):
+    from googleapiclient.discovery import build
+    from google.oauth2 import service_account
+    from googleapiclient.http import MediaFileUpload
     # Retrieve the service account JSON key from AWS Secrets Manager
     service_account_json = gdrive_cred  # Assuming the JSON key is stored directly in the secret
 
@@ -56,6 +59,8 @@ def upload_file_to_shared_drive(self, file_name, shared_drive_id, folder_id, gdr
         print('An error occurred during file upload:', str(e))
 
 def list_files_in_folder(folder_id, gdrive_cred):
+    from googleapiclient.discovery import build
+    from google.oauth2 import service_account
     # Retrieve the service account JSON key
     service_account_json = gdrive_cred  # Assuming the JSON key is stored directly in the secret
 
@@ -86,6 +91,11 @@ def list_files_in_folder(folder_id, gdrive_cred):
         return None
 
 def read_file_from_drive_by_extension(file_name, folder_id, gdrive_cred):
+    import tempfile
+    import pandas as pd
+    from googleapiclient.discovery import build
+    from google.oauth2 import service_account
+    from googleapiclient.http import MediaIoBaseDownload
     # Retrieve the service account JSON key
     service_account_json = gdrive_cred  # Assuming the JSON key is stored directly in the secret
 
@@ -170,6 +180,8 @@ def process_filenames_and_find_missing_tables(file_names, dct_tbl, pattern = r'_
     return cleaned_file_names, missing_tables
 
 def share_folder_with_email(self, folder_id, email_to_share, gdrive_cred, role='reader'):
+    from googleapiclient.discovery import build
+    from google.oauth2 import service_account
     try:        
         # Create credentials from the service account JSON key
         credentials = service_account.Credentials.from_service_account_info(
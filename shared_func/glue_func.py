@@ -1,10 +1,11 @@
-import boto3
+import concurrent.futures
+from shared_func.client_func import get_client
 from botocore.exceptions import ClientError
 
 # Function to retrieve table schema information from an AWS Glue catalog
 def glue_retrieves_table_details(database_name, table_name):
     try:
-        glue_client = boto3.client('glue')
+        glue_client = get_client('glue')
         response = glue_client.get_table(DatabaseName=database_name, Name=table_name)
         response = response["Table"]["StorageDescriptor"]["Columns"]
         return response
@@ -15,7 +16,7 @@ def glue_retrieves_table_details(database_name, table_name):
 
 def start_crawler(crawler_name):
     # Create an AWS Glue client
-    client = boto3.client('glue')
+    client = get_client('glue')
 
     # Start the crawler
     try:
@@ -24,3 +25,200 @@ def start_crawler(crawler_name):
         return response
     except Exception as e:
         print(f"Failed to start crawler: {e}")
+
+
+def _list_subfolders(s3, bucket_name, prefix):
+    paginator = s3.get_paginator('list_objects_v2')
+    return [common['Prefix'] for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix, Delimiter='/')
+            for common in page.get('CommonPrefixes', [])]
+
+
+def list_partition_locations(location, partition_keys, max_workers=16):
+    """
+    Finds the partition folders under an S3 location, one folder level per
+    partition key, listing the folders of each level concurrently.
+
+    Both Hive style (year=2024/month=01/) and plain positional layouts
+    (CloudTrail's <region>/<yyyy>/<mm>/<dd>/) are understood.
+
+    Args:
+    - location (str): the table location, e.g. 's3://bucket/AWSLogs/123456789012/CloudTrail/'
+    - partition_keys (list of str): the partition column names, outermost first
+    - max_workers (int): concurrent list requests
+
+    Returns:
+    - list of (list of str, str): the partition values and their S3 location
+    """
+    s3 = get_client('s3')
+    bucket_name, _, prefix = location[len("s3://"):].partition("/")
+    prefix = prefix.rstrip('/') + '/' if prefix else ''
+
+    level = [([], prefix)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for key in partition_keys:
+            listings = executor.map(lambda entry: (entry, _list_subfolders(s3, bucket_name, entry[1])), level)
+            next_level = []
+            for (values, _), subfolders in listings:
+                for subfolder in subfolders:
+                    name = subfolder[:-1].rsplit('/', 1)[-1]
+                    column, sep, value = name.partition('=')
+                    if sep and column != key:
+                        continue
+                    next_level.append((values + [value if sep else name], subfolder))
+            level = next_level
+    return [(values, f"s3://{bucket_name}/{folder}") for values, folder in level]
+
+
+def batch_create_partitions(database_name, table_name, partitions, max_workers=4):
+    """
+    Registers partitions with Glue batch_create_partition, 100 per call,
+    several calls at once. Each partition reuses the table's storage
+    descriptor (format, SerDe, columns) with its own location.
+
+    Args:
+    - database_name (str): the Glue database
+    - table_name (str): the Glue table
+    - partitions (list of (list of str, str)): partition values and S3 location
+    - max_workers (int): concurrent batch_create_partition calls
+
+    Returns:
+    - dict: counts of 'created' and 'existing' partitions and the 'errors' list
+    """
+    glue_client = get_client('glue')
+    table = glue_client.get_table(DatabaseName=database_name, Name=table_name)['Table']
+    storage_descriptor = table['StorageDescriptor']
+
+    def create_batch(batch):
+        inputs = [{'Values': values, 'StorageDescriptor': dict(storage_descriptor, Location=location)}
+                  for values, location in batch]
+        response = glue_client.batch_create_partition(DatabaseName=database_name, TableName=table_name,
+                                                      PartitionInputList=inputs)
+        return response.get('Errors', [])
+
+    batches = [partitions[i:i + 100] for i in range(0, len(partitions), 100)]
+    summary = {'created': len(partitions), 'existing': 0, 'errors': []}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for errors in executor.map(create_batch, batches):
+            for error in errors:
+                summary['created'] -= 1
+                if error['ErrorDetail']['ErrorCode'] == 'AlreadyExistsException':
+                    summary['existing'] += 1
+                else:
+                    summary['errors'].append(error)
+    return summary
+
+
+def register_partitions_from_s3(database_name, table_name, location=None, max_workers=16):
+    """
+    Registers every partition folder found under a partitioned table's
+    location that Glue does not know yet, e.g. new days of CloudTrail logs
+    for templates/create-tbl-in-athena-4-cloudtrail-logs.sql.
+
+    Args:
+    - database_name (str): the Glue database
+    - table_name (str): the Glue table (must have partition keys)
+    - location (str, optional): where to look (default: the table location)
+    - max_workers (int): concurrent S3 list requests
+
+    Returns:
+    - dict: see batch_create_partitions, plus the number of partitions 'found'
+    """
+    glue_client = get_client('glue')
+    table = glue_client.get_table(DatabaseName=database_name, Name=table_name)['Table']
+    partition_keys = [key['Name'] for key in table.get('PartitionKeys', [])]
+    if not partition_keys:
+        raise ValueError(f"Table {database_name}.{table_name} has no partition keys.")
+
+    found = list_partition_locations(location or table['StorageDescriptor']['Location'],
+                                     partition_keys, max_workers=max_workers)
+    paginator = glue_client.get_paginator('get_partitions')
+    existing = {tuple(partition['Values'])
+                for page in paginator.paginate(DatabaseName=database_name, TableName=table_name,
+                                               ExcludeColumnSchema=True)
+                for partition in page['Partitions']}
+    new = [(values, path) for values, path in found if tuple(values) not in existing]
+    print(f"{len(found)} partition folders found, {len(new)} new.")
+
+    summary = batch_create_partitions(database_name, table_name, new)
+    summary['found'] = len(found)
+    summary['existing'] += len(found) - len(new)
+    return summary
+
+
+def arrow_schema_to_glue_columns(schema):
+    """
+    Converts a pyarrow schema to Glue column definitions (Hive type names),
+    e.g. for tables over Parquet files written with pyarrow.
+    """
+    import pyarrow as pa
+
+    def glue_type(arrow_type):
+        if pa.types.is_boolean(arrow_type):
+            return 'boolean'
+        if pa.types.is_int8(arrow_type):
+            return 'tinyint'
+        if pa.types.is_int16(arrow_type):
+            return 'smallint'
+        if pa.types.is_int32(arrow_type):
+            return 'int'
+        if pa.types.is_integer(arrow_type):
+            return 'bigint'
+        if pa.types.is_float32(arrow_type):
+            return 'float'
+        if pa.types.is_floating(arrow_type):
+            return 'double'
+        if pa.types.is_decimal(arrow_type):
+            return f'decimal({arrow_type.precision},{arrow_type.scale})'
+        if pa.types.is_date(arrow_type):
+            return 'date'
+        if pa.types.is_timestamp(arrow_type):
+            return 'timestamp'
+        if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+            return 'binary'
+        if pa.types.is_list(arrow_type):
+            return f'array<{glue_type(arrow_type.value_type)}>'
+        if pa.types.is_struct(arrow_type):
+            return 'struct<' + ','.join(f'{field.name}:{glue_type(field.type)}' for field in arrow_type) + '>'
+        return 'string'
+
+    return [{'Name': field.name, 'Type': glue_type(field.type)} for field in schema]
+
+
+def register_parquet_table(database_name, table_name, location, columns, partition_keys=None):
+    """
+    Creates, or updates when it already exists, an external Glue table over
+    Parquet files.
+
+    Args:
+    - database_name (str): the Glue database
+    - table_name (str): the Glue table
+    - location (str): the S3 folder of the files, e.g. 's3://bucket/exports/orders/'
+    - columns (list of dict): {'Name', 'Type'} column definitions (see arrow_schema_to_glue_columns)
+    - partition_keys (list of str, optional): string partition columns (Hive style key=value folders)
+
+    Returns:
+    - dict: the TableInput that was registered
+    """
+    glue_client = get_client('glue')
+    table_input = {
+        'Name': table_name,
+        'TableType': 'EXTERNAL_TABLE',
+        'Parameters': {'classification': 'parquet', 'EXTERNAL': 'TRUE'},
+        'PartitionKeys': [{'Name': key, 'Type': 'string'} for key in partition_keys or []],
+        'StorageDescriptor': {
+            'Columns': columns,
+            'Location': location,
+            'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat',
+            'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'},
+        },
+    }
+    try:
+        glue_client.create_table(DatabaseName=database_name, TableInput=table_input)
+        print(f"Glue table {database_name}.{table_name} created.")
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'AlreadyExistsException':
+            raise
+        glue_client.update_table(DatabaseName=database_name, TableInput=table_input)
+        print(f"Glue table {database_name}.{table_name} updated.")
+    return table_input
@@ -1,11 +1,9 @@
 import subprocess
 import json
-import boto3
+from shared_func.client_func import get_client
 import string
 import secrets
-import qrcode
 from io import BytesIO
-import pandas as pd
 from botocore.exceptions import ClientError
 
 def create_iam_role(role_name=None, policy_file=None, description=None):
@@ -92,7 +90,7 @@ def create_iam_group(group_name):
     :return: Response from the create_group API call or an error message.
     """
     # Initialize the IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # Create the group
     response = iam_client.create_group(
@@ -157,7 +155,7 @@ def attach_policy_to_user(user_name, policy_arn):
 
 def create_iam_user(username):
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # Create the IAM user
     iam.create_user(UserName=username)
@@ -166,7 +164,7 @@ def create_iam_user(username):
 
 def get_report():
     # Create IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # Get list of all users
     response = iam.list_users()
@@ -195,6 +193,7 @@ def get_report():
             user_data.append(user_info)
 
     # Convert to DataFrame
+    import pandas as pd
     df = pd.DataFrame(user_data)
     return df
 
@@ -213,7 +212,7 @@ def generate_random_password(length=20):
 
 def enable_login_profile(username):
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # Generate a random password
     password = generate_random_password()
@@ -224,7 +223,7 @@ def enable_login_profile(username):
         print(f"Login profile for '{username}' already exists.")
         
         # Get the AWS account ID
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         
         # Provide a link to the AWS Management Console login page
         login_url = f"https://{account_id}.signin.aws.amazon.com/console"
@@ -242,7 +241,7 @@ def enable_login_profile(username):
         print(f"Login profile for '{username}' enabled with a random password.")
         
         # Get the AWS account ID
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         
         # Provide a link to the AWS Management Console login page
         login_url = f"https://{account_id}.signin.aws.amazon.com/console"
@@ -252,7 +251,7 @@ def enable_login_profile(username):
         print(f"Login profile for '{username}' updated with a random password.")
         
         # Get the AWS account ID
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         
         # Provide a link to the AWS Management Console login page
         login_url = f"https://{account_id}.signin.aws.amazon.com/console"
@@ -262,7 +261,7 @@ def enable_login_profile(username):
 
 def delete_user(username):
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # List attached policies for the IAM user
     try:
@@ -290,7 +289,7 @@ def delete_user(username):
 
 def list_users():
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # List all IAM users
     response = iam.list_users()
@@ -313,13 +312,13 @@ def list_users():
     return lst_users
 
 def get_account_id():
-    sts = boto3.client('sts')
+    sts = get_client('sts')
     response = sts.get_caller_identity()
     return response['Account']
 
 def list_roles():
     # Initialize a Boto3 IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # List all IAM roles
     try:
@@ -342,7 +341,7 @@ def list_roles():
 def enforce_mfa_access(username):
     try:
         # Initialize the IAM client
-        iam = boto3.client('iam')
+        iam = get_client('iam')
 
         # Get the AWS account ID
         account_id = iam.get_user()["User"]["Arn"].split(":")[4]
@@ -417,7 +416,7 @@ def list_iam_groups():
     :return: List of IAM groups.
     """
     # Initialize the IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # List the groups
     response = iam_client.list_groups()
@@ -435,7 +434,7 @@ def delete_iam_group(group_name):
     :return: Response from the delete_group API call.
     """
     # Initialize the IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # Delete the group
     response = iam_client.delete_group(
@@ -452,7 +451,7 @@ def delete_iam_group(group_name):
     :return: Response from the delete_group API call.
     """
     # Initialize the IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # Delete the group
     response = iam_client.delete_group(
@@ -469,7 +468,7 @@ def list_users_in_group(group_name):
     :return: List of users in the group.
     """
     # Initialize the IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # List the users in the group
     response = iam_client.get_group(
@@ -490,7 +489,7 @@ def attach_user_to_group(user_name, group_name):
     :return: None
     """
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     try:
         # Add the user to the group
@@ -509,7 +508,7 @@ def remove_user_from_group(user_name, group_name):
     :return: None
     """
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     try:
         # Remove the user from the group
@@ -525,7 +524,7 @@ def remove_user_from_all_groups(username):
     :param username: The username of the IAM user to remove from all groups.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # List groups the user is a member of
@@ -554,7 +553,7 @@ def attach_user_to_group(username, group_name):
     :param group_name: The name of the IAM group to attach the user to.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # Add the user to the specified group
@@ -572,7 +571,7 @@ def disable_aws_access_key(username):
     :param username: The username of the IAM user whose access keys need to be disabled.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # List access keys for the specified user
@@ -609,7 +608,7 @@ def enable_aws_access_key(username):
     :param username: The username of the IAM user whose access keys need to be enabled.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # List access keys for the specified user
@@ -642,7 +641,7 @@ def enable_aws_access_key(username):
 
 def get_customer_managed_policies():
     # Initialize the IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # List Customer Managed Policies
     policies_data = []
@@ -682,11 +681,10 @@ def get_customer_managed_policies():
         print(f"Error retrieving policies: {e}")
 
     # Convert to Pandas DataFrame
+    import pandas as pd
     df = pd.DataFrame(policies_data)
     return df
 
-import boto3
-import pandas as pd
 import json
 
 
@@ -695,7 +693,7 @@ def get_all_policies():
     Fetch all policies (Customer Managed and AWS Managed)
     and return as a Pandas DataFrame.
     """
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     policies_data = []
     paginator = iam.get_paginator('list_policies')
@@ -716,6 +714,7 @@ def get_all_policies():
                 })
 
     # Convert to Pandas DataFrame
+    import pandas as pd
     df = pd.DataFrame(policies_data)
     return df
 
@@ -741,7 +740,7 @@ def get_policy_json_by_arn(policy_arn, file_path=None):
     :param file_path: Optional file path to save the policy JSON document.
     """
     # Initialize the IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     try:
         # Get policy details to retrieve the default version ID
@@ -1,6 +1,6 @@
 import subprocess
 import json
-import boto3
+from shared_func.client_func import get_client
 import string
 import secrets
 from io import BytesIO
@@ -83,7 +83,7 @@ def attach_policy_to_user(user_name, policy_arn):
 
 def create_iam_user(username):
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # Create the IAM user
     iam.create_user(UserName=username)
@@ -104,7 +104,7 @@ def generate_random_password(length=20):
 
 def enable_login_profile(username):
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # Generate a random password
     password = generate_random_password()
@@ -115,7 +115,7 @@ def enable_login_profile(username):
         print(f"Login profile for '{username}' already exists.")
         
         # Get the AWS account ID
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         
         # Provide a link to the AWS Management Console login page
         login_url = f"https://{account_id}.signin.aws.amazon.com/console"
@@ -133,7 +133,7 @@ def enable_login_profile(username):
         print(f"Login profile for '{username}' enabled with a random password.")
         
         # Get the AWS account ID
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         
         # Provide a link to the AWS Management Console login page
         login_url = f"https://{account_id}.signin.aws.amazon.com/console"
@@ -143,7 +143,7 @@ def enable_login_profile(username):
         print(f"Login profile for '{username}' updated with a random password.")
         
         # Get the AWS account ID
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_client('sts').get_caller_identity()['Account']
         
         # Provide a link to the AWS Management Console login page
         login_url = f"https://{account_id}.signin.aws.amazon.com/console"
@@ -153,7 +153,7 @@ def enable_login_profile(username):
 
 def delete_user(username):
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # List attached policies for the IAM user
     try:
@@ -181,7 +181,7 @@ def delete_user(username):
 
 def list_users():
     # Create an IAM client
-    iam = boto3.client('iam')
+    iam = get_client('iam')
 
     # List all IAM users
     response = iam.list_users()
@@ -199,13 +199,13 @@ def list_users():
         print("No IAM users found.")
 
 def get_account_id():
-    sts = boto3.client('sts')
+    sts = get_client('sts')
     response = sts.get_caller_identity()
     return response['Account']
 
 def list_roles():
     # Initialize a Boto3 IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     # List all IAM roles
     try:
@@ -228,7 +228,7 @@ def list_roles():
 def enforce_mfa_access(username):
     try:
         # Initialize the IAM client
-        iam = boto3.client('iam')
+        iam = get_client('iam')
 
         # Get the AWS account ID
         account_id = iam.get_user()["User"]["Arn"].split(":")[4]
@@ -296,7 +296,6 @@ def enforce_mfa_access(username):
         print(f"Error enforcing MFA access for IAM user '{username}': {str(e)}")
 
 
-import boto3
 
 def disable_aws_access_key(username):
     """
@@ -305,7 +304,7 @@ def disable_aws_access_key(username):
     :param username: The username of the IAM user whose access keys need to be disabled.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # List access keys for the specified user
@@ -343,7 +342,7 @@ def enable_aws_access_key(username):
     :param username: The username of the IAM user whose access keys need to be enabled.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # List access keys for the specified user
@@ -374,7 +373,6 @@ def enable_aws_access_key(username):
         print(f"An error occurred: {e}")
 
 
-import boto3
 
 def remove_user_from_all_groups(username):
     """
@@ -383,7 +381,7 @@ def remove_user_from_all_groups(username):
     :param username: The username of the IAM user to remove from all groups.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # List groups the user is a member of
@@ -412,7 +410,7 @@ def attach_user_to_group(username, group_name):
     :param group_name: The name of the IAM group to attach the user to.
     """
     # Create an IAM client
-    iam_client = boto3.client('iam')
+    iam_client = get_client('iam')
 
     try:
         # Add the user to the specified group
@@ -1,9 +1,9 @@
-import boto3
+from shared_func.client_func import get_client
 import json
 
 # Function to invoke another Lambda function
 def invoke_lambda(my_payload, lambda_name, invocation_type):
-  client = boto3.client("lambda")
+  client = get_client("lambda")
   response = client.invoke(
       FunctionName = lambda_name,
       InvocationType = invocation_type, # best options: RequestResponse or Event
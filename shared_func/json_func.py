@@ -1,11 +1,11 @@
-import boto3 
+from shared_func.client_func import get_client
+from shared_func.s3_cache_func import get_s3_object_bytes
 import json 
 
-def get_json_from_s3(bucket_name, key_name):
+def get_json_from_s3(bucket_name, key_name, use_cache=True):
     try:
-        s3 = boto3.client('s3')
-        response = s3.get_object(Bucket=bucket_name, Key=key_name)
-        content = response['Body'].read().decode('utf-8')
+        # Served from the local ETag-validated cache unless use_cache is False
+        content = get_s3_object_bytes(bucket_name, key_name, use_cache=use_cache).decode('utf-8')
         data = json.loads(content)
         return data
     except Exception as e:
@@ -13,7 +13,7 @@ def get_json_from_s3(bucket_name, key_name):
 
 def upload_json_to_s3(json_data, bucket_name, key_name):
     # Create an S3 client
-    s3 = boto3.client('s3')
+    s3 = get_client('s3')
 
     # Convert the JSON data to a string
     json_string = json.dumps(json_data)
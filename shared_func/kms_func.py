@@ -1,5 +1,12 @@
-import boto3
-import config
+import os
+from botocore.exceptions import ClientError
+from shared_func.client_func import get_client
+
+
+def _default_key_alias():
+    # Read when a key is needed rather than at import, so importing needs no environment
+    return os.environ["KMS_KEY_DEFAULT"]
+
 
 def enable_key_rotation(alias_name):
     """
@@ -12,7 +19,7 @@ def enable_key_rotation(alias_name):
         str: Success message if rotation is enabled, error message otherwise.
     """
     # Create a KMS client
-    kms_client = boto3.client('kms')
+    kms_client = get_client('kms')
 
     try:
         # Get the Key ID from the alias
@@ -25,20 +32,21 @@ def enable_key_rotation(alias_name):
     except ClientError as e:
         return f"Failed to enable key rotation for alias: {alias_name}. Error: {e}"
 
-def encrypt_string(secret, key_alias=config.kms_key_alias):
+def encrypt_string(secret, key_alias=None):
     """
     Encrypts a string using AWS KMS and returns the encrypted secret.
 
     Parameters:
     - secret (str): The secret string to encrypt.
-    - key_alias (str): The KMS key alias to use for encryption.
+    - key_alias (str): The KMS key alias to use for encryption (default $KMS_KEY_DEFAULT).
 
     Returns:
     - bytes: The encrypted secret.
     """
     # Initialize a boto3 using Amazon KMS
-    kms_client = boto3.client('kms')
+    kms_client = get_client('kms')
 
+    key_alias = key_alias or _default_key_alias()
     # Encrypt the secret using a KMS key
     response = kms_client.encrypt(
         KeyId=f'alias/{key_alias}',
@@ -50,7 +58,7 @@ def encrypt_string(secret, key_alias=config.kms_key_alias):
 
     return encrypted_secret
 
-def decrypt_string(encrypted_secret, key_alias=config.kms_key_alias):
+def decrypt_string(encrypted_secret, key_alias=None):
     """
     Decrypts an encrypted string using AWS KMS and returns the decrypted secret.
 
@@ -63,7 +71,7 @@ def decrypt_string(encrypted_secret, key_alias=config.kms_key_alias):
     - str: The decrypted secret.
     """
     # Initialize a boto3 using Amazon KMS
-    kms_client = boto3.client('kms')
+    kms_client = get_client('kms')
 
     # Decrypt the secret using KMS
     response = kms_client.decrypt(
@@ -75,22 +83,23 @@ def decrypt_string(encrypted_secret, key_alias=config.kms_key_alias):
 
     return decrypted_secret
 
-def encrypt_file(file_path, output_path, key_alias=config.kms_key_alias):
+def encrypt_file(file_path, output_path, key_alias=None):
     """
     Encrypts a file using AWS KMS and saves the encrypted content to an output file.
 
     Parameters:
     - file_path (str): The path to the file to encrypt.
     - output_path (str): The path to save the encrypted file.
-    - key_alias (str): The KMS key alias to use for encryption.
+    - key_alias (str): The KMS key alias to use for encryption (default $KMS_KEY_DEFAULT).
     """
     # Initialize a boto3 using Amazon KMS
-    kms_client = boto3.client('kms')
+    kms_client = get_client('kms')
 
     # Read the file content
     with open(file_path, 'rb') as file:
         file_content = file.read()
 
+    key_alias = key_alias or _default_key_alias()
     # Encrypt the file content using a KMS key
     response = kms_client.encrypt(
         KeyId=f'alias/{key_alias}',
@@ -113,7 +122,7 @@ def decrypt_file(encrypted_file_path, output_path):
     - output_path (str): The path to save the decrypted file.
     """
     # Initialize a boto3 using Amazon KMS
-    kms_client = boto3.client('kms')
+    kms_client = get_client('kms')
 
     # Read the encrypted file content
     with open(encrypted_file_path, 'rb') as encrypted_file:
@@ -146,7 +155,7 @@ def create_kms_key(description, alias_name, key_usage='ENCRYPT_DECRYPT', key_spe
     """
     try:
         # Initialize a KMS client
-        kms_client = boto3.client('kms')
+        kms_client = get_client('kms')
 
         # Create the KMS key
         response = kms_client.create_key(
@@ -180,7 +189,7 @@ def delete_kms_key(key_id):
     """
     try:
         # Initialize a KMS client
-        kms_client = boto3.client('kms')
+        kms_client = get_client('kms')
 
         # Schedule the deletion of the KMS key
         response = kms_client.schedule_key_deletion(
@@ -206,7 +215,7 @@ def list_kms_keys():
     """
     try:
         # Initialize a KMS client
-        kms_client = boto3.client('kms')
+        kms_client = get_client('kms')
 
         # List the KMS keys
         keys = []
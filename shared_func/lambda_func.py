@@ -1,9 +1,9 @@
-import boto3
+from shared_func.client_func import get_client
 import json
 
 def list_functions():
     # Initialize a Boto3 Lambda client
-    lambda_client = boto3.client('lambda')
+    lambda_client = get_client('lambda')
 
     # List Lambda functions
     try:
@@ -56,7 +56,7 @@ def create_lambda_function_and_return_arn(
 ):
 
     # Initialize the AWS Lambda client
-    lambda_client = boto3.client("lambda")
+    lambda_client = get_client("lambda")
 
     # Create the Lambda function
     response = lambda_client.create_function(
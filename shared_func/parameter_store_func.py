@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 
 def get_ssm_parameter(parameter_name):
     """
@@ -14,7 +14,7 @@ def get_ssm_parameter(parameter_name):
     - value (str): the value of the specified SSM parameter
     """
     # Create SSM client object with temporary credentials
-    ssm_client = boto3.client('ssm')
+    ssm_client = get_client('ssm')
 
 
     # Additional parameters for get_parameter if version is specified
@@ -28,7 +28,7 @@ def get_ssm_parameter(parameter_name):
 
 def get_ssm_parameter_history(parameter_name):
     # Create SSM client object with temporary credentials
-    ssm_client = boto3.client('ssm')
+    ssm_client = get_client('ssm')
 
     # Additional parameters for get_parameter if version is specified
     params = {'Name': parameter_name, 'WithDecryption': True}
@@ -52,7 +52,7 @@ def create_ssm_parameter(parameter_name, parameter_value, parameter_type='Secure
     - response (dict): information about the newly created/updated parameter
     """
     # Create SSM client object with provided credentials
-    ssm_client = boto3.client(
+    ssm_client = get_client(
             'ssm'
             )
 
@@ -69,7 +69,6 @@ def create_ssm_parameter(parameter_name, parameter_value, parameter_type='Secure
     response = ssm_client.put_parameter(**params)
     return response
 
-import boto3
 
 def delete_ssm_parameter(parameter_name):
     """
@@ -81,7 +80,7 @@ def delete_ssm_parameter(parameter_name):
     - response (dict): information about the deletion operation
     """
     # Create SSM client object with provided credentials
-    ssm_client = boto3.client('ssm')
+    ssm_client = get_client('ssm')
 
     # Additional parameters for delete_parameter
     params = {'Name': parameter_name}
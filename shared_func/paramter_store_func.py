@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 
 def get_ssm_parameter(parameter_name):
     """
@@ -14,7 +14,7 @@ def get_ssm_parameter(parameter_name):
     - value (str): the value of the specified SSM parameter
     """
     # Create SSM client object with temporary credentials
-    ssm_client = boto3.client()
+    ssm_client = get_client('ssm')
 
     # Use SSM client object to get parameter value
     response = ssm_client.get_parameter(Name=parameter_name, WithDecryption=True)
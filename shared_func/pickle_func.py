@@ -1,15 +1,10 @@
-import boto3
+from shared_func.client_func import get_client
+from shared_func.s3_cache_func import get_s3_object_bytes
 import pickle
 
-def read_pickle_from_s3(bucket_name, key_name):
-    # Create an S3 client
-    s3 = boto3.client('s3')
-
-    # Get the pickle file from S3
-    response = s3.get_object(Bucket=bucket_name, Key=key_name)
-
-    # Load the pickle data from the response
-    pickle_data = response['Body'].read()
+def read_pickle_from_s3(bucket_name, key_name, use_cache=True):
+    # Get the pickle file from S3 (or the local ETag-validated cache)
+    pickle_data = get_s3_object_bytes(bucket_name, key_name, use_cache=use_cache)
 
     # Unpickle the data
     unpickled_data = pickle.loads(pickle_data)
@@ -30,7 +25,7 @@ def upload_pickle_to_s3(pickle_data, bucket_name, key_name):
         The key to use when saving the pickle file in the S3 bucket.
     """
     # Create an S3 client
-    s3 = boto3.client('s3')
+    s3 = get_client('s3')
 
     # Pickle the data
     pickled_data = pickle.dumps(pickle_data)
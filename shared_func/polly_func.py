@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 import os
 
 def polly_speak(
@@ -22,8 +22,7 @@ def polly_speak(
     """
     output_path = "/tmp/polly.mp3"
     # Wrap the prompt in SSML
-    session = boto3.Session(profile_name="iesb", region_name="us-east-1")
-    polly = boto3.client("polly")
+    polly = get_client("polly")
 
     response = polly.synthesize_speech(
         Text=text,
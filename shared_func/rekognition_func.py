@@ -1,13 +1,9 @@
-import boto3
 import json
 import os
 import sys
-import boto3
-import pandas as pd
-import json
-import os
+from shared_func.client_func import lazy_client
 
-rekog = boto3.client('rekognition')
+rekog = lazy_client('rekognition')
 def facial_analyzis(bucket_name, image_file):
 
     try:
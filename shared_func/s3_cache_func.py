@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from shared_func.client_func import get_client
+
+# Local, size-bounded cache of S3 objects validated by ETag.
+#   S3_CACHE_DIR        where cached objects live (default ~/.cache/shared_func/s3)
+#   S3_CACHE_MAX_BYTES  total size before least recently used entries are evicted (default 1 GiB)
+#   S3_CACHE_TTL        seconds an entry is trusted without asking S3 (default 0: always revalidate)
+cache_dir = os.environ.get("S3_CACHE_DIR", os.path.expanduser("~/.cache/shared_func/s3"))
+max_cache_bytes = int(os.environ.get("S3_CACHE_MAX_BYTES", 1024 ** 3))
+default_ttl = float(os.environ.get("S3_CACHE_TTL", 0))
+
+_evict_lock = threading.Lock()
+# Running size of the cache, so eviction only walks the directory when the
+# limit is crossed (None until the first walk)
+_cache_bytes = None
+
+
+def _entry_paths(bucket_name, key_name):
+    digest = hashlib.sha256(f"{bucket_name}/{key_name}".encode('utf-8')).hexdigest()
+    base = os.path.join(cache_dir, digest[:2], digest)
+    return base + ".data", base + ".json"
+
+
+def _read_meta(meta_path, data_path):
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if os.path.exists(data_path) else None
+
+
+def _write_atomic(path, data, mode='wb'):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_cached(data_path):
+    """Returns the cached bytes, or None if the entry was evicted meanwhile."""
+    try:
+        with open(data_path, 'rb') as f:
+            data = f.read()
+        # The data file's mtime is the LRU clock
+        os.utime(data_path)
+    except FileNotFoundError:
+        return None
+    return data
+
+
+def _track_cache_bytes(delta):
+    """Adds delta to the running cache size; returns True when eviction is due."""
+    global _cache_bytes
+    with _evict_lock:
+        if _cache_bytes is None:
+            return True
+        _cache_bytes += delta
+        return _cache_bytes > max_cache_bytes
+
+
+def get_s3_object_bytes(bucket_name, key_name, ttl=None, use_cache=True):
+    """
+    Returns the body of an S3 object, served from the local cache when possible.
+
+    Within ttl seconds of the last validation the cached copy is returned
+    without any request. After that a conditional GET (If-None-Match with the
+    cached ETag) is sent: a 304 costs no transfer, otherwise the new version
+    replaces the cached one.
+
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - key_name (str): the object key
+    - ttl (float, optional): seconds to trust a cached copy (default S3_CACHE_TTL)
+    - use_cache (bool): set to False to always download and skip the cache
+
+    Returns:
+    - bytes: the object body
+    """
+    s3 = get_client('s3')
+    if not use_cache:
+        return s3.get_object(Bucket=bucket_name, Key=key_name)['Body'].read()
+
+    ttl = default_ttl if ttl is None else ttl
+    data_path, meta_path = _entry_paths(bucket_name, key_name)
+    meta = _read_meta(meta_path, data_path)
+
+    if meta and time.time() - meta['validated_at'] < ttl:
+        data = _read_cached(data_path)
+        if data is not None:
+            return data
+        meta = None
+
+    params = {'Bucket': bucket_name, 'Key': key_name}
+    if meta:
+        params['IfNoneMatch'] = meta['etag']
+    try:
+        response = s3.get_object(**params)
+    except Exception as e:
+        status = getattr(e, 'response', {}).get('ResponseMetadata', {}).get('HTTPStatusCode')
+        if not (meta and status == 304):
+            raise
+        data = _read_cached(data_path)
+        if data is not None:
+            meta['validated_at'] = time.time()
+            _write_atomic(meta_path, json.dumps(meta), mode='w')
+            return data
+        # Evicted between the metadata check and the read: download it again
+        response = s3.get_object(Bucket=bucket_name, Key=key_name)
+
+    data = response['Body'].read()
+    previous_size = meta.get('size', 0) if meta else 0
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    _write_atomic(data_path, data)
+    _write_atomic(meta_path, json.dumps({
+        'bucket': bucket_name,
+        'key': key_name,
+        'etag': response['ETag'],
+        'size': len(data),
+        'validated_at': time.time(),
+    }), mode='w')
+    if _track_cache_bytes(len(data) - previous_size):
+        evict_s3_cache()
+    return data
+
+
+def evict_s3_cache(max_bytes=None):
+    """
+    Removes least recently used entries until the cache fits in max_bytes
+    (default S3_CACHE_MAX_BYTES).
+    """
+    global _cache_bytes
+    max_bytes = max_cache_bytes if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = []
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                if name.endswith(".data"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            for stale in (path, path[:-len(".data")] + ".json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+        _cache_bytes = total
+
+
+def invalidate_s3_cache(bucket_name=None, key_name=None):
+    """
+    Drops one cached object, or the whole cache when no bucket/key is given.
+    """
+    if bucket_name is None:
+        evict_s3_cache(max_bytes=0)
+        return
+    data_path, meta_path = _entry_paths(bucket_name, key_name)
+    try:
+        size = os.stat(data_path).st_size
+    except OSError:
+        size = 0
+    for path in (data_path, meta_path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    _track_cache_bytes(-size)
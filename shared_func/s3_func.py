@@ -1,9 +1,20 @@
-import boto3
+import os
+import io
+import time
+import random
+import gzip
+import json
+import hashlib
+import logging
+import threading
+import collections
+import concurrent.futures
+from shared_func.client_func import get_client, get_resource
 
 # Function to check if an object exists in an S3 bucket
 def check_object_exists(bucket_name, key_name):
     try:
-        s3 = boto3.client('s3')
+        s3 = get_client('s3')
         s3.head_object(Bucket=bucket_name, Key=key_name)
         return True
     except:
@@ -11,7 +22,7 @@ def check_object_exists(bucket_name, key_name):
 
 def copy_s3_object_to_folder(bucket_name_src, key_name_src, bucket_name_dest, key_name_dest):
     # Create S3 resource object
-    s3 = boto3.resource('s3')
+    s3 = get_resource('s3')
 
     # Specify copy source and destination
     copy_source = {
@@ -23,30 +34,7 @@ def copy_s3_object_to_folder(bucket_name_src, key_name_src, bucket_name_dest, ke
     destination_bucket = s3.Bucket(bucket_name_dest)
     destination_bucket.copy(copy_source, key_name_dest)
     
-def delete_all_s3_files_in_folder(bucket_name, folder_name):
-    """
-    
-    Args:
-    - bucket_name (str): the name of the S3 bucket containing the folder to delete files from
-    - folder_name (str): the name of the folder to delete files from
-    
-    Returns:
-    - None
-    """
-    s3 = boto3.client('s3')
-    
-    # List all objects in the specified folder
-    response = s3.list_objects_v2(Bucket=bucket_name, Prefix=f"{folder_name}/")
-    files = [obj['Key'] for obj in response.get("Contents")]
-    
-    # Delete each file in the specified folder
-    for key_obj in files:
-        print(f"DELETING: {key_obj}")
-        response = s3.delete_object(Bucket=bucket_name,Key=key_obj)
-    
-    print("Deletion complete.")
-
-def list_objects(bucket_name, folder_name_s3, search_strings):
+def list_objects(bucket_name, folder_name_s3, search_strings, use_index=False):
     """
     List the objects inside an S3 folder that contain the specified search strings in their filename.
 
@@ -54,11 +42,20 @@ def list_objects(bucket_name, folder_name_s3, search_strings):
     - bucket_name: str, the name of the S3 bucket
     - folder_name: str, the name of the S3 folder
     - search_strings: list of str, the list of search strings to look for in the filenames
+    - use_index: bool, search the local key index (see s3_index_func) instead of listing the folder
 
     Returns:
     - A list of objects that match the search strings in their filename
     """
-    s3 = boto3.resource('s3')
+    if use_index:
+        from shared_func.s3_index_func import search_s3_index
+        # An empty search matches nothing, as in the listing below (the index would return every key)
+        if not search_strings:
+            return []
+        matches = search_s3_index(bucket_name, folder_name_s3, substrings=search_strings)
+        return [x.split("/")[-1] for x in matches]
+
+    s3 = get_resource('s3')
     bucket = s3.Bucket(bucket_name)
     objects = bucket.objects.filter(Prefix=folder_name_s3)
     matches = []
@@ -71,7 +68,7 @@ def list_objects(bucket_name, folder_name_s3, search_strings):
 # Function to check if an object exists in an S3 bucket
 def check_object_exists(bucket_name, key_name):
     try:
-        s3 = boto3.client('s3')
+        s3 = get_client('s3')
         s3.head_object(Bucket=bucket_name, Key=key_name)
         return True
     except:
@@ -82,7 +79,7 @@ def put_string_in_s3_object(bucket_name, key_name, string):
     object_key = f'{folder_name}/{file_name}'
 
     # Create an S3 resource
-    s3 = boto3.resource('s3')
+    s3 = get_resource('s3')
 
     # Upload the string to the S3 bucket as an object
     res = s3.Bucket(bucket_name).put_object(Key=key_name, Body=string)
@@ -103,8 +100,10 @@ def upload_file(file_name, bucket, object_name=None):
     if object_name is None:
         object_name = os.path.basename(file_name)
 
+    from botocore.exceptions import ClientError
+
     # Upload the file
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
     try:
         response = s3_client.upload_file(file_name, bucket, object_name)
     except ClientError as e:
@@ -112,101 +111,737 @@ def upload_file(file_name, bucket, object_name=None):
         return False
     return True
 
-def delete_all_s3_files_in_folder(bucket_name, folder_name):
+def delete_all_s3_files_in_folder(bucket_name, folder_name, max_workers=8):
     """
-    Deletes all files in the specified S3 folder using the provided boto3 object
+    Deletes all files in the specified S3 folder, see delete_s3_prefix.
     
     Args:
     - bucket_name (str): the name of the S3 bucket containing the folder to delete files from
     - folder_name (str): the name of the folder to delete files from
+    - max_workers (int): number of delete_objects batches in flight
     
     Returns:
-    - None
+    - dict: deleted/failed counts and throughput
     """
-    s3 = boto3.client('s3')
-    
-    # List all objects in the specified folder
-    response = s3.list_objects_v2(Bucket=bucket_name, Prefix=f"{folder_name}/")
-    files = [obj['Key'] for obj in response.get("Contents")]
-    
-    # Delete each file in the specified folder
-    for key_obj in files:
-        print(f"DELETING: {key_obj}")
-        response = s3.delete_object(Bucket=bucket_name,Key=key_obj)
-    
-    print("Deletion complete.")
+    return delete_s3_prefix(bucket_name, f"{folder_name}/", max_workers=max_workers)
+
+
+def _delete_s3_batch(s3, bucket_name, keys, max_retries):
+    """
+    Deletes up to 1000 keys with one delete_objects call, retrying only the
+    keys reported in the response Errors array with exponential backoff.
+
+    Returns:
+    - tuple: (number of keys deleted, number of retries, list of errors left after the last retry)
+    """
+    pending = keys
+    retries = 0
+    for attempt in range(max_retries + 1):
+        response = s3.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in pending], 'Quiet': True}
+        )
+        errors = response.get('Errors', [])
+        if not errors or attempt == max_retries:
+            return len(keys) - len(errors), retries, errors
+        pending = [error['Key'] for error in errors]
+        retries += 1
+        time.sleep(min(2 ** attempt, 20) * random.uniform(0.05, 0.1))
+
+
+def delete_s3_prefix(bucket_name, prefix, max_workers=8, max_retries=5, verbose=True):
+    """
+    Deletes every object under a prefix.
+
+    All listing pages are streamed through a paginator and each page (up to
+    1000 keys) becomes one delete_objects request. Up to max_workers requests
+    run concurrently; keys reported in a response's Errors array are retried.
+
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - prefix (str): the key prefix to delete (e.g. 'folder/')
+    - max_workers (int): number of delete_objects batches in flight
+    - max_retries (int): retries for keys that failed inside a batch
+    - verbose (bool): print progress and throughput
+
+    Returns:
+    - dict: {'deleted': int, 'failed': int, 'retries': int, 'seconds': float, 'objects_per_sec': float, 'errors': list}
+    """
+    s3 = get_client('s3')
+    paginator = s3.get_paginator('list_objects_v2')
+    stats = {'deleted': 0, 'failed': 0, 'retries': 0, 'errors': []}
+    start = time.perf_counter()
+
+    def collect(future):
+        deleted, retries, errors = future.result()
+        stats['deleted'] += deleted
+        stats['retries'] += retries
+        stats['failed'] += len(errors)
+        stats['errors'].extend(errors)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"DELETED: {stats['deleted']} objects ({stats['deleted'] / elapsed:.0f} obj/s)")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix, PaginationConfig={'PageSize': 1000}):
+            keys = [obj['Key'] for obj in page.get('Contents', [])]
+            if not keys:
+                continue
+            in_flight.add(executor.submit(_delete_s3_batch, s3, bucket_name, keys, max_retries))
+            # Keep listing ahead of the deletes, but bound the number of queued batches
+            if len(in_flight) >= max_workers * 2:
+                done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+        for future in concurrent.futures.as_completed(in_flight):
+            collect(future)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['objects_per_sec'] = stats['deleted'] / stats['seconds'] if stats['seconds'] else 0.0
+    if verbose:
+        print(f"Deletion complete: {stats['deleted']} deleted, {stats['failed']} failed, "
+              f"{stats['retries']} retries in {stats['seconds']:.1f}s ({stats['objects_per_sec']:.0f} obj/s).")
+    return stats
 
 
 def download_file_from_s3(bucket_name, file_key, destination_path):
-    s3 = boto3.client('s3')
+    s3 = get_client('s3')
     try:
         s3.download_file(bucket_name, file_key, destination_path)
         print(f"File downloaded successfully to: {destination_path}")
     except Exception as e:
         print(f"Error downloading file: {e}")
 
-def upload_dataframe_to_s3(dataframe, bucket_name, key_name=''):
-    msg = f"uploading: {key_name}"
-    print(msg)
+class S3MultipartWriter(io.RawIOBase):
     """
-    Uploads a Pandas DataFrame to an S3 bucket using Boto3.
+    Write-only file object that streams into an S3 multipart upload.
+
+    Data is cut into part_size parts that are uploaded in the background by up
+    to max_concurrency threads while the caller keeps writing; at most
+    max_concurrency parts are held in memory. Objects smaller than one part are
+    sent with a single put_object. Use it as a context manager: the upload is
+    completed on a clean exit and aborted if an exception is raised.
+    """
+
+    min_part_size = 5 * 1024 * 1024
+
+    def __init__(self, bucket_name, key_name, part_size=16 * 1024 * 1024, max_concurrency=4, **put_kwargs):
+        self.bucket_name = bucket_name
+        self.key_name = key_name
+        self.part_size = max(part_size, self.min_part_size)
+        self.put_kwargs = put_kwargs
+        self.s3 = get_client('s3')
+        self.buffer = bytearray()
+        self.bytes_written = 0
+        self.upload_id = None
+        self.parts = []
+        self.futures = []
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.bytes_written
+
+    def write(self, data):
+        if self.closed:
+            # e.g. a late write after abort() must not start a new multipart upload
+            raise ValueError(f"Write to closed S3 upload s3://{self.bucket_name}/{self.key_name}")
+        self.buffer += data
+        self.bytes_written += len(data)
+        while len(self.buffer) >= self.part_size:
+            part = bytes(self.buffer[:self.part_size])
+            del self.buffer[:self.part_size]
+            self._submit_part(part)
+        return len(data)
+
+    def _submit_part(self, data):
+        if self.upload_id is None:
+            response = self.s3.create_multipart_upload(Bucket=self.bucket_name, Key=self.key_name, **self.put_kwargs)
+            self.upload_id = response['UploadId']
+        part_number = len(self.futures) + 1
+        # Blocks the writer while max_concurrency parts are already uploading
+        self.slots.acquire()
+        future = self.executor.submit(self._upload_part, part_number, data)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+
+    def _upload_part(self, part_number, data):
+        response = self.s3.upload_part(Bucket=self.bucket_name, Key=self.key_name, UploadId=self.upload_id,
+                                       PartNumber=part_number, Body=data)
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.upload_id is None:
+                self.s3.put_object(Bucket=self.bucket_name, Key=self.key_name, Body=bytes(self.buffer), **self.put_kwargs)
+            else:
+                if self.buffer:
+                    self._submit_part(bytes(self.buffer))
+                parts = [future.result() for future in self.futures]
+                self.s3.complete_multipart_upload(Bucket=self.bucket_name, Key=self.key_name, UploadId=self.upload_id,
+                                                  MultipartUpload={'Parts': parts})
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self.buffer = bytearray()
+            self.executor.shutdown(wait=True)
+            super().close()
+
+    def abort(self):
+        """Cancels the multipart upload so no orphaned parts are left behind."""
+        if self.upload_id is not None:
+            for future in self.futures:
+                future.cancel()
+            self.executor.shutdown(wait=True)
+            self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key_name, UploadId=self.upload_id)
+            self.upload_id = None
+        self.buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def upload_dataframe_to_s3(dataframe, bucket_name, key_name='', file_format=None, compression=None,
+                           part_size=16 * 1024 * 1024, max_concurrency=4):
+    """
+    Uploads a Pandas DataFrame to an S3 bucket, streaming the serialized
+    output straight into a multipart upload (nothing is written to disk and
+    the full object is never held in memory).
 
     Args:
         dataframe (pd.DataFrame): The Pandas DataFrame you want to upload.
         bucket_name (str): The name of the S3 bucket where you want to upload the file.
         key_name (str, optional): The S3 object key (path) where the file will be stored.
+        file_format (str, optional): 'csv', 'parquet' or 'json'. Taken from the key's extension if None
+            (a trailing '.gz' selects gzip compression, e.g. 'data.csv.gz').
+        compression (str, optional): 'gzip' for csv/json; any pyarrow codec ('snappy', 'zstd', 'gzip') for parquet.
+        part_size (int): Multipart part size in bytes (minimum 5 MiB).
+        max_concurrency (int): Number of parts uploaded in parallel.
     Returns:
         str: The S3 object's key (path) where the file was uploaded.
     """
-    # Extract the file format from the key_name
-    _, file_format = os.path.splitext(key_name)
-    file_format = file_format.lstrip('.')  # Remove the leading dot
-
-    # Create a file path where the DataFrame will be saved
-    file_path = key_name.split("/")[-1]
-
-    # Save the DataFrame to the file based on the extracted format
-    if file_format == 'csv':
-        dataframe.to_csv(file_path, index=False)
-    elif file_format == 'parquet':
-        dataframe.to_parquet(file_path, index=False)
-    elif file_format == 'json':
-        dataframe.to_json(file_path, orient='records', lines=True)
-    else:
+    print(f"uploading: {key_name}")
+
+    if file_format is None:
+        # Extract the file format from the key_name
+        root, extension = os.path.splitext(key_name)
+        if extension == '.gz':
+            compression = compression or 'gzip'
+            root, extension = os.path.splitext(root)
+        file_format = extension.lstrip('.')  # Remove the leading dot
+
+    if file_format not in ('csv', 'parquet', 'json'):
         raise ValueError("Unsupported file format. Use 'csv', 'parquet', or 'json'.")
+    if file_format != 'parquet' and compression not in (None, 'gzip'):
+        raise ValueError("Only gzip compression is supported for csv and json.")
+
+    with S3MultipartWriter(bucket_name, key_name, part_size=part_size, max_concurrency=max_concurrency) as writer:
+        if file_format == 'parquet':
+            dataframe.to_parquet(writer, index=False, compression=compression or 'snappy')
+            return key_name
+
+        target = gzip.GzipFile(fileobj=writer, mode='wb') if compression == 'gzip' else writer
+        text = io.TextIOWrapper(target, encoding='utf-8', newline='', write_through=True)
+        if file_format == 'csv':
+            dataframe.to_csv(text, index=False)
+        else:
+            dataframe.to_json(text, orient='records', lines=True)
+        # Flush and release the wrapper without closing the underlying writer
+        text.flush()
+        text.detach()
+        if target is not writer:
+            target.close()
+
+    return key_name
+
+
+def list_s3_objects(bucket_name, prefix, suffix=None):
+    """
+    Yields every object under a prefix, following all list_objects_v2 pages.
 
-    print(dataframe.head())
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - prefix (str): the key prefix
+    - suffix (str, optional): only yield keys ending with this suffix
 
+    Returns:
+    - generator of dict: the listing entries ('Key', 'Size', 'ETag', 'LastModified', ...)
+    """
+    paginator = get_client('s3').get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if suffix is None or obj['Key'].endswith(suffix):
+                yield obj
 
 
-def load_parquet_folder_from_s3(bucket_name, prefix):
+class S3RangeReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over an S3 object. Every read is a ranged
+    GET, so a Parquet reader only fetches the footer and the column chunks it
+    needs instead of the whole file.
+    """
+
+    def __init__(self, bucket_name, key_name, size=None):
+        self.bucket_name = bucket_name
+        self.key_name = key_name
+        self.s3 = get_client('s3')
+        if size is None:
+            size = self.s3.head_object(Bucket=bucket_name, Key=key_name)['ContentLength']
+        self.size = size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        return self.position
+
+    def readinto(self, buffer):
+        end = min(self.position + len(buffer), self.size)
+        if end <= self.position:
+            return 0
+        response = self.s3.get_object(Bucket=self.bucket_name, Key=self.key_name,
+                                      Range=f"bytes={self.position}-{end - 1}")
+        data = response['Body'].read()
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def _row_group_may_match(row_group, filters):
+    """
+    Uses the min/max statistics of a row group to decide whether any row can
+    satisfy every (column, op, value) filter. Row groups without statistics
+    are always read.
+    """
+    names = [row_group.column(i).path_in_schema for i in range(row_group.num_columns)]
+    for column, op, value in filters:
+        if column not in names:
+            continue
+        stats = row_group.column(names.index(column)).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        low, high = stats.min, stats.max
+        try:
+            if op in ('=', '==') and not low <= value <= high:
+                return False
+            if op == 'in' and not any(low <= v <= high for v in value):
+                return False
+            if op == '<' and not low < value:
+                return False
+            if op == '<=' and not low <= value:
+                return False
+            if op == '>' and not high > value:
+                return False
+            if op == '>=' and not high >= value:
+                return False
+        except TypeError:
+            continue
+    return True
+
+
+def _filters_to_expression(filters):
+    import pyarrow.compute as pc
+
+    operators = {
+        '=': lambda f, v: f == v, '==': lambda f, v: f == v, '!=': lambda f, v: f != v,
+        '<': lambda f, v: f < v, '<=': lambda f, v: f <= v,
+        '>': lambda f, v: f > v, '>=': lambda f, v: f >= v,
+        'in': lambda f, v: f.isin(v), 'not in': lambda f, v: ~f.isin(v),
+    }
+    expression = None
+    for column, op, value in filters:
+        condition = operators[op](pc.field(column), value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _read_parquet_row_group(bucket_name, obj, metadata, index, columns, filters):
+    import pyarrow.parquet as pq
+
+    source = S3RangeReader(bucket_name, obj['Key'], size=obj['Size'])
+    read_columns = columns
+    if columns is not None and filters:
+        read_columns = list(dict.fromkeys(list(columns) + [f[0] for f in filters]))
+    table = pq.ParquetFile(source, metadata=metadata).read_row_group(index, columns=read_columns)
+    if filters:
+        table = table.filter(_filters_to_expression(filters))
+        if columns is not None:
+            table = table.select(list(columns))
+    return table
+
+
+def _read_parquet_footer(bucket_name, obj):
+    import pyarrow.parquet as pq
+
+    return obj, pq.read_metadata(S3RangeReader(bucket_name, obj['Key'], size=obj['Size']))
+
+
+def iter_parquet_folder_from_s3(bucket_name, prefix, columns=None, filters=None, max_workers=8, suffix='.parquet'):
+    """
+    Yields the .parquet files under a prefix as pyarrow Tables, one per row group.
+
+    Only the Parquet footers and the needed column chunks are downloaded
+    (ranged GETs). Row groups whose min/max statistics cannot satisfy the
+    filters are skipped; the remaining rows are filtered exactly. At most
+    max_workers row groups are downloaded or held at once, so memory stays
+    bounded for large prefixes.
+
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - prefix (str): prefix (folder path) within the bucket
+    - columns (list, optional): columns to read (all if None)
+    - filters (list, optional): AND-ed (column, op, value) tuples, op in =, ==, !=, <, <=, >, >=, in, not in
+    - max_workers (int): number of concurrent downloads
+    - suffix (str, optional): only read keys ending with this (None reads every
+      object, e.g. Athena UNLOAD output which has no extension)
+
+    Returns:
+    - generator of pyarrow.Table
+    """
+    filters = filters or []
+    objects = iter(list_s3_objects(bucket_name, prefix, suffix=suffix))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Footers are read a few files ahead rather than all up front, so each
+        # file's row groups are queued right behind its footer instead of
+        # behind every footer under the prefix
+        footers = collections.deque()
+
+        def read_ahead():
+            while len(footers) < max_workers:
+                obj = next(objects, None)
+                if obj is None:
+                    break
+                footers.append(executor.submit(_read_parquet_footer, bucket_name, obj))
+
+        read_ahead()
+        in_flight = collections.deque()
+        while footers:
+            obj, metadata = footers.popleft().result()
+            read_ahead()
+            for index in range(metadata.num_row_groups):
+                if not _row_group_may_match(metadata.row_group(index), filters):
+                    continue
+                in_flight.append(executor.submit(_read_parquet_row_group, bucket_name, obj,
+                                                 metadata, index, columns, filters))
+                # Yield in order, keeping at most max_workers row groups in memory
+                if len(in_flight) >= max_workers:
+                    yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def load_parquet_folder_from_s3(bucket_name, prefix, columns=None, filters=None, max_workers=8, as_arrow=False):
     """
     Loads all .parquet files from a folder in an S3 bucket into a single pandas DataFrame.
     
     Parameters:
         bucket_name (str): Name of the S3 bucket.
         prefix (str): Prefix (folder path) within the bucket.
+        columns (list, optional): Columns to read (all if None).
+        filters (list, optional): (column, op, value) tuples, see iter_parquet_folder_from_s3.
+        max_workers (int): Number of concurrent downloads.
+        as_arrow (bool): Return a pyarrow.Table instead of a DataFrame.
         
     Returns:
         pd.DataFrame: Combined DataFrame of all parquet files.
     """
-    s3 = boto3.client('s3')
-    response = s3.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
+    import pyarrow as pa
+
+    tables = list(iter_parquet_folder_from_s3(bucket_name, prefix, columns=columns,
+                                              filters=filters, max_workers=max_workers))
+    if not tables:
+        raise ValueError("No .parquet files (or matching row groups) found in the specified S3 prefix.")
+
+    # Files written at different times may add or drop columns; missing ones become nulls
+    table = pa.concat_tables(tables, promote_options="default")
+    return table if as_arrow else table.to_pandas()
+
+
+def _file_md5(path, chunk_size=8 * 1024 * 1024):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _load_sync_manifest(manifest_path, bucket_name, prefix):
+    """Returns the manifest's file entries, or {} if it belongs to another bucket/prefix."""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('bucket') != bucket_name or manifest.get('prefix') != prefix:
+        return {}
+    return manifest.get('files', {})
+
+
+def _save_sync_manifest(manifest_path, bucket_name, prefix, files):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'bucket': bucket_name, 'prefix': prefix, 'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _sync_prefix(prefix):
+    # "reports" must not match the sibling "reports-old/..." when listing or deleting
+    return prefix if not prefix or prefix.endswith('/') else prefix + '/'
+
+
+def _local_sync_path(local_dir, relative_path):
+    """
+    Returns the local path for an object's relative key, or None when the key
+    (e.g. "../x" or "/etc/x") would land outside local_dir.
+    """
+    relative_path = os.path.normpath(relative_path)
+    if os.path.isabs(relative_path) or relative_path.split(os.sep)[0] == '..':
+        return None
+    root = os.path.realpath(local_dir)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    return path if os.path.commonpath([root, path]) == root and path != root else None
 
-    if 'Contents' not in response:
-        raise ValueError("No files found in the specified S3 prefix.")
 
-    dfs = []
-    for obj in response['Contents']:
-        key = obj['Key']
-        if key.endswith('.parquet'):
-            buffer = io.BytesIO()
-            s3.download_fileobj(bucket_name, key, buffer)
-            buffer.seek(0)
-            df = pd.read_parquet(buffer)
-            dfs.append(df)
+def _sync_key(prefix, relative_path):
+    relative_path = relative_path.replace(os.sep, '/')
+    return f"{prefix.rstrip('/')}/{relative_path}" if prefix else relative_path
 
-    if not dfs:
-        raise ValueError("No .parquet files found in the specified S3 prefix.")
 
-    return pd.concat(dfs, ignore_index=True)
+def _list_local_files(local_dir, manifest_path):
+    files = {}
+    for root, _, names in os.walk(local_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            if os.path.abspath(path) in (os.path.abspath(manifest_path), os.path.abspath(manifest_path) + '.tmp'):
+                continue
+            stat = os.stat(path)
+            files[os.path.relpath(path, local_dir)] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+def _run_sync_transfers(tasks, transfer, manifest_path, bucket_name, prefix, files, max_workers, verbose):
+    """
+    Runs transfer(relative_path) for every task on a thread pool, recording
+    each finished file in the manifest so an interrupted sync resumes where
+    it stopped.
+    """
+    done = 0
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(transfer, relative_path): relative_path for relative_path in tasks}
+            for future in concurrent.futures.as_completed(futures):
+                relative_path = futures[future]
+                files[relative_path] = future.result()
+                done += 1
+                if verbose:
+                    print(f"[{done}/{len(tasks)}] {relative_path}")
+                if done % 100 == 0:
+                    _save_sync_manifest(manifest_path, bucket_name, prefix, files)
+    finally:
+        _save_sync_manifest(manifest_path, bucket_name, prefix, files)
+
+
+def sync_folder_to_s3(local_dir, bucket_name, prefix='', manifest_path=None, max_workers=8,
+                      delete=False, multipart_threshold=64 * 1024 * 1024, verbose=True):
+    """
+    Uploads the files of a local folder that are new or changed since the last sync.
+
+    A manifest (path, size, mtime, MD5, ETag) is kept in the folder. Files
+    whose size and mtime match the manifest are not re-hashed; a file is
+    uploaded when its content hash changed or the remote ETag no longer
+    matches the one recorded. Transfers run on a thread pool, large files
+    use multipart uploads, and the manifest is updated as files complete so
+    an interrupted sync resumes instead of starting over.
+
+    Args:
+    - local_dir (str): the local folder to upload
+    - bucket_name (str): the destination bucket
+    - prefix (str): the destination key prefix
+    - manifest_path (str, optional): defaults to <local_dir>/.s3sync-manifest.json
+    - max_workers (int): number of files transferred in parallel
+    - delete (bool): delete remote objects under the prefix that no longer exist locally
+    - multipart_threshold (int): files larger than this use multipart uploads
+    - verbose (bool): print each transferred file
+
+    Returns:
+    - dict: counts of uploaded, skipped and deleted files, bytes uploaded and elapsed seconds
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    start = time.perf_counter()
+    s3 = get_client('s3')
+    prefix = _sync_prefix(prefix)
+    manifest_path = manifest_path or os.path.join(local_dir, '.s3sync-manifest.json')
+    files = _load_sync_manifest(manifest_path, bucket_name, prefix)
+    local_files = _list_local_files(local_dir, manifest_path)
+    remote = {obj['Key']: obj['ETag'] for obj in list_s3_objects(bucket_name, prefix)}
+    transfer_config = TransferConfig(multipart_threshold=multipart_threshold,
+                                     multipart_chunksize=multipart_threshold, max_concurrency=4)
+
+    tasks = []
+    pending = {}
+    for relative_path, (size, mtime) in sorted(local_files.items()):
+        entry = files.get(relative_path)
+        if entry and entry['size'] == size and entry['mtime'] == mtime:
+            md5 = entry['md5']
+        else:
+            md5 = _file_md5(os.path.join(local_dir, relative_path))
+        remote_etag = remote.get(_sync_key(prefix, relative_path))
+        if entry and entry['md5'] == md5 and entry['etag'] == remote_etag:
+            files[relative_path] = dict(entry, size=size, mtime=mtime)
+            continue
+        if not entry and remote_etag == f'"{md5}"':
+            # Already uploaded by something else (single-part ETag == MD5)
+            files[relative_path] = {'size': size, 'mtime': mtime, 'md5': md5, 'etag': remote_etag}
+            continue
+        # Entries only go back into the manifest once their transfer finished
+        tasks.append(relative_path)
+        pending[relative_path] = {'size': size, 'mtime': mtime, 'md5': md5}
+        files.pop(relative_path, None)
+
+    def upload(relative_path):
+        entry = pending[relative_path]
+        path = os.path.join(local_dir, relative_path)
+        key = _sync_key(prefix, relative_path)
+        if entry['size'] < multipart_threshold:
+            with open(path, 'rb') as f:
+                etag = s3.put_object(Bucket=bucket_name, Key=key, Body=f)['ETag']
+        else:
+            s3.upload_file(path, bucket_name, key, Config=transfer_config)
+            etag = s3.head_object(Bucket=bucket_name, Key=key)['ETag']
+        return dict(entry, etag=etag)
+
+    _run_sync_transfers(tasks, upload, manifest_path, bucket_name, prefix, files, max_workers, verbose)
+
+    deleted = 0
+    if delete:
+        local_keys = {_sync_key(prefix, relative_path) for relative_path in local_files}
+        stale = sorted(key for key in remote if key not in local_keys)
+        for i in range(0, len(stale), 1000):
+            deleted += _delete_s3_batch(s3, bucket_name, stale[i:i + 1000], max_retries=5)[0]
+        for relative_path in [p for p in files if p not in local_files]:
+            del files[relative_path]
+        _save_sync_manifest(manifest_path, bucket_name, prefix, files)
+
+    summary = {
+        'uploaded': len(tasks),
+        'skipped': len(local_files) - len(tasks),
+        'deleted': deleted,
+        'bytes': sum(local_files[p][0] for p in tasks),
+        'seconds': time.perf_counter() - start,
+    }
+    if verbose:
+        print(f"Sync complete: {summary['uploaded']} uploaded, {summary['skipped']} unchanged, "
+              f"{summary['deleted']} deleted, {summary['bytes']} bytes in {summary['seconds']:.1f}s.")
+    return summary
+
+
+def sync_s3_to_folder(bucket_name, prefix, local_dir, manifest_path=None, max_workers=8,
+                      delete=False, multipart_threshold=64 * 1024 * 1024, verbose=True):
+    """
+    Downloads the objects under a prefix that are new or changed since the last sync.
+
+    An object is downloaded when its ETag differs from the one recorded in
+    the manifest, or when the local copy was modified (size/mtime changed)
+    or removed. Transfers run on a thread pool with multipart downloads for
+    large objects, and the manifest is updated as files complete.
+
+    Args:
+    - bucket_name (str): the source bucket
+    - prefix (str): the source key prefix
+    - local_dir (str): the destination folder
+    - manifest_path (str, optional): defaults to <local_dir>/.s3sync-manifest.json
+    - max_workers (int): number of files transferred in parallel
+    - delete (bool): delete previously synced local files whose object no longer exists
+    - multipart_threshold (int): objects larger than this are downloaded in parallel ranges
+    - verbose (bool): print each transferred file
+
+    Returns:
+    - dict: counts of downloaded, skipped and deleted files, bytes downloaded and elapsed seconds
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    start = time.perf_counter()
+    s3 = get_client('s3')
+    prefix = _sync_prefix(prefix)
+    os.makedirs(local_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(local_dir, '.s3sync-manifest.json')
+    files = _load_sync_manifest(manifest_path, bucket_name, prefix)
+    local_files = _list_local_files(local_dir, manifest_path)
+    transfer_config = TransferConfig(multipart_threshold=multipart_threshold,
+                                     multipart_chunksize=multipart_threshold, max_concurrency=4)
+
+    remote = {}
+    for obj in list_s3_objects(bucket_name, prefix):
+        relative_path = obj['Key'][len(prefix):].lstrip('/')
+        if not relative_path or relative_path.endswith('/'):
+            continue
+        if _local_sync_path(local_dir, relative_path) is None:
+            print(f"Skipping {obj['Key']}: resolves outside {local_dir}")
+            continue
+        remote[os.path.normpath(relative_path)] = obj
+
+    tasks = []
+    for relative_path, obj in sorted(remote.items()):
+        entry = files.get(relative_path)
+        local = local_files.get(relative_path)
+        if entry and local and entry['etag'] == obj['ETag'] and (entry['size'], entry['mtime']) == local:
+            continue
+        tasks.append(relative_path)
+        files.pop(relative_path, None)
+
+    def download(relative_path):
+        obj = remote[relative_path]
+        path = _local_sync_path(local_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        s3.download_file(bucket_name, obj['Key'], path, Config=transfer_config)
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime, 'md5': None, 'etag': obj['ETag']}
+
+    _run_sync_transfers(tasks, download, manifest_path, bucket_name, prefix, files, max_workers, verbose)
+
+    deleted = 0
+    if delete:
+        for relative_path in sorted(p for p in list(files) if p not in remote):
+            path = _local_sync_path(local_dir, relative_path)
+            if path and os.path.exists(path):
+                os.remove(path)
+                deleted += 1
+            del files[relative_path]
+        _save_sync_manifest(manifest_path, bucket_name, prefix, files)
+
+    summary = {
+        'downloaded': len(tasks),
+        'skipped': len(remote) - len(tasks),
+        'deleted': deleted,
+        'bytes': sum(remote[p]['Size'] for p in tasks),
+        'seconds': time.perf_counter() - start,
+    }
+    if verbose:
+        print(f"Sync complete: {summary['downloaded']} downloaded, {summary['skipped']} unchanged, "
+              f"{summary['deleted']} deleted, {summary['bytes']} bytes in {summary['seconds']:.1f}s.")
+    return summary
@@ -0,0 +1,128 @@
+import os
+import hashlib
+import sqlite3
+from shared_func.client_func import get_client
+
+# Local SQLite index of the keys under a bucket/prefix, so substring/glob
+# searches and existence checks do not re-list the bucket every time.
+#   S3_INDEX_DIR  where index databases live (default ~/.cache/shared_func/s3_index)
+index_dir = os.environ.get("S3_INDEX_DIR", os.path.expanduser("~/.cache/shared_func/s3_index"))
+
+
+def _index_path(bucket_name, prefix):
+    digest = hashlib.sha256(f"{bucket_name}/{prefix}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(index_dir, f"{bucket_name}-{digest}.sqlite")
+
+
+def _connect(bucket_name, prefix):
+    os.makedirs(index_dir, exist_ok=True)
+    connection = sqlite3.connect(_index_path(bucket_name, prefix))
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS objects ("
+        "key TEXT PRIMARY KEY, size INTEGER, etag TEXT, last_modified TEXT)"
+    )
+    return connection
+
+
+def refresh_s3_index(bucket_name, prefix='', full=False):
+    """
+    Brings the local key index of a bucket/prefix up to date.
+
+    An incremental refresh lists only the keys after the last indexed one
+    (StartAfter), which is cheap for append-only layouts such as date or
+    sequence named keys. It cannot see deletions or new keys that sort
+    before the last indexed key; use full=True to rebuild the index.
+
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - prefix (str): the key prefix to index
+    - full (bool): drop the index and re-list everything
+
+    Returns:
+    - int: the number of keys added or updated
+    """
+    s3 = get_client('s3')
+    paginator = s3.get_paginator('list_objects_v2')
+    connection = _connect(bucket_name, prefix)
+    added = 0
+    with connection:
+        params = {'Bucket': bucket_name, 'Prefix': prefix}
+        if full:
+            connection.execute("DELETE FROM objects")
+        else:
+            last_key = connection.execute("SELECT MAX(key) FROM objects").fetchone()[0]
+            if last_key:
+                params['StartAfter'] = last_key
+
+        for page in paginator.paginate(**params):
+            rows = [(obj['Key'], obj['Size'], obj['ETag'], obj['LastModified'].isoformat())
+                    for obj in page.get('Contents', [])]
+            connection.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)", rows)
+            added += len(rows)
+    connection.close()
+    return added
+
+
+def search_s3_index(bucket_name, prefix='', substrings=None, pattern=None, refresh=True, limit=None):
+    """
+    Searches the indexed keys of a bucket/prefix.
+
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - prefix (str): the indexed key prefix
+    - substrings (list of str, optional): keys containing any of these strings
+    - pattern (str, optional): a glob pattern matched against the full key, e.g. '*/2024-*.csv'
+    - refresh (bool): run an incremental refresh first
+    - limit (int, optional): maximum number of keys returned
+
+    Returns:
+    - list of str: the matching keys, sorted
+    """
+    if refresh:
+        refresh_s3_index(bucket_name, prefix)
+
+    conditions, params = [], []
+    if substrings:
+        conditions.append("(" + " OR ".join("instr(key, ?) > 0" for _ in substrings) + ")")
+        params.extend(substrings)
+    if pattern:
+        conditions.append("key GLOB ?")
+        params.append(pattern)
+    query = "SELECT key FROM objects"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY key"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+
+    connection = _connect(bucket_name, prefix)
+    try:
+        return [row[0] for row in connection.execute(query, params)]
+    finally:
+        connection.close()
+
+
+def keys_exist_in_s3_index(bucket_name, keys, prefix='', refresh=True):
+    """
+    Checks thousands of keys at once against the index instead of one HEAD per key.
+
+    Args:
+    - bucket_name (str): the name of the S3 bucket
+    - keys (iterable of str): the keys to check
+    - prefix (str): the indexed key prefix the keys live under
+    - refresh (bool): run an incremental refresh first
+
+    Returns:
+    - set of str: the keys that exist
+    """
+    if refresh:
+        refresh_s3_index(bucket_name, prefix)
+
+    connection = _connect(bucket_name, prefix)
+    try:
+        connection.execute("CREATE TEMP TABLE wanted (key TEXT PRIMARY KEY)")
+        connection.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((key,) for key in keys))
+        rows = connection.execute("SELECT objects.key FROM wanted JOIN objects ON objects.key = wanted.key")
+        return {row[0] for row in rows}
+    finally:
+        connection.close()
@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import get_client
 import json
 from botocore.exceptions import ClientError
 
@@ -13,7 +13,7 @@ def get_secret(secret_name):
     - dct (dict): a dictionary containing the values in the specified secret
     """
     # Initialize the Secrets Manager client using the boto3
-    client = boto3.client('secretsmanager')
+    client = get_client('secretsmanager')
     
     # Use Secrets Manager client object to get secret value
     get_secret_value_response = client.get_secret_value(SecretId=secret_name)
@@ -34,7 +34,7 @@ def list_secrets(region_name='us-east-1', verbose=True):
     list: List of secret names.
     """
     # Initialize the Secrets Manager client
-    client = boto3.client('secretsmanager', region_name=region_name)
+    client = get_client('secretsmanager', region_name=region_name)
 
     # Call the list_secrets API with pagination
     secret_names = []
@@ -74,7 +74,7 @@ def create_secret(secret_name, json_path):
     secret_value_str = json.dumps(secret_value_json)
 
     # Initialize the Secrets Manager client
-    client = boto3.client('secretsmanager')
+    client = get_client('secretsmanager')
 
     try:
         # Try to create the secret
@@ -113,7 +113,7 @@ def delete_secret(secret_name, region_name='us-east-1'):
     dict: Response from the Secrets Manager API.
     """
     # Initialize the Secrets Manager client
-    client = boto3.client('secretsmanager', region_name=region_name)
+    client = get_client('secretsmanager', region_name=region_name)
 
     # Call the delete_secret API
     response = client.delete_secret(
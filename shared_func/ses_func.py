@@ -1,4 +1,4 @@
-import boto3
+from shared_func.client_func import lazy_client
 import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -6,8 +6,8 @@ from email.mime.base import MIMEBase
 from email import encoders
 
 # Initialize the SES and S3 clients
-ses_client = boto3.client('ses', region_name='us-east-1')
-s3_client = boto3.client('s3')
+ses_client = lazy_client('ses', region_name='us-east-1')
+s3_client = lazy_client('s3')
 
 # Step 1: Verify an Email Address in SES
 def is_email_verified(email):
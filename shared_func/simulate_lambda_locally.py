@@ -1,8 +1,7 @@
-import boto3
 import os
 import json
 
-def read_aws_credentials(json_file_path = os.environ["AWS_TEMP_CRED"]):
+def read_aws_credentials(json_file_path=None):
     """
     Reads the AWS credentials from a JSON file.
 
@@ -12,6 +11,7 @@ def read_aws_credentials(json_file_path = os.environ["AWS_TEMP_CRED"]):
     Returns:
     - Tuple containing the AWS access key ID, secret access key, and session token.
     """
+    json_file_path = json_file_path or os.environ["AWS_TEMP_CRED"]
     with open(json_file_path) as f:
         credentials = json.load(f)
         aws_key = credentials.get("id")
@@ -29,6 +29,8 @@ def create_boto3_session():
     Returns:
     - Boto3 session object.
     """
+    import boto3
+
     aws_key, aws_secret, aws_token = read_aws_credentials()
     return boto3.Session(
         region_name='us-east-1',
@@ -37,7 +39,7 @@ def create_boto3_session():
         aws_session_token=aws_token
     )
 
-def simulate_lambda_locally(event_json_path="event.json", json_aws_cred=os.environ["AWS_KEY"]):
+def simulate_lambda_locally(event_json_path="event.json", json_aws_cred=None):
     if "AWS_KEY" in os.environ:
         # Get the path to the JSON file containing AWS credentials from an environment variable
         # Read the AWS credentials from the JSON file
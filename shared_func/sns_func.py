@@ -1,8 +1,7 @@
-import boto3
-import config
+from shared_func.client_func import lazy_client
 
 # Create an SNS client
-sns_client = boto3.client('sns')
+sns_client = lazy_client('sns')
 
 # Create an SNS topic
 def create_sns_topic(topic_name):
@@ -1,14 +1,20 @@
 import sys
 import os
-import boto3
+import time
+import random
+import threading
+import itertools
+import collections
+import contextlib
+import concurrent.futures
+from shared_func.client_func import get_client, get_resource
 from time import sleep
 import json
-import pymysql
 from os import environ
-import mysql.connector
-from secret_manager_func import *
+from shared_func.secret_manager_func import *
+from shared_func.s3_cache_func import get_s3_object_bytes
 
-def create_boto3_session(json_file_path = os.environ["AWS_KEY"]):
+def create_boto3_session(json_file_path=None):
     """
     Creates a new Boto3 session using AWS credentials stored in a JSON file.
 
@@ -18,6 +24,10 @@ def create_boto3_session(json_file_path = os.environ["AWS_KEY"]):
     Returns:
     - Boto3 session object.
     """
+    if json_file_path is None:
+        json_file_path = os.environ["AWS_KEY"]
+    import boto3
+
     aws_key, aws_secret, aws_token = read_aws_credentials(json_file_path)
     return boto3.Session(
         region_name='us-east-1',
@@ -44,17 +54,16 @@ def read_aws_credentials(json_file_path):
     return aws_key, aws_secret, aws_token
 
 def write_sql_file_to_s3(bucket_name, key_name, sql_string):
-    s3 = boto3.resource('s3')
+    s3 = get_resource('s3')
     # Upload SQL string to S3 file
     s3.Object(bucket_name, key_name).put(Body=sql_string)
 
     # Return URL of the S3 file
     return f's3://{bucket_name}/{key_name}'
 
-def download_sql_file(bucket_name, key_name):
-    s3 = boto3.client('s3')
-    obj = s3.get_object(Bucket=bucket_name, Key=key_name)
-    body = obj['Body'].read().decode('utf-8')
+def download_sql_file(bucket_name, key_name, use_cache=True):
+    # Served from the local ETag-validated cache unless use_cache is False
+    body = get_s3_object_bytes(bucket_name, key_name, use_cache=use_cache).decode('utf-8')
     return body
 
 
@@ -107,6 +116,8 @@ def connect_to_database():
     Connects to the database using the credentials in the JSON file or environment variables.
     """
     
+    import mysql.connector
+
     db_cred = get_master_database_credentials()
     connection = mysql.connector.connect(
         host=db_cred['host'],
@@ -116,29 +127,185 @@ def connect_to_database():
     return connection
 
 
-def query_mysql(query=None):
+class MySQLConnectionPool:
+    """
+    Thread-safe pool of pymysql connections.
+
+    At most size connections are open at once; acquire blocks when all are
+    in use. Idle connections are reused most-recently-used first, pinged
+    (and transparently reconnected) when they have been idle longer than
+    ping_interval, and closed once idle longer than idle_timeout.
+    Like plain pymysql connections, pooled connections do not autocommit:
+    changes are only kept when the caller commits, e.g. with transaction().
+    release() rolls back whatever is still open, so a reused connection
+    never carries uncommitted changes or a stale transaction snapshot.
+
+    Usage:
+        pool = get_mysql_pool()
+        with pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        with pool.transaction() as connection:
+            ...  # committed on success, rolled back on error
+    """
+
+    def __init__(self, size=8, idle_timeout=300, ping_interval=30, **connect_kwargs):
+        import pymysql
+
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.connect_kwargs = dict({'charset': 'utf8mb4', 'cursorclass': pymysql.cursors.DictCursor,
+                                    'autocommit': False}, **connect_kwargs)
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+        self.stats = {'connects': 0, 'reuses': 0, 'pings': 0, 'discarded': 0}
+
+    def acquire(self, timeout=None):
+        """Returns an open connection; give it back with release()."""
+        import pymysql
+
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No MySQL connection available after {timeout}s (pool size {self.size}).")
+        try:
+            with self.lock:
+                self._close_expired()
+                connection, last_used = self.idle.pop() if self.idle else (None, None)
+            if connection is None:
+                connection = pymysql.connect(**self.connect_kwargs)
+                self._count('connects')
+            else:
+                self._count('reuses')
+                if time.monotonic() - last_used > self.ping_interval:
+                    self._count('pings')
+                    connection.ping(reconnect=True)
+            return connection
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        """Returns a connection to the pool, rolling back any open transaction."""
+        from pymysql.constants import SERVER_STATUS
+
+        try:
+            if not discard and connection.open and connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                connection.rollback()
+        except Exception:
+            discard = True
+        try:
+            if discard or not connection.open:
+                self._count('discarded')
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            else:
+                with self.lock:
+                    self.idle.append((connection, time.monotonic()))
+                    self._close_expired()
+        finally:
+            self.slots.release()
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def _close_expired(self):
+        # Oldest connections are at the front of the idle list
+        now = time.monotonic()
+        while self.idle and now - self.idle[0][1] > self.idle_timeout:
+            connection, _ = self.idle.pop(0)
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """Context manager that acquires a connection and always releases it."""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    @contextlib.contextmanager
+    def transaction(self, timeout=None):
+        """Context manager around a transaction: commit on success, rollback on error."""
+        with self.connection(timeout) as connection:
+            connection.begin()
+            try:
+                yield connection
+            except Exception:
+                connection.rollback()
+                raise
+            connection.commit()
+
+    def close(self):
+        """Closes every idle connection."""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_mysql_pool(master=False, size=None, **kwargs):
+    """
+    Returns the shared connection pool for the regular credentials
+    (get_database_credentials) or, with master=True, the master credentials
+    (get_master_database_credentials). Credentials are read once, when the
+    pool is created.
+
+    Args:
+    - master (bool): use the master credentials
+    - size (int, optional): pool size on creation (default MYSQL_POOL_SIZE or 8)
+    - **kwargs: idle_timeout, ping_interval or extra pymysql.connect arguments, used on creation
+
+    Returns:
+    - MySQLConnectionPool
+    """
+    with _pools_lock:
+        pool = _pools.get(master)
+        if pool is None:
+            db_cred = get_master_database_credentials() if master else get_database_credentials()
+            connect_kwargs = {key: db_cred[key] for key in ('host', 'user', 'password', 'port', 'database')
+                              if key in db_cred}
+            if 'port' in connect_kwargs:
+                connect_kwargs['port'] = int(connect_kwargs['port'])
+            size = size or int(os.environ.get("MYSQL_POOL_SIZE", 8))
+            pool = _pools[master] = MySQLConnectionPool(size=size, **dict(connect_kwargs, **kwargs))
+        return pool
+
+
+def query_mysql(query=None, stream=False, batch_size=10000):
     if query is None:
         print("Query parameter is missing.")
         return None
 
-    db_cred = get_database_credentials()
+    # Streaming returns a generator of dict rows read through a server-side cursor
+    if stream:
+        import pymysql
 
-    # Connect to the database
-    connection = pymysql.connect(
-        host=db_cred['host'],
-        user=db_cred['user'],
-        password=db_cred['password'],
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
-    )
+        return (row for _, _, rows in _iter_unbuffered(query, cursorclass=pymysql.cursors.SSDictCursor,
+                                                     batch_size=batch_size)
+                for row in rows)
 
-        # Execute the query
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        result = cursor.fetchall()
+    # Execute the query on a pooled connection. Nothing is committed (as with
+    # the former per-call connection): use execute_sql_queries for changes
+    with get_mysql_pool().connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+            result = cursor.fetchall()
 
-        # Close the connection and return the result
-    connection.close()
     return result
 
 
@@ -146,37 +313,20 @@ def execute_sql_queries(queries):
     """
     Executes a list of SQL queries in a batch using transactions.
     """
-    connection = connect_to_database()
-    cursor = connection.cursor()
     try:
-        cursor.execute("START TRANSACTION")
-        for query in queries:
-            print(query)
-            cursor.execute(query)
-        cursor.execute("COMMIT")
+        with get_mysql_pool(master=True).transaction() as connection:
+            with connection.cursor() as cursor:
+                for query in queries:
+                    print(query)
+                    cursor.execute(query)
         print(f"Successfully executed {len(queries)} SQL queries.")
     except Exception as e:
         print("Error executing SQL queries:", e)
-        cursor.execute("ROLLBACK")
         raise e
-    finally:
-        cursor.close()
-        connection.close()
 
 def record_exists(table_name, condition):
-    # Establish a connection to the MySQL database
-    db_cred = get_database_credentials()
-
-    # Connect to the database
-    connection = pymysql.connect(
-        host=db_cred['host'],
-        user=db_cred['user'],
-        password=db_cred['password'],
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
-    )
-
-    try:
+    # Borrow a pooled connection to the MySQL database
+    with get_mysql_pool().connection() as connection:
         with connection.cursor() as cursor:
             # Check if a record with the given condition already exists
             query = f"SELECT COUNT(*) FROM {table_name} WHERE {condition}"
@@ -184,9 +334,6 @@ def record_exists(table_name, condition):
             result = cursor.fetchone()
 
             return result["COUNT(*)"] > 0
-    finally:
-        # Close the database connection
-        connection.close()
 
 def divide_into_sublists(data, max_size):
     """
@@ -202,31 +349,834 @@ def divide_into_sublists(data, max_size):
     return [data[i:i+max_size] for i in range(0, len(data), max_size)]
 
 
-def pd_query_mysql(query=None):
+# MySQL errors after which a transaction can simply be retried
+_retryable_errors = {1213: 'deadlock', 1205: 'lock wait timeout'}
+
+
+# Session cache of bulk existence checks: {(master, table, key columns): {normalized key: bool}}
+_exists_cache = {}
+_exists_cache_lock = threading.Lock()
+
+
+def _normalize_key(key):
+    # Only deduplicates requests and keys the cache (1 and '1' are one lookup); MySQL does the matching
+    return tuple(str(value) for value in key)
+
+
+def existing_keys_mysql(table_name, key_columns, keys, batch_size=1000, method='auto', use_cache=True, master=False):
+    """
+    Returns which of many keys exist in a table, in a few set-based queries
+    instead of one record_exists round trip per key.
+
+    method='in' sends batches of batch_size keys as one statement of
+    UNION ALL'ed EXISTS probes; method='temp_table' loads the keys into a
+    temporary table and joins it, which is better for very large key sets;
+    'auto' picks temp_table above 10 batches. Either way MySQL returns the
+    position of each requested key it found, so keys match the way the
+    server compares them: by column type and collation ('abc' finds 'ABC'
+    under a case-insensitive collation, '1.50' finds DECIMAL 1.5). Results,
+    found or not, are cached for the session unless use_cache is False (see
+    invalidate_existing_keys_cache).
+
+    Parameters:
+    - table_name (str): the table
+    - key_columns (str or list of str): the key column(s)
+    - keys (iterable): key values, or tuples of values for several columns
+    - batch_size (int): keys per IN-list / INSERT batch
+    - method (str): 'auto', 'in' or 'temp_table'
+    - use_cache (bool): serve and store results in the session cache
+    - master (bool): use the master credentials pool
+
+    Returns:
+    - set: the keys from keys that exist, as given (every form given, e.g. both 1 and '1')
+    """
+    if method not in ('auto', 'in', 'temp_table'):
+        raise ValueError(f"Unknown method: {method} (use 'auto', 'in' or 'temp_table')")
+    single = isinstance(key_columns, str)
+    key_columns = [key_columns] if single else list(key_columns)
+    # {normalized key: (key tuple, {every form the key was given in})}
+    wanted = {}
+    for key in keys:
+        key_tuple = (key,) if single else tuple(key)
+        wanted.setdefault(_normalize_key(key_tuple), (key_tuple, set()))[1].add(key)
+
+    cache_key = (master, table_name, tuple(key_columns))
+    found, missing = set(), list(wanted)
+    if use_cache:
+        with _exists_cache_lock:
+            cached = _exists_cache.setdefault(cache_key, {})
+            found = {normalized for normalized in wanted if cached.get(normalized)}
+            missing = [normalized for normalized in wanted if normalized not in cached]
+
+    if missing:
+        if method == 'auto':
+            method = 'temp_table' if len(missing) > 10 * batch_size else 'in'
+        # Each requested key travels with its position in lookup, and MySQL returns the positions it matched
+        lookup = [(position,) + wanted[normalized][0] for position, normalized in enumerate(missing)]
+        table = _quote_name(table_name)
+        columns = [_quote_name(column, qualified=False) for column in key_columns]
+
+        rows = []
+        with get_mysql_pool(master=master).connection() as connection:
+            with connection.cursor() as cursor:
+                if method == 'temp_table':
+                    try:
+                        # The key columns copy the table's types and collations
+                        cursor.execute(f"CREATE TEMPORARY TABLE `_wanted_keys` SELECT CAST(0 AS UNSIGNED) AS "
+                                       f"`_position`, {', '.join(columns)} FROM {table} LIMIT 0")
+                        placeholder = "(" + ", ".join(["%s"] * (len(columns) + 1)) + ")"
+                        for batch in divide_into_sublists(lookup, batch_size):
+                            cursor.executemany(f"INSERT INTO `_wanted_keys` (`_position`, {', '.join(columns)}) "
+                                               f"VALUES {placeholder}", batch)
+                        join = " AND ".join(f"t.{column} = w.{column}" for column in columns)
+                        cursor.execute(f"SELECT DISTINCT w.`_position` FROM {table} t JOIN `_wanted_keys` w ON {join}")
+                        rows.extend(cursor.fetchall())
+                    finally:
+                        # The connection goes back to the pool, so the temporary table must not outlive this call
+                        cursor.execute("DROP TEMPORARY TABLE IF EXISTS `_wanted_keys`")
+                else:
+                    condition = " AND ".join(f"{column} = %s" for column in columns)
+                    probe = f"SELECT %s AS `_position` FROM DUAL WHERE EXISTS (SELECT 1 FROM {table} WHERE {condition})"
+                    for batch in divide_into_sublists(lookup, batch_size):
+                        cursor.execute(" UNION ALL ".join([probe] * len(batch)),
+                                       [value for key in batch for value in key])
+                        rows.extend(cursor.fetchall())
+
+        # Rows are dicts (DictCursor)
+        present = {missing[int(row['_position'])] for row in rows}
+        found |= present
+        if use_cache:
+            with _exists_cache_lock:
+                cached = _exists_cache.setdefault(cache_key, {})
+                for normalized in missing:
+                    cached[normalized] = normalized in present
+
+    return {key for normalized in found for key in wanted[normalized][1]}
+
+
+def invalidate_existing_keys_cache(table_name=None):
+    """Forgets cached existence results for one table, or for every table."""
+    with _exists_cache_lock:
+        for cache_key in list(_exists_cache):
+            if table_name is None or cache_key[1] == table_name:
+                del _exists_cache[cache_key]
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = max(0, int(round(percent / 100 * len(sorted_values) + 0.5)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def _run_transaction(pool, statements, max_retries):
+    """Runs statements in one transaction, retrying deadlocks; returns (rows affected, retries)."""
+    import pymysql
+
+    for attempt in range(max_retries + 1):
+        try:
+            with pool.transaction() as connection:
+                with connection.cursor() as cursor:
+                    return sum(cursor.execute(statement) for statement in statements), attempt
+        except pymysql.err.OperationalError as e:
+            if e.args[0] not in _retryable_errors or attempt == max_retries:
+                raise
+            # Full jitter so the transactions that collided do not collide again
+            time.sleep(random.uniform(0, min(5.0, 0.05 * 2 ** attempt)))
+
+
+def execute_sql_batches_parallel(batches, max_workers=4, max_retries=5, master=True):
+    """
+    Runs independent batches of statements in parallel, one transaction per
+    batch on its own pooled connection.
+
+    A batch is committed as a whole or not at all; batches run in no
+    particular order, so only split work whose batches do not depend on each
+    other (e.g. divide_into_sublists over per-row UPDATEs). Deadlocks (1213)
+    and lock wait timeouts (1205) roll the batch back and retry it with
+    jittered backoff. Other errors fail only their batch; every failure is
+    reported in a RuntimeError once all batches have finished.
+
+    Parameters:
+    - batches (list of list of str): the statement batches
+    - max_workers (int): batches in flight (also bounded by the pool size)
+    - max_retries (int): retries per batch after a deadlock or lock wait timeout
+    - master (bool): use the master credentials pool, like execute_sql_queries
+
+    Returns:
+    - dict: batches, statements, rows_affected, retries, seconds and the
+      p50/p95/p99 batch latency in milliseconds
+    """
+    pool = get_mysql_pool(master=master)
+    summary = {'batches': len(batches), 'statements': sum(len(batch) for batch in batches),
+               'rows_affected': 0, 'retries': 0}
+    latencies, failures = [], []
+    start = time.perf_counter()
+
+    def run(batch):
+        batch_start = time.perf_counter()
+        rows, retries = _run_transaction(pool, batch, max_retries)
+        return rows, retries, time.perf_counter() - batch_start
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run, batch): index for index, batch in enumerate(batches)}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            try:
+                rows, retries, seconds = future.result()
+            except Exception as e:
+                failures.append((futures[future], e))
+                continue
+            summary['rows_affected'] += rows
+            summary['retries'] += retries
+            latencies.append(seconds * 1000)
+            if done % 100 == 0:
+                print(f"{done}/{len(batches)} batches done, {summary['rows_affected']} rows affected")
+
+    latencies.sort()
+    summary['seconds'] = time.perf_counter() - start
+    for percent in (50, 95, 99):
+        summary[f'p{percent}_ms'] = _percentile(latencies, percent)
+    print(f"Executed {summary['statements']} statements in {len(batches)} batches: "
+          f"{summary['rows_affected']} rows affected, {summary['retries']} retries, "
+          f"p50 {summary['p50_ms']:.0f} ms, p99 {summary['p99_ms']:.0f} ms ({summary['seconds']:.1f}s).")
+    if failures:
+        index, error = min(failures, key=lambda failure: failure[0])
+        raise RuntimeError(f"{len(failures)} of {len(batches)} batches failed and were rolled back; "
+                           f"first failed batch #{index}: {error}")
+    return summary
+
+
+def split_sql_statements(sql_string):
+    """
+    Splits a SQL script into statements on semicolons, ignoring semicolons
+    inside quotes and comments. Comments are dropped except versioned
+    comments (/*!...*/) and optimizer hints (/*+ ...*/), which MySQL runs.
+    DELIMITER blocks (stored procedures) are not supported.
+    """
+    statements, current = [], []
+    i, length = 0, len(sql_string)
+    while i < length:
+        char = sql_string[i]
+        if char in "'\"`":
+            end = i + 1
+            while end < length and sql_string[end] != char:
+                end += 2 if sql_string[end] == '\\' else 1
+            current.append(sql_string[i:end + 1])
+            i = end + 1
+        elif sql_string.startswith('--', i) or char == '#':
+            end = sql_string.find('\n', i)
+            i = length if end == -1 else end
+        elif sql_string.startswith('/*', i):
+            end = sql_string.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            # Versioned comments (/*!40101 ... */) and optimizer hints (/*+ ... */) are executed
+            if sql_string.startswith(('/*!', '/*+'), i):
+                current.append(sql_string[i:end])
+            i = end
+        elif char == ';':
+            statements.append(''.join(current).strip())
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def apply_sql_file_from_s3(bucket_name, key_name, batch_size=100, max_workers=4, max_retries=5, use_cache=True):
+    """
+    Downloads a SQL script (see write_sql_file_to_s3) and applies its
+    statements in parallel transactions of batch_size statements. The
+    statements must be independent of each other, see execute_sql_batches_parallel.
+    """
+    statements = split_sql_statements(download_sql_file(bucket_name, key_name, use_cache=use_cache))
+    return execute_sql_batches_parallel(divide_into_sublists(statements, batch_size),
+                                        max_workers=max_workers, max_retries=max_retries)
+
+
+def _iter_unbuffered(query, args=None, cursorclass=None, batch_size=10000, master=False, net_write_timeout=600):
+    """
+    Runs a query on a pooled connection with an unbuffered (server-side)
+    cursor and yields (cursor.description, fields, rows) every batch_size
+    rows, fields being the driver's column descriptors (flags, charset); an
+    empty result yields one empty batch so callers still see the columns.
+    """
+    import pymysql
+
+    pool = get_mysql_pool(master=master)
+    connection = pool.acquire()
+    finished = False
+    try:
+        with connection.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute("SELECT @@SESSION.net_write_timeout")
+            previous_timeout = cursor.fetchone()[0]
+            # The server aborts a result the client reads slower than this
+            cursor.execute("SET SESSION net_write_timeout = %s", (net_write_timeout,))
+        cursor = connection.cursor(cursorclass or pymysql.cursors.SSCursor)
+        cursor.execute(query, args)
+        fields = getattr(getattr(cursor, '_result', None), 'fields', None)
+        rows = cursor.fetchmany(batch_size)
+        yield cursor.description, fields, rows
+        while rows:
+            rows = cursor.fetchmany(batch_size)
+            if rows:
+                yield cursor.description, fields, rows
+        cursor.close()
+        # The connection goes back to the pool: leave its session as it was
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION net_write_timeout = %s", (previous_timeout,))
+        finished = True
+    finally:
+        # An abandoned unbuffered result would have to be drained before the
+        # connection can be reused, so the connection is dropped instead
+        pool.release(connection, discard=not finished)
+
+
+def _mysql_arrow_types():
+    import pyarrow as pa
+    from pymysql.constants import FIELD_TYPE
+
+    integer = pa.int64()
+    return {
+        FIELD_TYPE.TINY: integer, FIELD_TYPE.SHORT: integer, FIELD_TYPE.LONG: integer,
+        FIELD_TYPE.LONGLONG: integer, FIELD_TYPE.INT24: integer, FIELD_TYPE.YEAR: integer,
+        FIELD_TYPE.FLOAT: pa.float64(), FIELD_TYPE.DOUBLE: pa.float64(),
+        FIELD_TYPE.DATETIME: pa.timestamp('us'), FIELD_TYPE.TIMESTAMP: pa.timestamp('us'),
+        FIELD_TYPE.DATE: pa.date32(), FIELD_TYPE.NEWDATE: pa.date32(),
+        FIELD_TYPE.TIME: pa.duration('us'),
+    }
+
+
+def mysql_arrow_schema(description, fields=None):
+    """
+    Returns the pyarrow.Schema of a result, derived once from the column
+    metadata so that every chunk of a streamed result has the same types.
+
+    - integers: int64, BIGINT UNSIGNED: uint64, FLOAT/DOUBLE: float64
+    - DECIMAL(p, s): decimal128(p, s) (decimal256 beyond 38 digits)
+    - DATE: date32, DATETIME/TIMESTAMP: timestamp('us'), TIME: duration('us')
+    - BLOB/BINARY/BIT/GEOMETRY: binary, other strings (TEXT, ENUM, JSON): string
+
+    Parameters:
+    - description (tuple): cursor.description
+    - fields (list, optional): the driver's column descriptors (cursor._result.fields),
+      which carry the UNSIGNED flag and charset missing from cursor.description
+    """
+    import pyarrow as pa
+    from pymysql.constants import FIELD_TYPE, FLAG
+
+    arrow_types = _mysql_arrow_types()
+    string_types = {FIELD_TYPE.TINY_BLOB, FIELD_TYPE.MEDIUM_BLOB, FIELD_TYPE.LONG_BLOB, FIELD_TYPE.BLOB,
+                    FIELD_TYPE.STRING, FIELD_TYPE.VAR_STRING, FIELD_TYPE.VARCHAR}
+    schema_fields = []
+    for index, column in enumerate(description):
+        name, type_code, _, _, length, scale = column[:6]
+        field = fields[index] if fields else None
+        unsigned = field is not None and bool(field.flags & FLAG.UNSIGNED)
+        if type_code == FIELD_TYPE.LONGLONG and unsigned:
+            arrow_type = pa.uint64()
+        elif type_code in (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL):
+            # The column length counts the decimal point and, unless unsigned, the sign
+            sign = 1 if field is not None and not unsigned else 0
+            precision = max(1, length - (1 if scale else 0) - sign, scale)
+            arrow_type = pa.decimal128(precision, scale) if precision <= 38 else pa.decimal256(precision, scale)
+        elif type_code in arrow_types:
+            arrow_type = arrow_types[type_code]
+        elif type_code == FIELD_TYPE.NULL:
+            arrow_type = pa.null()
+        elif type_code in (FIELD_TYPE.BIT, FIELD_TYPE.GEOMETRY):
+            arrow_type = pa.binary()
+        elif type_code in string_types and field is not None and field.charsetnr == 63:
+            # charset 63 is "binary": BLOB, BINARY and VARBINARY columns
+            arrow_type = pa.binary()
+        else:
+            arrow_type = pa.string()
+        schema_fields.append(pa.field(name, arrow_type))
+    return pa.schema(schema_fields)
+
+
+def _values_to_arrow(values, arrow_type):
+    import pyarrow as pa
+
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        pass
+    if pa.types.is_string(arrow_type):
+        values = [value.decode('utf-8', errors='replace') if isinstance(value, bytes)
+                  else None if value is None else str(value) for value in values]
+    elif pa.types.is_binary(arrow_type):
+        values = [value.encode('utf-8') if isinstance(value, str) else value for value in values]
+    else:
+        # Values the declared type cannot hold (zero dates come back as '0000-00-00') become nulls
+        converted = []
+        for value in values:
+            try:
+                converted.append(pa.scalar(value, type=arrow_type).as_py())
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                converted.append(None)
+        values = converted
+    return pa.array(values, type=arrow_type)
+
+
+def mysql_rows_to_arrow(description, rows, schema=None):
+    """
+    Converts cursor rows (tuples) to a pyarrow.RecordBatch with the given
+    schema (default mysql_arrow_schema(description)). Pass the same schema
+    for every chunk of a result so the batches can be concatenated.
+    """
+    import pyarrow as pa
+
+    schema = schema or mysql_arrow_schema(description)
+    columns = list(zip(*rows)) if rows else [()] * len(description)
+    arrays = [_values_to_arrow(list(values), field.type) for field, values in zip(schema, columns)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _arrow_to_dataframe(batch):
+    import pyarrow as pa
+    import pandas as pd
+
+    # DECIMAL becomes float64, like pd.read_sql(coerce_float=True)
+    arrays = [array.cast(pa.float64()) if pa.types.is_decimal(array.type) else array for array in batch.columns]
+    table = pa.Table.from_arrays(arrays, names=batch.schema.names)
+    types_mapper = {pa.int64(): pd.Int64Dtype(), pa.uint64(): pd.UInt64Dtype(), pa.bool_(): pd.BooleanDtype()}.get
+    return table.to_pandas(types_mapper=types_mapper, date_as_object=False)
+
+
+def iter_mysql_query(query, chunksize=50000, as_arrow=False, args=None, master=False):
+    """
+    Streams a query result in constant memory with a server-side cursor.
+
+    Rows are read from the server as they are consumed, so the first chunk
+    arrives immediately and memory is bounded by chunksize. Column types
+    come from the result metadata (see mysql_arrow_schema), so every chunk
+    has the same dtypes: integers become nullable Int64 (UInt64 for BIGINT
+    UNSIGNED), DATE/DATETIME/TIMESTAMP datetime64, TIME timedelta, DECIMAL
+    float64 (decimal128 in Arrow).
+
+    Parameters:
+    - query (str): the SQL query
+    - chunksize (int): rows per chunk
+    - as_arrow (bool): yield pyarrow.RecordBatch instead of pandas DataFrames
+    - args (tuple or dict, optional): query parameters
+    - master (bool): use the master credentials pool
+
+    Returns:
+    - generator of pd.DataFrame or pyarrow.RecordBatch
+    """
+    schema = None
+    for description, fields, rows in _iter_unbuffered(query, args=args, batch_size=chunksize, master=master):
+        schema = schema or mysql_arrow_schema(description, fields)
+        batch = mysql_rows_to_arrow(description, rows, schema=schema)
+        yield batch if as_arrow else _arrow_to_dataframe(batch)
+
+
+def pd_query_mysql(query=None, chunksize=None):
     if query is None:
         print("Query parameter is missing.")
         return None
 
-    db_cred = get_database_credentials()
+    # Like pd.read_sql, a chunksize returns an iterator of DataFrames (streamed, see iter_mysql_query)
+    if chunksize:
+        return iter_mysql_query(query, chunksize=chunksize)
 
-    # Connect to the database
-    connection = pymysql.connect(
-        host=db_cred['host'],
-        user=db_cred['user'],
-        password=db_cred['password'],
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
-    )
-    import pandas as pd 
-    df = pd.read_sql(query, connection)
+    import pandas as pd
+
+    with get_mysql_pool().connection() as connection:
+        df = pd.read_sql(query, connection)
     return df
 
 
 
+def _quote_name(name, qualified=True):
+    """Backtick-quotes an identifier; with qualified, db.table quotes each part."""
+    parts = name.split('.') if qualified else [name]
+    return ".".join("`" + part.replace("`", "``") + "`" for part in parts)
+
+
+def _iter_row_batches(data, columns, batch_size):
+    """Yields lists of row tuples from a DataFrame, dicts or tuples, NaN/NaT as None."""
+    if hasattr(data, 'iloc'):
+        for start in range(0, len(data), batch_size):
+            chunk = data.iloc[start:start + batch_size][columns]
+            yield chunk.astype(object).where(chunk.notna(), None).values.tolist()
+        return
+
+    batch = []
+    for row in data:
+        batch.append(tuple(row[column] for column in columns) if isinstance(row, dict) else tuple(row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_data_value(value):
+    # LOAD DATA default format: tab separated, backslash escaped, \N for NULL
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # Binary values travel as hex and are decoded with UNHEX (see _load_data_statement)
+        return bytes(value).hex()
+    text = value.isoformat(' ') if hasattr(value, 'isoformat') and hasattr(value, 'hour') else str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+            .replace('\r', '\\r').replace('\0', '\\0'))
+
+
+def _load_data_statement(table_name, columns, upsert, binary_columns=()):
+    """
+    Builds the LOAD DATA LOCAL INFILE statement; the columns at the
+    binary_columns positions are read as hex into variables and UNHEX'ed.
+    """
+    targets = [f"@c{index}" if index in binary_columns else _quote_name(column, qualified=False)
+               for index, column in enumerate(columns)]
+    statement = (f"LOAD DATA LOCAL INFILE %s {'REPLACE ' if upsert else ''}INTO TABLE {_quote_name(table_name)} "
+                 f"CHARACTER SET utf8mb4 ({', '.join(targets)})")
+    if binary_columns:
+        statement += " SET " + ", ".join(f"{_quote_name(columns[index], qualified=False)} = UNHEX(@c{index})"
+                                         for index in sorted(binary_columns))
+    return statement
+
+
+def _load_data_batch(cursor, statement, rows):
+    """
+    Runs one LOAD DATA LOCAL INFILE statement fed from memory through a
+    named pipe: a writer thread streams the rows while the driver sends them.
+    """
+    import tempfile
+
+    folder = tempfile.mkdtemp(prefix="mysql-load-")
+    path = os.path.join(folder, "rows.tsv")
+    os.mkfifo(path, 0o600)
+    errors = []
+    opened = threading.Event()
+
+    def write_rows():
+        try:
+            with open(path, 'w', encoding='utf-8') as pipe:
+                opened.set()
+                for row in rows:
+                    pipe.write('\t'.join(_load_data_value(value) for value in row) + '\n')
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=write_rows, daemon=True)
+    writer.start()
+    try:
+        cursor.execute(statement, (path,))
+    finally:
+        if writer.is_alive():
+            # The statement failed without reading the whole pipe (e.g. local_infile
+            # disabled): let the writer open it, then close it so the writer stops
+            reader = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            opened.wait()
+            os.close(reader)
+        writer.join()
+        os.remove(path)
+        os.rmdir(folder)
+    if errors:
+        raise errors[0]
+    return cursor.rowcount
+
+
+def bulk_insert_mysql(table_name, data, columns=None, batch_size=1000, method='executemany',
+                      upsert=False, update_columns=None, commit_every=10, master=False):
+    """
+    Loads a DataFrame or an iterable of rows into a MySQL table in batches.
+
+    method='executemany' sends each batch as one multi-row parameterized
+    INSERT (pymysql rewrites executemany into INSERT ... VALUES (...), (...)).
+    method='load_data' streams each batch through LOAD DATA LOCAL INFILE from
+    an in-memory named pipe, the fastest path when the server allows
+    local_infile. Batches are committed every commit_every batches; on error
+    the uncommitted batches are rolled back and the error is raised.
+
+    Parameters:
+    - table_name (str): the target table
+    - data (pd.DataFrame or iterable of tuple/dict): the rows
+    - columns (list of str, optional): target columns (default: the DataFrame columns or dict keys)
+    - batch_size (int): rows per INSERT / LOAD DATA statement
+    - method (str): 'executemany' or 'load_data'
+    - upsert (bool): update existing rows on duplicate keys (ON DUPLICATE KEY UPDATE;
+      REPLACE for load_data, which deletes and re-inserts the row)
+    - update_columns (list of str, optional): columns updated on duplicates (default: all columns)
+    - commit_every (int): batches per transaction
+    - master (bool): use the master credentials pool
+
+    Returns:
+    - dict: rows, batches, commits, seconds and rows_per_sec
+    """
+    if method not in ('executemany', 'load_data'):
+        raise ValueError(f"Unknown method: {method} (use 'executemany' or 'load_data')")
+
+    if columns is None:
+        if hasattr(data, 'columns'):
+            columns = list(data.columns)
+        else:
+            data = iter(data)
+            first = next(data, None)
+            if first is None:
+                return {'rows': 0, 'batches': 0, 'commits': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+            if not isinstance(first, dict):
+                raise ValueError("columns is required when rows are tuples.")
+            columns = list(first)
+            data = itertools.chain([first], data)
+
+    if method == 'executemany':
+        column_list = ", ".join(_quote_name(column, qualified=False) for column in columns)
+        statement = (f"INSERT INTO {_quote_name(table_name)} ({column_list}) "
+                     f"VALUES ({', '.join(['%s'] * len(columns))})")
+        if upsert:
+            updates = ", ".join(f"{name} = VALUES({name})" for name in
+                                (_quote_name(column, qualified=False) for column in update_columns or columns))
+            statement += f" ON DUPLICATE KEY UPDATE {updates}"
+
+    pool = get_mysql_pool(master=master)
+    if method == 'load_data':
+        import pymysql
+
+        # LOAD DATA LOCAL needs a connection opened with local_infile enabled
+        connection = pymysql.connect(**dict(pool.connect_kwargs, local_infile=True))
+    else:
+        connection = pool.acquire()
+
+    summary = {'rows': 0, 'batches': 0, 'commits': 0}
+    start = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            pending = 0
+            connection.begin()
+            for rows in _iter_row_batches(data, columns, batch_size):
+                if method == 'load_data':
+                    binary_columns = {index for row in rows for index, value in enumerate(row)
+                                      if isinstance(value, (bytes, bytearray, memoryview))}
+                    statement = _load_data_statement(table_name, columns, upsert, binary_columns)
+                    _load_data_batch(cursor, statement, rows)
+                else:
+                    cursor.executemany(statement, rows)
+                summary['rows'] += len(rows)
+                summary['batches'] += 1
+                pending += 1
+                if pending >= commit_every:
+                    connection.commit()
+                    summary['commits'] += 1
+                    pending = 0
+                    connection.begin()
+            connection.commit()
+            summary['commits'] += 1 if pending else 0
+    except Exception:
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        if method == 'load_data':
+            connection.close()
+        else:
+            pool.release(connection)
+
+    summary['seconds'] = time.perf_counter() - start
+    summary['rows_per_sec'] = summary['rows'] / summary['seconds'] if summary['seconds'] else 0.0
+    print(f"Loaded {summary['rows']} rows into {table_name} in {summary['batches']} batches "
+          f"({summary['rows_per_sec']:.0f} rows/s).")
+    return summary
+
+
+def _parquet_export_schema(schema):
+    """Maps the result schema (mysql_arrow_schema) to types Parquet, Glue and Athena handle."""
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        arrow_type = field.type
+        if pa.types.is_null(arrow_type):
+            arrow_type = pa.string()
+        elif pa.types.is_uint64(arrow_type):
+            arrow_type = pa.decimal128(20, 0)
+        elif pa.types.is_decimal(arrow_type):
+            arrow_type = pa.decimal128(min(arrow_type.precision, 38), arrow_type.scale)
+        elif pa.types.is_duration(arrow_type):
+            arrow_type = pa.int64()
+        fields.append(pa.field(field.name, arrow_type))
+    return pa.schema(fields)
+
+
+def _partition_folder(column, value):
+    if value is None:
+        value = '__HIVE_DEFAULT_PARTITION__'
+    return f"{column}={str(value).replace('/', '%2F')}/"
+
+
+def export_mysql_to_s3_parquet(query, bucket_name, prefix, partition_column=None, rows_per_file=1000000,
+                               max_file_bytes=512 * 1024 * 1024, chunksize=50000, compression='snappy',
+                               max_open_files=8, max_buffer_bytes=256 * 1024 * 1024, glue_database=None,
+                               glue_table=None, master=False):
+    """
+    Streams a query result into Parquet files on S3 in bounded memory.
+
+    Rows are read with a server-side cursor (iter_mysql_query) and written
+    to files under s3://bucket_name/prefix/ that are uploaded as multipart
+    uploads while the next chunks are read; a file is closed, in the
+    background, once it holds rows_per_file rows or max_file_bytes bytes.
+    With partition_column the rows go to Hive style <column>=<value>/
+    folders (the column itself is not stored in the files), with at most
+    max_open_files files open at once. With glue_database and glue_table the
+    result is registered as a Parquet table, including its partitions.
+
+    Memory: every open file, and each of the (at most two) files being
+    closed, holds the multipart part being filled plus two parts uploading.
+    The part size is chosen so this stays within max_buffer_bytes, but S3's
+    5 MiB minimum part means at least (max_open_files + 2) * 15 MiB; the
+    chunk being read from MySQL comes on top. Every chunk has the schema
+    derived from the result metadata (mysql_arrow_schema); a chunk that
+    cannot be cast to it fails the export. On failure every upload, open or
+    still closing, is aborted.
+
+    Parameters:
+    - query (str): the SQL query
+    - bucket_name (str): the target bucket
+    - prefix (str): the target folder
+    - partition_column (str, optional): column to partition by
+    - rows_per_file (int): rows before a file is rotated
+    - max_file_bytes (int): compressed bytes before a file is rotated
+    - chunksize (int): rows read from MySQL at a time
+    - compression (str): Parquet codec
+    - max_open_files (int): open partition files (least recently used is closed first)
+    - max_buffer_bytes (int): upload buffer budget, see above
+    - glue_database, glue_table (str, optional): register the export in Glue
+    - master (bool): use the master credentials pool
+
+    Returns:
+    - dict: rows, files, bytes, seconds and the written keys
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from shared_func.s3_func import S3MultipartWriter
+
+    prefix = prefix.strip('/')
+    open_files = collections.OrderedDict()
+    sequence = collections.Counter()
+    partitions = {}
+    summary = {'rows': 0, 'files': 0, 'bytes': 0, 'keys': []}
+    schema = None
+    closer_workers, upload_concurrency = 2, 2
+    part_size = max(S3MultipartWriter.min_part_size,
+                    max_buffer_bytes // ((max_open_files + closer_workers) * (upload_concurrency + 1)))
+    closer = concurrent.futures.ThreadPoolExecutor(max_workers=closer_workers)
+    # (future, file state) of every file handed to the closer
+    closing = []
+
+    def close_file(folder):
+        state = open_files.pop(folder)
+
+        def finish():
+            try:
+                state['writer'].close()
+            except BaseException:
+                state['sink'].abort()
+                raise
+            state['sink'].close()
+            return state['sink'].tell()
+
+        # Files waiting to close keep their buffers, so wait rather than queue more than the closer runs
+        pending = [future for future, _ in closing if not future.done()]
+        if len(pending) >= closer_workers:
+            concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        closing.append((closer.submit(finish), state))
+
+    def discard(state):
+        # Close the Parquet writer first: otherwise it writes its footer when it
+        # is garbage collected, into an upload that no longer exists
+        try:
+            state['writer'].close()
+        except Exception:
+            pass
+        state['sink'].abort()
+
+    def write(folder, table):
+        state = open_files.get(folder)
+        if state is None:
+            if len(open_files) >= max_open_files:
+                close_file(next(iter(open_files)))
+            key_name = f"{prefix}/{folder}part-{sequence[folder]:05d}.parquet".lstrip('/')
+            sequence[folder] += 1
+            sink = S3MultipartWriter(bucket_name, key_name, part_size=part_size, max_concurrency=upload_concurrency)
+            state = open_files[folder] = {'sink': sink, 'rows': 0,
+                                          'writer': pq.ParquetWriter(sink, table.schema, compression=compression)}
+            summary['keys'].append(key_name)
+            summary['files'] += 1
+        open_files.move_to_end(folder)
+        state['writer'].write_table(table)
+        state['rows'] += table.num_rows
+        if state['rows'] >= rows_per_file or state['sink'].tell() >= max_file_bytes:
+            close_file(folder)
+
+    start = time.perf_counter()
+    try:
+        for batch in iter_mysql_query(query, chunksize=chunksize, as_arrow=True, master=master):
+            table = pa.Table.from_batches([batch])
+            if schema is None:
+                schema = _parquet_export_schema(table.schema)
+            try:
+                table = table.cast(schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+                # Files and the Glue table share one schema, so a chunk that does not fit fails the export
+                raise ValueError(f"A chunk does not fit the export schema: {e}") from e
+            summary['rows'] += table.num_rows
+
+            if partition_column is None:
+                write('', table)
+                continue
+            column = table[partition_column]
+            data = table.drop_columns([partition_column])
+            for value in pc.unique(column).to_pylist():
+                mask = pc.is_null(column) if value is None else pc.equal(column, pa.scalar(value, column.type))
+                folder = _partition_folder(partition_column, value)
+                partitions[folder] = '__HIVE_DEFAULT_PARTITION__' if value is None else str(value)
+                write(folder, data.filter(mask))
+
+        for folder in list(open_files):
+            close_file(folder)
+        summary['bytes'] = sum(future.result() for future, _ in closing)
+    except BaseException:
+        for state in open_files.values():
+            discard(state)
+        # Closes not started yet are cancelled and aborted here; running ones abort themselves if they fail
+        for future, state in closing:
+            if future.cancel():
+                discard(state)
+        raise
+    finally:
+        closer.shutdown(wait=True)
+
+    summary['seconds'] = time.perf_counter() - start
+    print(f"Exported {summary['rows']} rows to {summary['files']} files under s3://{bucket_name}/{prefix}/ "
+          f"({summary['bytes'] / 1024 ** 2:.1f} MiB, {summary['seconds']:.1f}s).")
+
+    if glue_database and glue_table and schema is not None:
+        from shared_func.glue_func import arrow_schema_to_glue_columns, register_parquet_table, batch_create_partitions
+
+        file_schema = schema.remove(schema.get_field_index(partition_column)) if partition_column else schema
+        location = f"s3://{bucket_name}/{prefix}/" if prefix else f"s3://{bucket_name}/"
+        register_parquet_table(glue_database, glue_table, location, arrow_schema_to_glue_columns(file_schema),
+                               partition_keys=[partition_column] if partition_column else None)
+        if partitions:
+            batch_create_partitions(glue_database, glue_table,
+                                    [([value], location + folder) for folder, value in partitions.items()])
+    return summary
+
+
 # Function to extract schema from AWS Glue
 def get_glue_schema(database_name, table_name):
     # Set up AWS Glue client
-    glue_client = boto3.client('glue')
+    glue_client = get_client('glue')
     response = glue_client.get_table(
         DatabaseName=database_name,
         Name=table_name
@@ -236,6 +1186,7 @@ def get_glue_schema(database_name, table_name):
 
 # Function to query MySQL using pandas and MySQL connector
 def query_mysql_with_glue_schema(query):
+    import pandas as pd
     return pd.read_sql(query, con=mysql_connection)
 
 def execute_stmt(stmt):
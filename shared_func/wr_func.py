@@ -1,7 +1,6 @@
-import awswrangler as wr
-import pandas as pd
 
 def read_data_from_file(file_path):
+    import awswrangler as wr
     file_extension = file_path.split('.')[-1].lower()
 
     if file_extension == 'csv':
@@ -16,6 +15,7 @@ def read_data_from_file(file_path):
         raise ValueError(f"Unsupported file format: {file_extension}")
 
 def write_data_to_file(df, s3_bucket, key_name):
+    import awswrangler as wr
     file_extension = key_name.split('.')[-1].lower()
 
     if file_extension == 'csv':
@@ -1,3 +1,6 @@
+-- Partitioned by region and day; register new partition folders with
+-- shared_func.glue_func.register_partitions_from_s3('<database>', 'cloudtrail_logs')
+-- (or: awsctl.py glue partitions <database> cloudtrail_logs)
 CREATE EXTERNAL TABLE cloudtrail_logs (
 eventversion STRING,
 useridentity STRUCT<
@@ -43,7 +46,8 @@ serviceeventdetails STRING,
 sharedeventid STRING,
 vpcendpointid STRING
 )
+PARTITIONED BY (region STRING, year STRING, month STRING, day STRING)
 ROW FORMAT SERDE 'com.amazon.emr.hive.serde.CloudTrailSerde'
 STORED AS INPUTFORMAT 'com.amazon.emr.cloudtrail.CloudTrailInputFormat'
 OUTPUTFORMAT 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat'
-LOCATION 's3://YOUR_BUCKET_NAME/AWSLogs/YOUR_ACCOUNT_NUMBER/';
+LOCATION 's3://YOUR_BUCKET_NAME/AWSLogs/YOUR_ACCOUNT_NUMBER/CloudTrail/';
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# Tests import shared_func the way the scripts do, from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Runs the test against moto with fake credentials and a fresh client registry."""
+    from moto import mock_aws
+    from shared_func.client_func import clear_clients
+
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    with mock_aws():
+        clear_clients()
+        yield
+    clear_clients()
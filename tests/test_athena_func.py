@@ -0,0 +1,143 @@
+import types
+
+import pandas as pd
+import pytest
+from botocore.exceptions import ClientError, ParamValidationError
+
+from shared_func import athena_cache_func, athena_func
+
+
+class FakeAthena:
+    """Starts queries that finish immediately; optionally rejects the first start with an error."""
+
+    def __init__(self, error=None, region_name="us-east-1"):
+        self.meta = types.SimpleNamespace(region_name=region_name)
+        self.error = error
+        self.starts = []
+
+    def start_query_execution(self, **params):
+        self.starts.append(params)
+        if self.error is not None and len(self.starts) == 1:
+            raise self.error
+        return {"QueryExecutionId": str(len(self.starts))}
+
+    def get_query_execution(self, QueryExecutionId):
+        return {"QueryExecution": {"QueryExecutionId": QueryExecutionId, "Status": {"State": "SUCCEEDED"}}}
+
+
+def client_error(code, message):
+    return ClientError({"Error": {"Code": code, "Message": message}}, "StartQueryExecution")
+
+
+@pytest.fixture(autouse=True)
+def reset_reuse(monkeypatch):
+    monkeypatch.setattr(athena_func, "_reuse_unsupported", set())
+
+
+@pytest.mark.parametrize("error", [
+    client_error("InvalidRequestException", "ResultReuseConfiguration is not supported for engine version 2"),
+    ParamValidationError(report='Unknown parameter in input: "ResultReuseConfiguration"'),
+])
+def test_rejected_result_reuse_is_retried_without_it(error):
+    client = FakeAthena(error)
+
+    athena_func._run_query(client, "SELECT 1", "db", "s3://out/", workgroup="wg", reuse_max_age=600)
+    athena_func._run_query(client, "SELECT 1", "db", "s3://out/", workgroup="wg", reuse_max_age=600)
+
+    assert "ResultReuseConfiguration" in client.starts[0]
+    assert all("ResultReuseConfiguration" not in params for params in client.starts[1:])
+    assert athena_func._reuse_unsupported == {("us-east-1", "wg")}
+
+
+@pytest.mark.parametrize("error", [
+    client_error("InvalidRequestException", "line 1:8: Column 'reuse_count' cannot be resolved"),
+    client_error("ThrottlingException", "Rate exceeded; result reuse unavailable"),
+])
+def test_other_start_errors_are_raised(error):
+    client = FakeAthena(error)
+
+    with pytest.raises(ClientError):
+        athena_func._run_query(client, "SELECT reuse_count FROM t", "db", "s3://out/", reuse_max_age=600)
+
+    assert len(client.starts) == 1
+    assert not athena_func._reuse_unsupported
+
+
+@pytest.fixture
+def fake_query(monkeypatch, tmp_path):
+    monkeypatch.setattr(athena_cache_func, "cache_dir", str(tmp_path))
+    runs = []
+
+    def iter_athena_query(query, database, output_location, **kwargs):
+        runs.append(dict(kwargs, output_location=output_location))
+        yield pd.DataFrame({"n": [len(runs)]})
+
+    monkeypatch.setattr(athena_func, "iter_athena_query", iter_athena_query)
+    return runs
+
+
+def test_query_cache_is_opt_in(fake_query):
+    athena_func.query_athena_to_df("SELECT 1", "db", "s3://out/")
+    athena_func.query_athena_to_df("SELECT 1", "db", "s3://out/")
+
+    assert len(fake_query) == 2
+    assert fake_query[0]["reuse_max_age"] is None
+
+
+def test_query_cache_is_keyed_on_region_and_output_location(fake_query):
+    first = athena_func.query_athena_to_df("SELECT 1", "db", "s3://out/", use_cache=True)
+    again = athena_func.query_athena_to_df("select  1;", "db", "s3://out/", use_cache=True)
+    other_region = athena_func.query_athena_to_df("SELECT 1", "db", "s3://out/", region_name="eu-west-1",
+                                                  use_cache=True)
+    other_output = athena_func.query_athena_to_df("SELECT 1", "db", "s3://other/", use_cache=True)
+
+    assert len(fake_query) == 3
+    assert again.equals(first)
+    assert other_region["n"][0] == 2 and other_output["n"][0] == 3
+
+
+class FakeExecutorAthena:
+    """Queries succeed on their second poll, except 'fail'; the first start is throttled."""
+
+    def __init__(self):
+        self.meta = types.SimpleNamespace(region_name="us-east-1")
+        self.started = {}
+        self.polls = {}
+        self.throttled = False
+        self.batch_sizes = []
+
+    def start_query_execution(self, **params):
+        if not self.throttled:
+            self.throttled = True
+            raise client_error("TooManyRequestsException", "Slow down")
+        query_id = f"q{len(self.started)}"
+        self.started[query_id] = params
+        return {"QueryExecutionId": query_id}
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        self.batch_sizes.append(len(QueryExecutionIds))
+        executions = []
+        for query_id in QueryExecutionIds:
+            self.polls[query_id] = self.polls.get(query_id, 0) + 1
+            state = "RUNNING"
+            if self.polls[query_id] >= 2:
+                state = "FAILED" if self.started[query_id]["QueryString"] == "fail" else "SUCCEEDED"
+            executions.append({"QueryExecutionId": query_id, "Status": {"State": state}})
+        return {"QueryExecutions": executions}
+
+
+def test_executor_runs_queries_concurrently(monkeypatch):
+    fake = FakeExecutorAthena()
+    monkeypatch.setattr(athena_func, "get_client", lambda service, region_name=None: fake)
+    monkeypatch.setattr(athena_func.random, "uniform", lambda low, high: 0)
+
+    with athena_func.AthenaExecutor("db", "s3://out/", poll_interval=0.01) as athena:
+        results = athena.map([f"SELECT {i}" for i in range(5)])
+        failed = athena.submit("fail")
+
+    assert [execution["Status"]["State"] for execution in results] == ["SUCCEEDED"] * 5
+    with pytest.raises(RuntimeError, match="FAILED"):
+        failed.result()
+    assert athena.stats["throttled"] == 1
+    assert max(fake.batch_sizes) > 1
+    assert fake.started["q0"]["QueryExecutionContext"] == {"Database": "db"}
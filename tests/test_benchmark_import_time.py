@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_benchmark(*modules):
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('ECR_REPO_NAME', 'KMS_KEY_DEFAULT', 'AWS_TEMP_CRED', 'AWS_KEY')}
+    return subprocess.run([sys.executable, 'benchmark-import_time.py', '--repeat', '1', *modules],
+                          cwd=REPO_DIR, capture_output=True, text=True, env=env)
+
+
+def test_modules_import_without_environment_variables():
+    result = run_benchmark('kms_func', 'simulate_lambda_locally')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert 'FAILED' not in result.stdout
+
+
+def test_known_failures_do_not_fail_the_run():
+    result = run_benchmark('bedrock_func', 'client_func')
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_unexpected_import_failure_fails_the_run():
+    result = run_benchmark('no_such_module')
+    assert result.returncode == 1
+    assert 'no_such_module' in result.stdout
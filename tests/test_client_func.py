@@ -0,0 +1,67 @@
+import subprocess
+import sys
+import threading
+
+from shared_func import client_func
+from shared_func.client_func import clear_clients, get_client, get_resource, lazy_client
+
+
+def test_get_client_is_cached_per_service_and_region(aws):
+    assert get_client('s3') is get_client('s3')
+    assert get_client('s3') is not get_client('s3', region_name='eu-west-1')
+    assert get_client('s3') is not get_client('sqs')
+
+
+def test_get_client_builds_one_client_across_threads(aws):
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_client('dynamodb'))) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_get_resource_is_cached_per_thread(aws):
+    resources = []
+    thread = threading.Thread(target=lambda: resources.append(get_resource('s3')))
+    thread.start()
+    thread.join()
+    assert get_resource('s3') is get_resource('s3')
+    assert resources[0] is not get_resource('s3')
+
+
+def test_clear_clients_drops_cached_clients(aws):
+    client = get_client('s3')
+    clear_clients()
+    assert get_client('s3') is not client
+
+
+def test_lazy_client_resolves_on_first_use(aws):
+    client = lazy_client('sns')
+    assert ('sns', None, None, None, None) not in client_func._clients
+    assert client.list_topics()['Topics'] == []
+    assert ('sns', None, None, None, None) in client_func._clients
+
+
+def test_iam_helpers_share_the_registry_client(aws):
+    from shared_func import iam_func
+
+    iam_func.create_iam_group('engineers')
+    iam_func.create_iam_user('alice')
+    iam_client = get_client('iam')
+    assert [group['GroupName'] for group in iam_client.list_groups()['Groups']] == ['engineers']
+    assert len([key for key in client_func._clients if key[0] == 'iam']) == 1
+
+
+def test_shared_func_modules_do_not_import_boto3_at_load():
+    modules = ['iam_func', 'iam_func_other', 'artifact_func', 'cloudformation_func', 'efs_func', 'polly_func',
+               'comprehend_translate_func', 'cost_explorer_func', 'paramter_store_func']
+    code = ("import importlib, sys\n"
+            f"for name in {modules!r}:\n"
+            "    importlib.import_module('shared_func.' + name)\n"
+            "print('boto3' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=client_func.__file__.rsplit('/shared_func/', 1)[0])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+from shared_func import commands
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_positional_tokens_stay_strings():
+    name, args, kwargs = commands.split_command(["s3", "exists", "bucket", "007", "limit=5"])
+    assert name == "s3 exists"
+    assert args == ["bucket", "007"]
+    assert kwargs == {"limit": 5}
+
+
+def test_execute_line_reports_failure():
+    output, ok = commands.execute_line("no such command", status=True)
+    assert not ok
+    assert "Unknown command" in output
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    # AF_UNIX paths are limited to ~100 characters, so avoid pytest's tmp_path
+    socket_path = os.path.join(tempfile.mkdtemp(), "awsctl.sock")
+    thread = threading.Thread(target=commands.serve, args=(socket_path,), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(commands._authkey_path(socket_path)) and os.path.exists(socket_path):
+            break
+        time.sleep(0.05)
+    yield socket_path
+    if thread.is_alive():
+        commands.send_to_daemon("shutdown", socket_path)
+    thread.join(5)
+
+
+def test_daemon_survives_client_disconnecting_mid_request(daemon):
+    from multiprocessing.connection import Client
+
+    authkey = commands._read_authkey(daemon)
+    with Client(daemon, family="AF_UNIX", authkey=authkey):
+        pass  # authenticated, then gone before sending anything
+
+    assert commands.send_to_daemon("help", daemon) == (commands.format_help() + "\n", True)
+
+
+def test_daemon_runs_in_client_cwd_and_environment(daemon, monkeypatch, tmp_path):
+    commands.COMMANDS["test where"] = ("unused", "unused", "")
+    monkeypatch.setattr(commands, "resolve",
+                        lambda name: lambda: f"{os.getcwd()} {os.environ.get('AWS_PROFILE')}")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AWS_PROFILE", "client-profile")
+    try:
+        output, ok = commands.send_to_daemon("test where", daemon)
+    finally:
+        del commands.COMMANDS["test where"]
+
+    assert ok
+    assert output == f"{tmp_path} client-profile\n"
+
+
+def test_daemon_reports_failed_commands(daemon):
+    output, ok = commands.send_to_daemon("no such command", daemon)
+    assert not ok
+    assert "Unknown command" in output
+
+
+def test_shutdown_removes_socket_and_key(daemon):
+    assert commands.send_to_daemon("shutdown", daemon) == ("awsctl daemon stopped.\n", True)
+    time.sleep(0.2)
+    assert not os.path.exists(daemon)
+    assert not os.path.exists(commands._authkey_path(daemon))
+
+
+def test_cli_exits_non_zero_on_failure(tmp_path):
+    env = dict(os.environ, AWSCTL_SOCKET=str(tmp_path / "missing.sock"))
+    result = subprocess.run([sys.executable, "awsctl.py", "no", "such"],
+                            cwd=REPO_DIR, capture_output=True, text=True, env=env)
+    assert result.returncode == 1
+    assert "Unknown command" in result.stderr
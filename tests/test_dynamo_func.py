@@ -0,0 +1,213 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from shared_func import dynamo_func
+from shared_func.client_func import get_client
+
+TABLE = "test-table"
+
+
+@pytest.fixture
+def table(aws):
+    get_client("dynamodb").create_table(
+        TableName=TABLE,
+        AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return TABLE
+
+
+def item(pk, **attributes):
+    return dict({"pk": {"S": pk}}, **{name: {"N": str(v)} for name, v in attributes.items()})
+
+
+class FakeDynamoDB:
+    """Records batch_write_item calls; the first `unprocessed` calls leave their last request unprocessed."""
+
+    def __init__(self, unprocessed=0):
+        self.calls = []
+        self.unprocessed = unprocessed
+
+    def batch_write_item(self, RequestItems):
+        (table_name, requests), = RequestItems.items()
+        self.calls.append(requests)
+        if len(self.calls) <= self.unprocessed:
+            return {"UnprocessedItems": {table_name: requests[-1:]}}
+        return {"UnprocessedItems": {}}
+
+
+def test_decoder_types_columns_across_pages():
+    pages = [
+        [{"id": {"N": "1"}, "name": {"S": "a"}, "flag": {"BOOL": True}}],
+        [{"id": {"N": "2"}, "score": {"N": "1.5"}, "name": {"NULL": True}}],
+    ]
+    df = dynamo_func.dynamodb_items_to_dataframe(pages)
+
+    assert str(df["id"].dtype) == "Int64"
+    assert df["score"].dtype == "float64" and pd.isna(df["score"][0])
+    assert str(df["name"].dtype) == "string" and pd.isna(df["name"][1])
+    assert str(df["flag"].dtype) == "boolean" and pd.isna(df["flag"][1])
+
+
+def test_large_integers_are_not_rounded_through_float():
+    big = 2 ** 53 + 1
+    df = dynamo_func.dynamodb_items_to_dataframe([[
+        {"a": {"N": str(big)}, "b": {"N": str(2 ** 64)}},
+        {"a": {"N": "1"}},
+    ]])
+
+    assert str(df["a"].dtype) == "Int64"
+    assert df["a"][0] == big
+    assert df["b"][0] == Decimal(2 ** 64)
+    assert df["b"][1] is None
+
+
+def test_set_types_decode_consistently():
+    df = dynamo_func.dynamodb_items_to_dataframe([[
+        {"ss": {"SS": ["a", "b"]}, "ns": {"NS": ["1", "2"]}, "bs": {"BS": [b"x"]}},
+        {},
+    ]])
+
+    assert df["ss"][0] == {"a", "b"}
+    assert df["ns"][0] == {Decimal(1), Decimal(2)}
+    assert {bytes(v) for v in df["bs"][0]} == {b"x"}
+    assert all(value is None for value in df.iloc[1])
+
+
+def test_batch_writer_collapses_duplicate_keys(table):
+    # "29" is written twice within the second batch
+    items = [item(str(i), v=i) for i in range(30)] + [item("29", v=100)]
+    metrics = dynamo_func.insert_into_dynamodb_batch(table, items)
+
+    assert metrics["requests"] == 31
+    assert metrics["duplicates"] == 1
+    assert metrics["written"] == 30
+    stored = get_client("dynamodb").get_item(TableName=table, Key={"pk": {"S": "29"}})["Item"]
+    assert stored["v"] == {"N": "100"}
+
+
+def test_batch_writer_keeps_duplicates_when_deduplicate_is_off(monkeypatch):
+    fake = FakeDynamoDB()
+    monkeypatch.setattr(dynamo_func, "get_client", lambda service: fake)
+
+    with dynamo_func.DynamoBatchWriter(TABLE, key_names=["pk"], deduplicate=False) as writer:
+        writer.put(item("a", v=1))
+        writer.put(item("a", v=2))
+
+    assert writer.metrics["duplicates"] == 0
+    assert fake.calls == [[{"PutRequest": {"Item": item("a", v=1)}}, {"PutRequest": {"Item": item("a", v=2)}}]]
+
+
+def test_batch_writer_retries_unprocessed_items(monkeypatch):
+    fake = FakeDynamoDB(unprocessed=2)
+    monkeypatch.setattr(dynamo_func, "get_client", lambda service: fake)
+    monkeypatch.setattr(dynamo_func, "_backoff", lambda attempt: None)
+
+    with dynamo_func.DynamoBatchWriter(TABLE, key_names=["pk"]) as writer:
+        writer.write_all(item(str(i)) for i in range(3))
+
+    assert [len(requests) for requests in fake.calls] == [3, 1, 1]
+    assert writer.metrics["written"] == 3
+    assert writer.metrics["retries"] == 2
+
+
+def test_batch_writer_reports_requests_left_unprocessed(monkeypatch):
+    fake = FakeDynamoDB(unprocessed=10)
+    monkeypatch.setattr(dynamo_func, "get_client", lambda service: fake)
+    monkeypatch.setattr(dynamo_func, "_backoff", lambda attempt: None)
+
+    writer = dynamo_func.DynamoBatchWriter(TABLE, key_names=["pk"], max_retries=2)
+    writer.put(item("a"))
+    with pytest.raises(RuntimeError, match="still unprocessed"):
+        writer.close()
+    assert writer.failed_requests == [{"PutRequest": {"Item": item("a")}}]
+
+
+def test_empty_table_deletes_every_item(table):
+    dynamo_func.insert_into_dynamodb_batch(table, [item(str(i)) for i in range(60)])
+
+    metrics = dynamo_func.empty_dynamodb_table(table, total_segments=2)
+
+    assert metrics["scanned"] == 60
+    assert metrics["written"] == 60
+    assert get_client("dynamodb").scan(TableName=table)["Count"] == 0
+
+
+def test_empty_table_reverse_is_deprecated(table):
+    with pytest.warns(DeprecationWarning, match="reverse"):
+        dynamo_func.empty_dynamodb_table(table, reverse=True)
+
+
+@pytest.fixture
+def numeric_table(aws):
+    dynamodb = get_client("dynamodb")
+    dynamodb.create_table(
+        TableName="numbers",
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "N"}],
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    for value in ("1", "2.5"):
+        dynamodb.put_item(TableName="numbers", Item={"id": {"N": value}, "v": {"S": value}})
+    return "numbers"
+
+
+def test_item_cache_batches_misses_and_accepts_float_keys(numeric_table):
+    with dynamo_func.DynamoItemCache(numeric_table) as cache:
+        items = cache.get_many([{"id": 1}, {"id": 2.5}, {"id": 1.0}, {"id": 3}])
+        assert [item and item["v"] for item in items] == ["1", "2.5", "1", None]
+        assert cache.stats["batch_calls"] == 1
+
+        assert cache.get({"id": Decimal("2.50")})["v"] == "2.5"
+        assert cache.stats["batch_calls"] == 1
+
+    assert not cache.dispatcher.is_alive()
+    with pytest.raises(RuntimeError, match="closed"):
+        cache.get({"id": 1})
+
+
+def test_shared_item_caches_are_closed(numeric_table):
+    assert dynamo_func.retrieve_from_dynamodb(numeric_table, {"id": 2.5}, use_cache=True)["v"] == "2.5"
+    cache = dynamo_func.get_item_cache(numeric_table)
+
+    dynamo_func.close_item_caches()
+
+    assert cache.closed and not cache.dispatcher.is_alive()
+    assert dynamo_func.get_item_cache(numeric_table) is not cache
+    dynamo_func.close_item_caches()
+
+
+def test_export_stringifies_only_mixed_attributes(table, tmp_path):
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dynamodb = get_client("dynamodb")
+    dynamodb.put_item(TableName=table, Item={"pk": {"S": "a"}, "n": {"N": "1.5"}, "m": {"N": "1"}})
+    dynamodb.put_item(TableName=table, Item={"pk": {"S": "b"}, "n": {"N": "2"}, "m": {"S": "x"}})
+    destination = str(tmp_path / "export")
+
+    totals = dynamo_func.export_dynamodb_to_parquet(table, destination, total_segments=1,
+                                                    checkpoint_path=str(tmp_path / "checkpoint.json"))
+
+    schema = pq.read_schema(f"{destination}/_common_metadata")
+    assert str(schema.field("n").type) == "decimal128(38, 9)"
+    assert str(schema.field("m").type) == "string"
+    rows = ds.dataset(destination, schema=schema).to_table().sort_by("pk").to_pylist()
+    assert totals["rows"] == 2
+    assert [row["n"] for row in rows] == [Decimal("1.5"), Decimal("2")]
+    assert [row["m"] for row in rows] == ["1", "x"]
+
+
+def test_segmented_scan_returns_every_item_once(table):
+    dynamo_func.insert_into_dynamodb_batch(table, [item(str(i), v=i) for i in range(120)])
+
+    df = dynamo_func.dynamodb_to_dataframe(table, total_segments=4)
+    pages = list(dynamo_func.scan_dynamodb_pages(table, total_segments=3, segments=[1], Limit=10))
+
+    assert sorted(df["pk"]) == sorted(str(i) for i in range(120))
+    assert str(df["v"].dtype) == "Int64"
+    assert {segment for segment, _ in pages} == {1}
+    assert "LastEvaluatedKey" not in pages[-1][1]
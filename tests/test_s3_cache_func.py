@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from shared_func import s3_cache_func
+from shared_func.client_func import get_client
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def cache(aws, tmp_path, monkeypatch):
+    monkeypatch.setattr(s3_cache_func, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(s3_cache_func, "max_cache_bytes", 25)
+    monkeypatch.setattr(s3_cache_func, "_cache_bytes", None)
+    get_client("s3").create_bucket(Bucket=BUCKET)
+    for name in "abc":
+        get_client("s3").put_object(Bucket=BUCKET, Key=name, Body=name.encode() * 10)
+    return tmp_path
+
+
+def cached_keys():
+    keys = []
+    for name in "abc":
+        data_path, _ = s3_cache_func._entry_paths(BUCKET, name)
+        if os.path.exists(data_path):
+            keys.append(name)
+    return keys
+
+
+def test_directory_is_only_walked_when_the_limit_is_crossed(cache, monkeypatch):
+    walks = []
+    walk = os.walk
+    monkeypatch.setattr(s3_cache_func.os, "walk", lambda path: walks.append(path) or walk(path))
+
+    s3_cache_func.get_s3_object_bytes(BUCKET, "a")
+    assert len(walks) == 1  # first write: size unknown yet
+    s3_cache_func.get_s3_object_bytes(BUCKET, "b")
+    assert len(walks) == 1
+    assert s3_cache_func._cache_bytes == 20
+
+    os.utime(s3_cache_func._entry_paths(BUCKET, "a")[0], (0, 0))
+    s3_cache_func.get_s3_object_bytes(BUCKET, "c")
+    assert len(walks) == 2
+    assert cached_keys() == ["b", "c"]
+    assert s3_cache_func._cache_bytes == 20
+
+
+def test_invalidate_updates_running_size(cache):
+    s3_cache_func.get_s3_object_bytes(BUCKET, "a")
+    s3_cache_func.get_s3_object_bytes(BUCKET, "b")
+    s3_cache_func.invalidate_s3_cache(BUCKET, "a")
+    assert s3_cache_func._cache_bytes == 10
+    assert cached_keys() == ["b"]
+
+
+@pytest.mark.parametrize("ttl", [3600, 0])
+def test_entry_evicted_during_a_hit_is_downloaded_again(cache, monkeypatch, ttl):
+    assert s3_cache_func.get_s3_object_bytes(BUCKET, "a") == b"a" * 10
+
+    read_cached = s3_cache_func._read_cached
+    evictions = []
+
+    def evicted_once(data_path):
+        evictions.append(data_path)
+        monkeypatch.setattr(s3_cache_func, "_read_cached", read_cached)
+        os.remove(data_path)
+        return None
+
+    monkeypatch.setattr(s3_cache_func, "_read_cached", evicted_once)
+    assert s3_cache_func.get_s3_object_bytes(BUCKET, "a", ttl=ttl) == b"a" * 10
+    assert len(evictions) == 1
+    assert cached_keys() == ["a"]
@@ -0,0 +1,142 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from shared_func import s3_func
+from shared_func.client_func import get_client
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def bucket(aws):
+    get_client("s3").create_bucket(Bucket=BUCKET)
+    return BUCKET
+
+
+def put_parquet(key, table, row_group_size=None):
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=row_group_size)
+    get_client("s3").put_object(Bucket=BUCKET, Key=key, Body=buffer.getvalue())
+
+
+def test_load_promotes_files_with_added_columns(bucket):
+    put_parquet("data/a.parquet", pa.table({"id": [1, 2]}))
+    put_parquet("data/b.parquet", pa.table({"id": [3], "name": ["c"]}))
+
+    table = s3_func.load_parquet_folder_from_s3(bucket, "data/", as_arrow=True)
+
+    assert table.num_rows == 3
+    assert table.column("name").to_pylist() == [None, None, "c"]
+
+
+def test_row_groups_are_read_right_behind_their_footer(bucket, monkeypatch):
+    for name in "abc":
+        put_parquet(f"data/{name}.parquet", pa.table({"id": [1, 2, 3, 4]}), row_group_size=2)
+
+    events = []
+    read_footer, read_row_group = s3_func._read_parquet_footer, s3_func._read_parquet_row_group
+
+    def footer(bucket_name, obj):
+        events.append(("footer", obj["Key"]))
+        return read_footer(bucket_name, obj)
+
+    def row_group(bucket_name, obj, metadata, index, columns, filters):
+        events.append(("row_group", obj["Key"]))
+        return read_row_group(bucket_name, obj, metadata, index, columns, filters)
+
+    monkeypatch.setattr(s3_func, "_read_parquet_footer", footer)
+    monkeypatch.setattr(s3_func, "_read_parquet_row_group", row_group)
+
+    tables = list(s3_func.iter_parquet_folder_from_s3(bucket, "data/", max_workers=1))
+
+    assert sum(t.num_rows for t in tables) == 12
+    assert events.index(("row_group", "data/a.parquet")) < events.index(("footer", "data/c.parquet"))
+
+
+def test_filters_skip_row_groups_and_filter_rows(bucket, monkeypatch):
+    put_parquet("data/a.parquet", pa.table({"id": [1, 2, 3, 4], "v": list("wxyz")}), row_group_size=2)
+    reads = []
+    read_row_group = s3_func._read_parquet_row_group
+    monkeypatch.setattr(s3_func, "_read_parquet_row_group",
+                        lambda *args: reads.append(args[3]) or read_row_group(*args))
+
+    table = s3_func.load_parquet_folder_from_s3(bucket, "data/", columns=["v"],
+                                                filters=[("id", ">=", 4)], as_arrow=True)
+
+    assert reads == [1]
+    assert table.column_names == ["v"]
+    assert table.column("v").to_pylist() == ["z"]
+
+
+def test_sync_up_with_delete_leaves_sibling_prefix_alone(bucket, tmp_path):
+    s3 = get_client("s3")
+    s3.put_object(Bucket=BUCKET, Key="reports/stale.txt", Body=b"old")
+    s3.put_object(Bucket=BUCKET, Key="reports-old/keep.txt", Body=b"keep")
+    (tmp_path / "a.txt").write_text("a")
+
+    summary = s3_func.sync_folder_to_s3(str(tmp_path), BUCKET, "reports", delete=True, verbose=False)
+
+    keys = sorted(obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET)["Contents"])
+    assert keys == ["reports-old/keep.txt", "reports/a.txt"]
+    assert summary["uploaded"] == 1 and summary["deleted"] == 1
+    assert s3_func.sync_folder_to_s3(str(tmp_path), BUCKET, "reports", verbose=False)["uploaded"] == 0
+
+
+def test_sync_down_skips_sibling_prefix_and_escaping_keys(bucket, tmp_path):
+    s3 = get_client("s3")
+    s3.put_object(Bucket=BUCKET, Key="reports/a.txt", Body=b"a")
+    s3.put_object(Bucket=BUCKET, Key="reports-old/b.txt", Body=b"b")
+    s3.put_object(Bucket=BUCKET, Key="reports/../../escaped.txt", Body=b"x")
+    local_dir = tmp_path / "local"
+
+    summary = s3_func.sync_s3_to_folder(BUCKET, "reports", str(local_dir), verbose=False)
+
+    assert summary["downloaded"] == 1
+    assert sorted(p.name for p in local_dir.iterdir()) == [".s3sync-manifest.json", "a.txt"]
+    assert not (tmp_path / "escaped.txt").exists()
+    assert not (tmp_path.parent / "escaped.txt").exists()
+
+
+def test_multipart_writer_refuses_writes_after_abort(bucket, monkeypatch):
+    monkeypatch.setattr(s3_func.S3MultipartWriter, "min_part_size", 1024)
+    s3 = get_client("s3")
+
+    writer = s3_func.S3MultipartWriter(BUCKET, "out.bin", part_size=1024)
+    writer.write(b"x" * 3000)
+    assert writer.upload_id is not None
+    writer.abort()
+    with pytest.raises(ValueError, match="closed"):
+        writer.write(b"late")
+
+    assert s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    assert s3.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 0
+
+
+def test_delete_folder_removes_every_page_and_nothing_else(bucket):
+    s3 = get_client("s3")
+    for i in range(1100):
+        s3.put_object(Bucket=BUCKET, Key=f"folder/{i:04d}", Body=b"")
+    s3.put_object(Bucket=BUCKET, Key="folder-other/keep", Body=b"")
+
+    stats = s3_func.delete_all_s3_files_in_folder(BUCKET, "folder", max_workers=2)
+
+    assert (stats['deleted'], stats['failed']) == (1100, 0)
+    assert [obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET)["Contents"]] == ["folder-other/keep"]
+
+
+def test_delete_batch_retries_only_failed_keys(monkeypatch):
+    monkeypatch.setattr(s3_func.time, "sleep", lambda seconds: None)
+    calls = []
+
+    class FakeS3:
+        def delete_objects(self, Bucket, Delete):
+            keys = [obj["Key"] for obj in Delete["Objects"]]
+            calls.append(keys)
+            failing = keys[:1] if len(calls) < 3 else []
+            return {"Errors": [{"Key": key, "Code": "SlowDown"} for key in failing]}
+
+    assert s3_func._delete_s3_batch(FakeS3(), BUCKET, ["a", "b", "c"], max_retries=5) == (3, 2, [])
+    assert calls == [["a", "b", "c"], ["a"], ["a"]]
@@ -0,0 +1,37 @@
+import pytest
+
+from shared_func import s3_func, s3_index_func
+from shared_func.client_func import get_client
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def bucket(aws, tmp_path, monkeypatch):
+    monkeypatch.setattr(s3_index_func, "index_dir", str(tmp_path))
+    s3 = get_client("s3")
+    s3.create_bucket(Bucket=BUCKET)
+    for key in ("logs/2024-01-01.csv", "logs/2024-01-02.csv", "logs/2024-02-01.json"):
+        s3.put_object(Bucket=BUCKET, Key=key, Body=b"x")
+    return BUCKET
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_list_objects_matches_listing_and_index(bucket, use_index):
+    assert s3_func.list_objects(bucket, "logs/", ["01-0"], use_index=use_index) == \
+        ["2024-01-01.csv", "2024-01-02.csv"]
+    assert s3_func.list_objects(bucket, "logs/", [], use_index=use_index) == []
+
+
+def test_search_and_incremental_refresh(bucket):
+    assert s3_index_func.search_s3_index(bucket, "logs/", pattern="*.json") == ["logs/2024-02-01.json"]
+
+    get_client("s3").put_object(Bucket=BUCKET, Key="logs/2024-03-01.csv", Body=b"x")
+    assert s3_index_func.refresh_s3_index(bucket, "logs/") == 1
+    assert s3_index_func.search_s3_index(bucket, "logs/", substrings=["03-"], refresh=False) == \
+        ["logs/2024-03-01.csv"]
+
+
+def test_keys_exist_in_index(bucket):
+    keys = ["logs/2024-01-01.csv", "logs/missing.csv", "logs/2024-01-01.csv"]
+    assert s3_index_func.keys_exist_in_s3_index(bucket, keys, prefix="logs/") == {"logs/2024-01-01.csv"}
@@ -0,0 +1,425 @@
+import json
+import threading
+import types
+
+import pymysql
+import pytest
+from pymysql.constants import SERVER_STATUS
+
+from shared_func import sql_func
+
+IN_TRANS = SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+        self.description = None
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, query, args=None):
+        connection = self.connection
+        connection.log.append(query if args is None else (query, args))
+        if not connection.autocommit_mode:
+            # InnoDB opens a transaction implicitly on the first statement
+            connection.server_status |= IN_TRANS
+        self.rows = list(connection.handler(self, query, args) or [])
+        return self.rowcount
+
+    def executemany(self, query, rows):
+        # Logged and answered once, with every row as args
+        self.execute(query, list(rows))
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """pymysql connection stand-in; queries are answered by the test's handler(cursor, query, args)."""
+
+    def __init__(self, handler, **kwargs):
+        self.handler = handler
+        self.kwargs = kwargs
+        self.autocommit_mode = kwargs.get('autocommit', False)
+        self.server_status = 0
+        self.open = True
+        self.log = []
+
+    def cursor(self, cursorclass=None):
+        return FakeCursor(self)
+
+    def begin(self):
+        self.log.append('BEGIN')
+        self.server_status |= IN_TRANS
+
+    def commit(self):
+        self.log.append('COMMIT')
+        self.server_status &= ~IN_TRANS
+
+    def rollback(self):
+        self.log.append('ROLLBACK')
+        self.server_status &= ~IN_TRANS
+
+    def ping(self, reconnect=True):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def mysql(monkeypatch, tmp_path):
+    """Routes pymysql.connect to FakeConnections; set mysql.handler to answer queries."""
+    credentials = tmp_path / "cred.json"
+    credentials.write_text(json.dumps({"host": "db", "user": "u", "password": "p", "port": "3307"}))
+    monkeypatch.setenv("MYSQL_CRED", str(credentials))
+    monkeypatch.setenv("MYSQL_MASTER_CRED", str(credentials))
+    monkeypatch.setattr(sql_func, "_pools", {})
+    monkeypatch.setattr(sql_func, "_exists_cache", {})
+
+    class Server:
+        handler = staticmethod(lambda cursor, query, args: None)
+        connections = []
+
+    def connect(**kwargs):
+        connection = FakeConnection(lambda *args: Server.handler(*args), **kwargs)
+        Server.connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(pymysql, "connect", connect)
+    return Server
+
+
+def test_pool_reuses_connections_across_threads(mysql):
+    mysql.handler = lambda cursor, query, args: [{'x': 1}]
+    threads = [threading.Thread(target=lambda: [sql_func.query_mysql("SELECT 1") for _ in range(20)])
+               for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    pool = sql_func.get_mysql_pool()
+    assert pool.stats['connects'] == len(mysql.connections) <= pool.size
+    assert pool.stats['connects'] + pool.stats['reuses'] == 320
+    assert mysql.connections[0].kwargs['port'] == 3307
+
+
+def test_query_mysql_does_not_commit(mysql):
+    sql_func.query_mysql("UPDATE t SET a = 1")
+
+    connection, = mysql.connections
+    assert connection.kwargs['autocommit'] is False
+    assert connection.log == ["UPDATE t SET a = 1", 'ROLLBACK']
+
+
+def test_execute_sql_queries_commits_or_rolls_back(mysql):
+    def handler(cursor, query, args):
+        if 'bad' in query:
+            raise pymysql.err.ProgrammingError(1064, 'syntax')
+
+    mysql.handler = handler
+    sql_func.execute_sql_queries(["INSERT 1", "INSERT 2"])
+    with pytest.raises(pymysql.err.ProgrammingError):
+        sql_func.execute_sql_queries(["INSERT 3", "bad"])
+
+    connection, = mysql.connections
+    assert connection.log == ['BEGIN', "INSERT 1", "INSERT 2", 'COMMIT', 'BEGIN', "INSERT 3", "bad", 'ROLLBACK']
+    assert not connection.server_status & IN_TRANS
+
+
+def result_handler(description, rows, timeout=30):
+    """Answers the net_write_timeout statements and returns rows (of signed, utf8mb4 columns) for the SELECT."""
+    def handler(cursor, query, args):
+        if query == "SELECT @@SESSION.net_write_timeout":
+            return [(timeout,)]
+        if query.startswith("SET SESSION"):
+            return None
+        cursor.description = [column + (None,) * (7 - len(column)) for column in description]
+        cursor._result = types.SimpleNamespace(fields=[types.SimpleNamespace(flags=0, charsetnr=45)
+                                                       for _ in description])
+        return rows
+    return handler
+
+
+def test_streamed_chunks_share_one_schema(mysql):
+    import datetime
+    from decimal import Decimal
+    from pymysql.constants import FIELD_TYPE
+
+    description = [("id", FIELD_TYPE.LONGLONG), ("amount", FIELD_TYPE.NEWDECIMAL, None, 7, 7, 2),
+                   ("day", FIELD_TYPE.DATE), ("name", FIELD_TYPE.VAR_STRING)]
+    rows = [(i, Decimal("1.25"), datetime.date(2024, 1, 1) if i else "0000-00-00", None if i < 5 else f"n{i}")
+            for i in range(12)]
+    mysql.handler = result_handler(description, rows)
+
+    batches = list(sql_func.iter_mysql_query("SELECT * FROM t", chunksize=5, as_arrow=True))
+    frames = list(sql_func.iter_mysql_query("SELECT * FROM t", chunksize=5))
+
+    assert [batch.num_rows for batch in batches] == [5, 5, 2]
+    assert len({batch.schema for batch in batches}) == 1
+    assert str(batches[0].schema.field("name").type) == "string"
+    assert str(batches[0].schema.field("amount").type) == "decimal128(5, 2)"
+    assert batches[0].column("day")[0].as_py() is None
+    assert [frame.dtypes.tolist() for frame in frames[1:]] == [frames[0].dtypes.tolist()] * 2
+    assert str(frames[0]["id"].dtype) == "Int64"
+
+
+def test_streaming_restores_net_write_timeout(mysql):
+    from pymysql.constants import FIELD_TYPE
+
+    mysql.handler = result_handler([("id", FIELD_TYPE.LONG)], [(i,) for i in range(10)], timeout=45)
+
+    empty_handler = result_handler([("id", FIELD_TYPE.LONG)], [])
+    list(sql_func.iter_mysql_query("SELECT id FROM t", chunksize=4))
+    connection, = mysql.connections
+    assert connection.log[1] == ("SET SESSION net_write_timeout = %s", (600,))
+    assert connection.log[-2:] == [("SET SESSION net_write_timeout = %s", (45,)), 'ROLLBACK']
+
+    # An abandoned stream drops its connection instead of returning it mid-result
+    stream = sql_func.iter_mysql_query("SELECT id FROM t", chunksize=4)
+    next(stream)
+    stream.close()
+    pool = sql_func.get_mysql_pool()
+    assert pool.stats['discarded'] == 1 and not connection.open
+
+    mysql.handler = empty_handler
+    frame, = sql_func.iter_mysql_query("SELECT id FROM t WHERE 0")
+    assert list(frame.columns) == ["id"] and len(frame) == 0
+
+
+def test_arrow_schema_uses_driver_flags_and_charset():
+    from pymysql.constants import FIELD_TYPE, FLAG
+
+    description = [("big", FIELD_TYPE.LONGLONG, None, 20, 20, 0, True),
+                   ("price", FIELD_TYPE.NEWDECIMAL, None, 6, 6, 2, True),
+                   ("blob", FIELD_TYPE.BLOB, None, 10, 10, 0, True),
+                   ("text", FIELD_TYPE.BLOB, None, 10, 10, 0, True)]
+    fields = [types.SimpleNamespace(flags=FLAG.UNSIGNED, charsetnr=63),
+              types.SimpleNamespace(flags=FLAG.UNSIGNED, charsetnr=63),
+              types.SimpleNamespace(flags=0, charsetnr=63),
+              types.SimpleNamespace(flags=0, charsetnr=45)]
+
+    schema = sql_func.mysql_arrow_schema(description, fields)
+
+    assert [str(field.type) for field in schema] == ["uint64", "decimal128(5, 2)", "binary", "string"]
+
+
+def test_bulk_insert_quotes_names_and_commits_in_groups(mysql):
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame({"id": range(5), "v": [1.5, np.nan, 2.0, 3.0, 4.0]})
+    summary = sql_func.bulk_insert_mysql("db.t`x", df, batch_size=2, commit_every=2, upsert=True,
+                                         update_columns=["v"])
+
+    connection, = mysql.connections
+    statement = "INSERT INTO `db`.`t``x` (`id`, `v`) VALUES (%s, %s) ON DUPLICATE KEY UPDATE `v` = VALUES(`v`)"
+    assert connection.log == [
+        'BEGIN', (statement, [[0, 1.5], [1, None]]), (statement, [[2, 2.0], [3, 3.0]]), 'COMMIT',
+        'BEGIN', (statement, [[4, 4.0]]), 'COMMIT',
+    ]
+    assert (summary['rows'], summary['batches'], summary['commits']) == (5, 3, 2)
+
+
+def test_bulk_insert_rolls_back_uncommitted_batches(mysql):
+    def handler(cursor, query, args):
+        if any(row[0] == 3 for row in args):
+            raise pymysql.err.IntegrityError(1062, "Duplicate entry")
+
+    mysql.handler = handler
+    with pytest.raises(pymysql.err.IntegrityError):
+        sql_func.bulk_insert_mysql("t", [(i,) for i in range(6)], columns=["id"], batch_size=1, commit_every=2)
+
+    connection, = mysql.connections
+    assert [entry for entry in connection.log if isinstance(entry, str)] == ['BEGIN', 'COMMIT', 'BEGIN', 'ROLLBACK']
+
+
+def test_load_data_sends_bytes_as_hex(mysql):
+    loaded = []
+
+    def handler(cursor, query, args):
+        with open(args[0], encoding='utf-8') as pipe:
+            loaded.append(pipe.read())
+        cursor.rowcount = loaded[-1].count("\n")
+
+    mysql.handler = handler
+    rows = [(1, b"\x00\t\xff", "a\tb\\"), (2, None, None)]
+    summary = sql_func.bulk_insert_mysql("db.t", rows, columns=["id", "bin", "s"], method="load_data")
+
+    connection, = mysql.connections
+    assert connection.kwargs['local_infile'] is True and not connection.open
+    statement = connection.log[1][0]
+    assert statement == ("LOAD DATA LOCAL INFILE %s INTO TABLE `db`.`t` CHARACTER SET utf8mb4 "
+                         "(`id`, @c1, `s`) SET `bin` = UNHEX(@c1)")
+    assert loaded == ["1\t0009ff\ta\\tb\\\\\n2\t\\N\t\\N\n"]
+    assert summary['rows'] == 2
+
+
+def test_split_sql_statements():
+    script = ("INSERT INTO t VALUES ('a;b', \"c;\\\"d\"); -- x;y\n"
+              "UPDATE t SET a=1 /* ; */ WHERE b='it''s;';\n# c;\n"
+              "/*!40101 SET NAMES utf8mb4 */;\n"
+              "SELECT /*+ MAX_EXECUTION_TIME(1000) */ `semi;colon` FROM t;  ")
+
+    assert sql_func.split_sql_statements(script) == [
+        "INSERT INTO t VALUES ('a;b', \"c;\\\"d\")",
+        "UPDATE t SET a=1  WHERE b='it''s;'",
+        "/*!40101 SET NAMES utf8mb4 */",
+        "SELECT /*+ MAX_EXECUTION_TIME(1000) */ `semi;colon` FROM t",
+    ]
+
+
+def test_parallel_batches_retry_deadlocks_and_report_failures(mysql, monkeypatch):
+    attempts = {}
+    lock = threading.Lock()
+
+    def handler(cursor, query, args):
+        with lock:
+            attempts[query] = attempts.get(query, 0) + 1
+        if query == "UPDATE deadlock" and attempts[query] < 3:
+            raise pymysql.err.OperationalError(1213, "Deadlock found")
+        if query == "UPDATE syntax":
+            raise pymysql.err.ProgrammingError(1064, "syntax")
+        cursor.rowcount = 1
+
+    mysql.handler = handler
+    monkeypatch.setattr(sql_func.time, "sleep", lambda seconds: None)
+    batches = sql_func.divide_into_sublists([f"UPDATE t SET a = {i}" for i in range(40)] + ["UPDATE deadlock"], 10)
+
+    summary = sql_func.execute_sql_batches_parallel(batches, max_workers=4)
+
+    assert (summary['batches'], summary['statements']) == (5, 41)
+    assert summary['rows_affected'] == 41
+    assert summary['retries'] == 2
+    with pytest.raises(RuntimeError, match="1 of 3 batches failed .* batch #1"):
+        sql_func.execute_sql_batches_parallel([["UPDATE a"], ["UPDATE syntax"], ["UPDATE b"]])
+    assert all(not connection.server_status & IN_TRANS for connection in mysql.connections)
+
+
+def existing_keys_handler(table):
+    """Answers existing_keys_mysql's EXISTS probes and temp table join against a set of key tuples."""
+    def handler(cursor, query, args):
+        connection = cursor.connection
+        if query.startswith("CREATE TEMPORARY TABLE"):
+            connection.wanted = []
+        elif query.startswith("INSERT INTO `_wanted_keys`"):
+            connection.wanted.extend(args)
+        elif query.startswith("SELECT DISTINCT w.`_position`"):
+            return [{'_position': row[0]} for row in connection.wanted if tuple(map(str, row[1:])) in table]
+        elif "WHERE EXISTS" in query:
+            width = len(args) // query.count("WHERE EXISTS")
+            probes = [args[i:i + width] for i in range(0, len(args), width)]
+            return [{'_position': probe[0]} for probe in probes if tuple(map(str, probe[1:])) in table]
+    return handler
+
+
+@pytest.mark.parametrize("method", ["in", "temp_table"])
+def test_existing_keys_returns_every_requested_form(mysql, method):
+    mysql.handler = existing_keys_handler({("1",), ("3",)})
+
+    found = sql_func.existing_keys_mysql("db.t", "id", [1, "1", 2, 3, 3], batch_size=2, method=method)
+
+    assert found == {1, "1", 3}
+    connection, = mysql.connections
+    assert any("FROM `db`.`t`" in (entry if isinstance(entry, str) else entry[0]) for entry in connection.log)
+    if method == "temp_table":
+        assert connection.log[-2] == "DROP TEMPORARY TABLE IF EXISTS `_wanted_keys`"
+
+
+def test_existing_keys_cache(mysql):
+    mysql.handler = existing_keys_handler({("1", "a")})
+
+    assert sql_func.existing_keys_mysql("t", ["id", "name"], [(1, "a"), (2, "b")]) == {(1, "a")}
+    queries = len(mysql.connections[0].log)
+    assert sql_func.existing_keys_mysql("t", ["id", "name"], [("1", "a"), (2, "b")]) == {("1", "a")}
+    assert len(mysql.connections[0].log) == queries
+
+    sql_func.invalidate_existing_keys_cache("t")
+    sql_func.existing_keys_mysql("t", ["id", "name"], [(2, "b")])
+    assert len(mysql.connections[0].log) > queries
+
+
+def export_handler(rows):
+    from pymysql.constants import FIELD_TYPE
+
+    description = [("id", FIELD_TYPE.LONGLONG, None, 20, 20, 0), ("amount", FIELD_TYPE.NEWDECIMAL, None, 67, 67, 0),
+                   ("day", FIELD_TYPE.DATE, None, 10, 10, 0), ("note", FIELD_TYPE.VAR_STRING, None, 400, 400, 0)]
+    return result_handler(description, rows)
+
+
+def export_rows(count, note_size=0):
+    import datetime
+    import os
+    from decimal import Decimal
+
+    return [(i, Decimal(i), datetime.date(2024, 1, 1 + i % 3), os.urandom(note_size).hex() if note_size else None)
+            for i in range(count)]
+
+
+def test_export_partitions_and_registers_in_glue(mysql, aws):
+    import io
+    import pyarrow.parquet as pq
+    from shared_func.client_func import get_client
+
+    s3, glue = get_client("s3"), get_client("glue")
+    s3.create_bucket(Bucket="bucket")
+    glue.create_database(DatabaseInput={"Name": "db"})
+    mysql.handler = export_handler(export_rows(30))
+
+    summary = sql_func.export_mysql_to_s3_parquet("SELECT * FROM t", "bucket", "exports/t", partition_column="day",
+                                                  rows_per_file=6, chunksize=10, glue_database="db", glue_table="t")
+
+    assert summary['rows'] == 30
+    assert summary['files'] == 6
+    assert summary['keys'][0] == "exports/t/day=2024-01-01/part-00000.parquet"
+    tables = [pq.read_table(io.BytesIO(s3.get_object(Bucket="bucket", Key=key)["Body"].read()))
+              for key in summary['keys']]
+    assert sum(table.num_rows for table in tables) == 30
+    assert len({table.schema for table in tables}) == 1
+    assert tables[0].schema.names == ["id", "amount", "note"]
+    assert str(tables[0].schema.field("amount").type) == "decimal128(38, 0)"
+    glue_table = glue.get_table(DatabaseName="db", Name="t")["Table"]
+    assert [column["Name"] for column in glue_table["StorageDescriptor"]["Columns"]] == ["id", "amount", "note"]
+    assert [key["Name"] for key in glue_table["PartitionKeys"]] == ["day"]
+    assert len(glue.get_partitions(DatabaseName="db", TableName="t")["Partitions"]) == 3
+
+
+def test_failed_export_aborts_every_upload(mysql, aws, monkeypatch):
+    from decimal import Decimal
+    from shared_func.client_func import get_client
+    from shared_func.s3_func import S3MultipartWriter
+
+    s3 = get_client("s3")
+    s3.create_bucket(Bucket="bucket")
+    monkeypatch.setattr(S3MultipartWriter, "min_part_size", 1024)
+    rows = export_rows(20, note_size=200)
+    # DECIMAL(65) becomes decimal128(38) in the files: a 40 digit value in the second chunk cannot be cast
+    rows[15] = rows[15][:1] + (Decimal(10 ** 39),) + rows[15][2:]
+    mysql.handler = export_handler(rows)
+
+    with pytest.raises(ValueError, match="does not fit the export schema"):
+        sql_func.export_mysql_to_s3_parquet("SELECT * FROM t", "bucket", "exports/t", partition_column="day",
+                                            chunksize=10, compression="none", max_buffer_bytes=1)
+
+    assert s3.list_multipart_uploads(Bucket="bucket").get("Uploads", []) == []
+    assert s3.list_objects_v2(Bucket="bucket").get("KeyCount") == 0
+    assert not mysql.connections[0].open